@@ -0,0 +1,43 @@
+""" Benchmarks of the arithmetic operators.
+
+    Each operator is compared with the numpy round trip
+    CImg(img.asarray() <op> other) used before native operators.
+"""
+import operator
+
+import numpy as np
+import pytest
+from context import *
+
+OPERATORS = {
+    'add': operator.add,
+    'sub': operator.sub,
+    'mul': operator.mul,
+    'truediv': operator.truediv,
+    'floordiv': operator.floordiv,
+}
+
+@pytest.fixture(scope='module')
+def images():
+    a = CImg(np.random.rand(3, 1, 1024, 1024).astype(np.float32) + 1)
+    b = CImg(np.random.rand(3, 1, 1024, 1024).astype(np.float32) + 1)
+    return a, b
+
+def _numpy_path(op, a, other):
+    return CImg(op(a.asarray(), other.asarray() if isinstance(other, CImg) else other))
+
+@pytest.mark.parametrize('name', OPERATORS)
+@pytest.mark.parametrize('operand', ['image', 'scalar'])
+def bench_native(benchmark, images, name, operand):
+    a, b = images
+    other = b if operand == 'image' else 2.0
+    benchmark.group = '{}-{}'.format(name, operand)
+    benchmark(OPERATORS[name], a, other)
+
+@pytest.mark.parametrize('name', OPERATORS)
+@pytest.mark.parametrize('operand', ['image', 'scalar'])
+def bench_numpy(benchmark, images, name, operand):
+    a, b = images
+    other = b if operand == 'image' else 2.0
+    benchmark.group = '{}-{}'.format(name, operand)
+    benchmark(_numpy_path, OPERATORS[name], a, other)
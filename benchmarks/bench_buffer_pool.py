@@ -0,0 +1,47 @@
+""" Benchmarks of processing frames of the same size.
+
+    Processing with the buffer pool, which reuses the pixel buffers of
+    released frames, is compared with allocating new buffers. Writing the
+    results of get_* methods into a preallocated array with out= is
+    compared with returning new images under the same buffer pool.
+"""
+import numpy as np
+import pytest
+from context import *
+
+@pytest.fixture(scope='module')
+def frames():
+    return [np.random.randint(0, 255, (3, 1, 1080, 1920), dtype=np.uint8) for _ in range(4)]
+
+def _process(frames):
+    for frame in frames:
+        CImg(frame, dtype=uint8).get_resize(960, 540).mirror('x')
+
+def bench_malloc(benchmark, frames):
+    benchmark.group = 'frames'
+    benchmark(_process, frames)
+
+def bench_buffer_pool(benchmark, frames):
+    benchmark.group = 'frames'
+    with buffer_pool(256 * 2**20):
+        benchmark(_process, frames)
+
+# Operations as functions of a frame and the output, compared with and
+# without out= under the same buffer pool
+OUT_OPS = {
+    'resize': lambda img, out: img.get_resize(960, 540, out=out),
+    'crop': lambda img, out: img.get_crop(480, 270, 0, 0, 1439, 809, 0, 2, out=out),
+    'mirror': lambda img, out: img.get_mirror('x', out=out),
+}
+
+@pytest.mark.parametrize('use_out', [False, True], ids=['new', 'out'])
+@pytest.mark.parametrize('op', OUT_OPS)
+def bench_out(benchmark, frames, op, use_out):
+    benchmark.group = 'out-' + op
+    images = [CImg(frame, copy=False) for frame in frames]
+    out = OUT_OPS[op](images[0], None).asarray(copy=True) if use_out else None
+    def process():
+        for img in images:
+            OUT_OPS[op](img, out)
+    with buffer_pool(256 * 2**20):
+        benchmark(process)
@@ -0,0 +1,45 @@
+""" Benchmarks of the call overhead of CImg methods.
+
+    Each method is called on a tiny image through CImg and directly
+    on the CImg_* instance, so that the difference is the overhead
+    of the python wrapper.
+"""
+import numpy as np
+import pytest
+from context import *
+
+CALLS = {
+    'draw_line': (0, 0, 3, 3, [1.0]),
+    'draw_circle': (2, 2, 1, [1.0]),
+    'linear_atXY': (1.5, 1.5),
+    'fill': (0.5,),
+    'sqr': (),
+    'mirror': ('x',),
+    'get_crop': (0, 0, 0, 0, 1, 1, 0, 0),
+}
+
+@pytest.fixture
+def img():
+    return CImg(np.random.rand(1, 1, 4, 4).astype(np.float32))
+
+@pytest.mark.parametrize('name', CALLS)
+def bench_wrapper(benchmark, img, name):
+    benchmark.group = 'dispatch-' + name
+    benchmark(getattr(img, name), *CALLS[name])
+
+@pytest.mark.parametrize('name', CALLS)
+def bench_native(benchmark, img, name):
+    benchmark.group = 'dispatch-' + name
+    benchmark(getattr(img._cimg, name), *CALLS[name])
+
+def bench_getitem_pixel(benchmark, img):
+    benchmark.group = 'getitem'
+    benchmark(img.__getitem__, (1, 2))
+
+def bench_setitem_pixel(benchmark, img):
+    benchmark.group = 'getitem'
+    benchmark(img.__setitem__, (1, 2), 0.5)
+
+def bench_getitem_rows(benchmark, img):
+    benchmark.group = 'getitem'
+    benchmark(img.__getitem__, (slice(None), slice(1, 3)))
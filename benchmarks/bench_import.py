@@ -0,0 +1,22 @@
+""" Benchmarks of the import time.
+
+    Each round imports the module in a new interpreter, so that the
+    times include the interpreter startup. numpy is the baseline.
+"""
+from context import *
+
+def _import(module):
+    run_python('import ' + module)
+
+def bench_import_numpy(benchmark):
+    benchmark.group = 'import'
+    benchmark.pedantic(_import, args=('numpy',), rounds=20)
+
+def bench_import_pycimg(benchmark):
+    benchmark.group = 'import'
+    benchmark.pedantic(_import, args=('pycimg',), rounds=20)
+
+def bench_import_pycimg_all_types(benchmark):
+    benchmark.group = 'import'
+    code = 'pycimg; [pycimg.CImg(dtype=t) for t in pycimg.pycimg._PIXEL_TYPES]'
+    benchmark.pedantic(_import, args=(code,), rounds=20)
@@ -0,0 +1,25 @@
+""" Benchmarks of batched image loading.
+
+    load_many() is compared with a serial loop over CImg(path).
+    The throughput is reported as images_per_second in extra_info.
+"""
+import os
+
+import pytest
+from context import *
+
+PATHS = [get_test_image(ext) for ext in ['jpg', 'png', 'bmp']] * 8
+
+def _report(benchmark):
+    benchmark.extra_info['images_per_second'] = len(PATHS) / benchmark.stats.stats.mean
+
+def bench_serial(benchmark):
+    benchmark.group = 'load'
+    benchmark(lambda: [CImg(path) for path in PATHS])
+    _report(benchmark)
+
+@pytest.mark.parametrize('workers', sorted({1, 4, os.cpu_count() or 1}))
+def bench_load_many(benchmark, workers):
+    benchmark.group = 'load'
+    benchmark(load_many, PATHS, workers=workers)
+    _report(benchmark)
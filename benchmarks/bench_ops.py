@@ -0,0 +1,124 @@
+""" Benchmarks of the bound CImg operations.
+
+    Each operation is run on images of the five pixel types uint8, uint16,
+    uint32, float32 and float64, on a 2D color image and on a volume, with
+    one thread and with all CPUs. Operations returning a new image use the
+    get_* method, so that all rounds process the same input.
+
+    Store the results with --benchmark-json=FILE and compare them with
+    compare.py to detect regressions, e.g. after an update of CImg:
+
+        pytest bench_ops.py --benchmark-json=before.json
+        pytest bench_ops.py --benchmark-json=after.json
+        python compare.py before.json after.json --threshold 0.1
+"""
+import os
+
+import numpy as np
+import pytest
+from context import *
+
+DTYPES = [uint8, uint16, uint32, float32, float64]
+
+# Shapes (spectrum, depth, height, width)
+SIZES = {
+    '2d': (3, 1, 512, 512),
+    '3d': (1, 64, 128, 128),
+}
+
+THREADS = sorted({1, os.cpu_count() or 1})
+
+# Operations as functions of an image and a 3x3x3 kernel of the same type.
+OPS = {
+    # Mathematical
+    'abs': lambda img, k: img.get_abs(),
+    'sqr': lambda img, k: img.get_sqr(),
+    'sqrt': lambda img, k: img.get_sqrt(),
+    'exp': lambda img, k: img.get_exp(),
+    'log': lambda img, k: img.get_log(),
+    'cos': lambda img, k: img.get_cos(),
+    'tanh': lambda img, k: img.get_tanh(),
+    'pow': lambda img, k: img.get_pow(2.5),
+    'atan2': lambda img, k: img.get_atan2(img),
+    'round': lambda img, k: img.get_round(4),
+    'add': lambda img, k: img.get_add(img),
+    'mul_value': lambda img, k: img.get_mul(2),
+    'cumulate': lambda img, k: img.get_cumulate('x'),
+    # Value manipulation
+    'fill': lambda img, k: img.get_fill(7),
+    'rand': lambda img, k: img.get_rand(0, 255),
+    'normalize': lambda img, k: img.get_normalize(0, 255),
+    'cut': lambda img, k: img.get_cut(50, 200),
+    'threshold': lambda img, k: img.get_threshold(128),
+    'quantize': lambda img, k: img.get_quantize(16),
+    'equalize': lambda img, k: img.get_equalize(256, 0, 255),
+    'histogram': lambda img, k: img.get_histogram(256, 0, 255),
+    'norm': lambda img, k: img.get_norm(),
+    'label': lambda img, k: img.get_threshold(128).get_label(),
+    'noise': lambda img, k: img.get_noise(10),
+    # Statistics
+    'min_max': lambda img, k: img.min_max(),
+    'variance': lambda img, k: img.variance(),
+    'stats': lambda img, k: img.stats(),
+    'stats_channels': lambda img, k: img.stats(axes='c'),
+    'kth_smallest': lambda img, k: img.kth_smallest(img.size // 2),
+    'mse': lambda img, k: img.mse(img),
+    'dot': lambda img, k: img.dot(img),
+    'magnitude': lambda img, k: img.magnitude(2),
+    # Geometric
+    'resize_linear': lambda img, k: img.get_resize(-150, -150, -100, -100, LINEAR),
+    'resize_cubic': lambda img, k: img.get_resize(-150, -150, -100, -100, CUBIC),
+    'resize_halfXY': lambda img, k: img.get_resize_halfXY(),
+    'resize_doubleXY': lambda img, k: img.get_resize_doubleXY(),
+    'crop': lambda img, k: img.get_crop(10, 10, 0, 0, img.width - 10, img.height - 10,
+                                        img.depth - 1, img.spectrum - 1),
+    'mirror': lambda img, k: img.get_mirror('y'),
+    'shift': lambda img, k: img.get_shift(5, 5),
+    'rotate': lambda img, k: img.get_rotate(30),
+    'permute_axes': lambda img, k: img.get_permute_axes('yxzc'),
+    'append': lambda img, k: img.get_append(img, 'x'),
+    'warp_affine': lambda img, k: img.get_warp_affine(np.array([[0.9, 0.1, 5], [-0.1, 0.9, 5], [0, 0, 1]])),
+    # Filtering
+    'blur': lambda img, k: img.get_blur(2),
+    'blur_box': lambda img, k: img.get_blur_box(5),
+    'blur_median': lambda img, k: img.get_blur_median(3),
+    'boxfilter': lambda img, k: img.get_boxfilter(5, 0),
+    'deriche': lambda img, k: img.get_deriche(2, 1),
+    'vanvliet': lambda img, k: img.get_vanvliet(2, 1),
+    'sharpen': lambda img, k: img.get_sharpen(0.5),
+    'convolve': lambda img, k: img.get_convolve(k),
+    'correlate': lambda img, k: img.get_correlate(k),
+    'dilate': lambda img, k: img.get_dilate(k),
+    'erode': lambda img, k: img.get_erode(k),
+    # Drawing
+    'draw_circle': lambda img, k: img.draw_circle(img.width // 2, img.height // 2, img.height // 3,
+                                                  np.full(img.spectrum, 200)),
+    'draw_line': lambda img, k: img.draw_line(0, 0, img.width - 1, img.height - 1,
+                                              np.full(img.spectrum, 200)),
+}
+
+_images = {}
+
+def _image(dtype, size):
+    """ Return random image and kernel, shared by the benchmarks. """
+    key = (dtype, size)
+    if key not in _images:
+        rng = np.random.default_rng(0)
+        img = CImg(rng.integers(1, 255, SIZES[size]), dtype=dtype)
+        kernel = CImg(np.ones((1, 3, 3, 3)), dtype=dtype)
+        _images[key] = img, kernel
+    return _images[key]
+
+@pytest.mark.parametrize('num_threads', THREADS)
+@pytest.mark.parametrize('size', SIZES)
+@pytest.mark.parametrize('dtype', DTYPES, ids=lambda dtype: np.dtype(dtype).name)
+@pytest.mark.parametrize('name', OPS)
+def bench_op(benchmark, name, dtype, size, num_threads):
+    benchmark.group = '{}-{}'.format(name, size)
+    img, kernel = _image(dtype, size)
+    if name.startswith('draw_'):
+        # Drawing modifies the image
+        img = CImg(img, dtype=dtype)
+    op = OPS[name]
+    with threads(num_threads):
+        benchmark(op, img, kernel)
@@ -0,0 +1,32 @@
+""" Benchmarks of pipelines of small operations.
+
+    Pipeline.run() and Pipeline.map() are compared with the chained
+    calls of the CImg methods.
+"""
+import numpy as np
+import pytest
+from context import *
+
+OPS = [('resize', 128, 128), ('blur', 1.5), ('normalize', 0, 255), ('threshold', 128)]
+
+@pytest.fixture(scope='module')
+def images():
+    return [CImg(np.random.rand(3, 1, 256, 256).astype(np.float32)) for _ in range(32)]
+
+def _chained(img):
+    return CImg(img).resize(128, 128).blur(1.5).normalize(0, 255).threshold(128)
+
+def bench_chained(benchmark, images):
+    benchmark.group = 'pipeline'
+    benchmark(lambda: [_chained(img) for img in images])
+
+def bench_run(benchmark, images):
+    benchmark.group = 'pipeline'
+    p = Pipeline(OPS)
+    benchmark(lambda: [p.run(img) for img in images])
+
+def bench_map(benchmark, images):
+    benchmark.group = 'pipeline'
+    p = Pipeline(OPS)
+    with threads(1):
+        benchmark(p.map, images)
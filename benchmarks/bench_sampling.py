@@ -0,0 +1,27 @@
+""" Benchmarks of sampling pixel values at many coordinates.
+
+    The vectorized linear_at() is compared with a python loop
+    over linear_atXY().
+"""
+import numpy as np
+import pytest
+from context import *
+
+N = 10000
+
+@pytest.fixture(scope='module')
+def image():
+    return CImg(np.random.rand(3, 1, 512, 512).astype(np.float32))
+
+@pytest.fixture(scope='module')
+def coords():
+    return (np.random.rand(N, 2) * 511).astype(np.float32)
+
+def bench_loop(benchmark, image, coords):
+    benchmark.group = 'linear_at'
+    benchmark(lambda: [[image.linear_atXY(x, y, 0, c) for c in range(3)] for x, y in coords])
+
+@pytest.mark.parametrize('name', ['nearest_at', 'linear_at', 'cubic_at'])
+def bench_vectorized(benchmark, image, coords, name):
+    benchmark.group = 'linear_at'
+    benchmark(getattr(image, name), coords)
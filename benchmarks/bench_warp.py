@@ -0,0 +1,37 @@
+""" Benchmarks of affine warps of a volume.
+
+    warp_affine() is compared with apply_geometric_transform(),
+    which transforms channel 0 only.
+"""
+import numpy as np
+import pytest
+from context import *
+
+SIZE = 128
+
+@pytest.fixture(scope='module')
+def volume():
+    return CImg(np.random.rand(1, SIZE, SIZE, SIZE).astype(np.float32))
+
+def _rotation(angle):
+    c, s = np.cos(angle), np.sin(angle)
+    return np.array([[c, -s, 0], [s, c, 0], [0, 0, 1]])
+
+def bench_apply_geometric_transform(benchmark, volume):
+    benchmark.group = 'warp'
+    M = CImg(_rotation(0.3))
+    t = CImg(np.zeros(3))
+    benchmark(lambda: CImg(volume).apply_geometric_transform(1.0, M, t))
+
+@pytest.mark.parametrize('interpolation', [NEAREST, LINEAR, CUBIC])
+def bench_warp_affine(benchmark, volume, interpolation):
+    benchmark.group = 'warp'
+    matrix = np.eye(4)
+    matrix[:3, :3] = _rotation(0.3)
+    benchmark(volume.get_warp_affine, matrix, interpolation=interpolation)
+
+@pytest.mark.parametrize('interpolation', [NEAREST, LINEAR, CUBIC])
+def bench_warp(benchmark, volume, interpolation):
+    benchmark.group = 'warp'
+    field = (np.random.rand(3, SIZE, SIZE, SIZE) * 2 - 1).astype(np.float32)
+    benchmark(volume.get_warp, field, mode=BACKWARD_RELATIVE, interpolation=interpolation)
@@ -0,0 +1,61 @@
+""" Compare two benchmark runs stored with pytest --benchmark-json.
+
+    Prints the ratio of the timings of all benchmarks contained in both
+    runs and flags benchmarks that are slower than the baseline by more
+    than the threshold.
+
+    Example:
+        python compare.py before.json after.json --threshold 0.1
+
+    The exit status is 1 if any benchmark regressed, otherwise 0.
+"""
+import argparse
+import json
+import sys
+
+
+def load(filename, stat):
+    """ Return dict of benchmark name and timing statistic of a JSON file. """
+    with open(filename) as f:
+        data = json.load(f)
+    return {b['fullname']: b['stats'][stat] for b in data['benchmarks']}
+
+
+def compare(baseline, current, threshold):
+    """ Return list of (name, baseline time, current time, ratio, regressed)
+        of the benchmarks in both runs, sorted by decreasing ratio. """
+    rows = []
+    for name in baseline.keys() & current.keys():
+        ratio = current[name] / baseline[name] if baseline[name] > 0 else float('inf')
+        rows.append((name, baseline[name], current[name], ratio, ratio > 1 + threshold))
+    return sorted(rows, key=lambda row: row[3], reverse=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('baseline', help='JSON file of the baseline run')
+    parser.add_argument('current', help='JSON file of the run to check')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help='relative slowdown flagged as regression (default: 0.1)')
+    parser.add_argument('--stat', default='median', choices=['min', 'median', 'mean'],
+                        help='timing statistic to compare (default: median)')
+    args = parser.parse_args(argv)
+
+    baseline = load(args.baseline, args.stat)
+    current = load(args.current, args.stat)
+    rows = compare(baseline, current, args.threshold)
+    width = max([len(row[0]) for row in rows] + [9])
+    print('{:<{}} {:>12} {:>12} {:>7}'.format('benchmark', width, 'baseline', 'current', 'ratio'))
+    for name, t0, t1, ratio, regressed in rows:
+        print('{:<{}} {:>12.6f} {:>12.6f} {:>7.2f}{}'.format(name, width, t0, t1, ratio,
+                                                           '  REGRESSION' if regressed else ''))
+    for name in sorted(baseline.keys() - current.keys()):
+        print('{:<{}} missing in {}'.format(name, width, args.current))
+
+    regressions = sum(row[4] for row in rows)
+    print('{} of {} benchmarks regressed by more than {:.0%}.'.format(regressions, len(rows), args.threshold))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,17 @@
+import importlib.util
+import os
+import sys
+
+from pycimg import *
+
+def get_test_image(ext=None):
+    if ext == None:
+        return os.path.abspath(os.path.join(os.path.dirname(__file__), '../tests/test.jpg'))
+    return os.path.abspath(os.path.join(os.path.dirname(__file__), '../tests/test.' + ext))
+
+# Share the helpers of the tests
+_spec = importlib.util.spec_from_file_location(
+    'tests_context', os.path.join(os.path.dirname(__file__), '../tests/context.py'))
+_tests_context = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(_tests_context)
+run_python = _tests_context.run_python
@@ -1,2 +1,10 @@
-__version__ = "2.0.8" 
-from .pycimg import *
\ No newline at end of file
+__version__ = "2.0.8"
+import importlib
+from .pycimg import *
+
+
+def __getattr__(name):
+    # Import the tiled submodule on first use to reduce the import time
+    if name == 'tiled':
+        return importlib.import_module('.tiled', __name__)
+    raise AttributeError("module 'pycimg' has no attribute '{}'".format(name))
@@ -1,16 +1,51 @@
+import atexit
+import contextlib
 import functools
+import itertools
 import numbers
+import operator
+import os
+import sys
+import threading
+import time
 import numpy as np
 
-from .cimg_bindings import CImg_uint8, CImg_uint16, CImg_uint32, CImg_float32, CImg_float64
+from . import cimg_bindings
+from .cimg_bindings import TiffFile, has_display
+from .cimg_bindings import set_num_threads, get_num_threads, openmp_info
+from .cimg_bindings import set_parallel_size_factor, get_parallel_size_factor
+from .cimg_bindings import set_buffer_pool_size, clear_buffer_pool, buffer_pool_stats
+from .cimg_bindings import set_local_num_threads as _set_local_num_threads
+from .cimg_bindings import set_gil_timing as _set_gil_timing
+from .cimg_bindings import gil_released_time as _gil_released_time
 
 # Supported numeric pixel type
+bool_ = np.bool_
+int8 = np.int8
+int16 = np.int16
+int32 = np.int32
 uint8 = np.uint8
 uint16 = np.uint16
 uint32 = np.uint32
+float16 = np.float16
 float32 = np.float32
 float64 = np.float64
 
+# Pixel types of the CImg_* and Pipeline_* classes
+_PIXEL_TYPES = {np.dtype(name).type: name for name in cimg_bindings.pixel_types}
+
+# Data types of the loaded CImg_* classes
+_DTYPES = {}
+
+
+def _native_class(dtype, kind='CImg'):
+    """ Return the CImg_* or Pipeline_* class of a data type.
+        The bindings register the classes on first use. """
+    cls = getattr(cimg_bindings, kind + '_' + _PIXEL_TYPES[dtype])
+    if kind == 'CImg':
+        _DTYPES[cls] = dtype
+    return cls
+
 # Interpolation type
 NONE_RAW = -1
 NONE = 0
@@ -27,6 +62,12 @@ NEUMANN = 1
 PERIODIC = 2
 MIRROR = 3
 
+# Warping mode
+BACKWARD_ABSOLUTE = 0
+BACKWARD_RELATIVE = 1
+FORWARD_ABSOLUTE = 2
+FORWARD_RELATIVE = 3
+
 # Variance method
 SECOND_MOMENT = 0
 BEST_UNBIASED = 1
@@ -69,14 +110,65 @@ SPLINES = 2
 BARS = 3
 
 
+# Data types of the .cimg file format
+_CIMG_TYPES = {
+    'bool': bool_,
+    'int8': int8, 'char': int8,
+    'int16': int16, 'short': int16,
+    'int32': int32, 'int': int32,
+    'uint8': uint8, 'unsigned char': uint8,
+    'uint16': uint16, 'unsigned short': uint16,
+    'uint32': uint32, 'unsigned int': uint32,
+    'float16': float16, 'half': float16,
+    'float32': float32, 'float': float32,
+    'float64': float64, 'double': float64,
+}
+
+
+def _read_cimg_header(filename):
+    """ Return shape, data type and data offset of a .cimg file. """
+    with open(filename, 'rb') as f:
+        header = f.readline().decode('ascii', 'replace').split()
+        dims = f.readline().decode('ascii', 'replace').split()
+        offset = f.tell()
+    if len(header) < 3 or not header[-1].endswith('_endian'):
+        raise RuntimeError("File '{}' is not a .cimg file.".format(filename))
+    if header[0] != '1':
+        raise RuntimeError("File '{}' contains {} images, expected 1.".format(filename, header[0]))
+    pixel_type = ' '.join(header[1:-1])
+    if pixel_type not in _CIMG_TYPES:
+        raise RuntimeError("Data type '{}' of file '{}' not supported.".format(pixel_type, filename))
+    dtype = np.dtype(_CIMG_TYPES[pixel_type])
+    if header[-1] != sys.byteorder + '_endian':
+        raise RuntimeError("File '{}' needs to be {}_endian.".format(filename, sys.byteorder))
+    if len(dims) != 4:
+        raise RuntimeError("File '{}' contains compressed data.".format(filename))
+    width, height, depth, spectrum = map(int, dims)
+    return (spectrum, depth, height, width), dtype.type, offset
+
+
+def _create_cimg_file(filename, shape, dtype):
+    """ Create an uncompressed .cimg file of given shape and data type,
+        with all pixel values set to zero. """
+    dtype = np.dtype(dtype)
+    spectrum, depth, height, width = shape
+    header = '1 {} {}_endian\n{} {} {} {}\n'.format(dtype.name, sys.byteorder,
+                                                   width, height, depth, spectrum)
+    with open(filename, 'wb') as f:
+        f.write(header.encode('ascii'))
+        f.truncate(len(header) + dtype.itemsize * spectrum * depth * height * width)
+
+
 class CImg:
     """ CImg is a wrapper class for the CImg library: """
 
     def __init__(self, *args, **kwargs):
         """ Create CImg with given data type.
 
-            Supported datatypes are int8, int16, int32,
-            uint8, uint16, uint32, float32, and float64.
+            Supported datatypes are bool_, int8, int16, int32,
+            uint8, uint16, uint32, float16, float32, and float64.
+            Images of type float16 are stored in half precision,
+            computations are done in single precision.
 
             Examples:
                 1. Create empty image with default type float32
@@ -92,36 +184,54 @@ class CImg:
                 4. Create image of size 100x200 with data type uint8
                 im = CImg((100, 200), dtype=uint8)
 
+                5. Create image sharing the memory of a numpy array
+                arr = np.zeros((100, 2), dtype=np.uint8)
+                im = CImg(arr, copy=False)
+
             Args:
-                Either image filename, numpy array, or image size.
+                Either image filename, numpy array, CImg, or image size.
 
             Keyword arguments:
-                dtype: Data type of CImg.
+                dtype: Data type of CImg. Defaults to float32, or to the
+                       data type of the numpy array or CImg if copy is False.
+                copy: If False, the image shares the memory of the given
+                      numpy array or CImg instead of copying it.
+                      The array needs to be C-contiguous, writeable and of
+                      the CImg data type. Operations changing the image
+                      size are not possible on shared images. Default: True.
 
             Raises:
-                RuntimeError: For unsupported data types.
+                RuntimeError: For unsupported data types or if
+                              the memory cannot be shared.
         """
+        copy = kwargs.get('copy', True)
         self.dtype = kwargs.get('dtype', float32)
+        if not copy and 'dtype' not in kwargs and len(args) == 1:
+            if isinstance(args[0], np.ndarray):
+                self.dtype = args[0].dtype.type
+            elif isinstance(args[0], CImg):
+                self.dtype = args[0].dtype
 
-        if self.dtype == np.uint8:
-            self._cimg = CImg_uint8()
-        elif self.dtype == np.uint16:
-            self._cimg = CImg_uint16()
-        elif self.dtype == np.uint32:
-            self._cimg = CImg_uint32()
-        elif self.dtype == np.float32:
-            self._cimg = CImg_float32()
-        elif self.dtype == np.float64:
-            self._cimg = CImg_float64()
-        else:
+        try:
+            self.dtype = np.dtype(self.dtype).type
+            self._cimg = _native_class(self.dtype)()
+        except (TypeError, KeyError):
             raise RuntimeError("Unknown data type '{}'".format(self.dtype))
         if len(args) == 1:
             if isinstance(args[0], str):
                 self.load(args[0])
             elif isinstance(args[0], np.ndarray):
-                self.fromarray(args[0])
+                if copy:
+                    self.fromarray(args[0])
+                else:
+                    self._share(args[0])
             elif isinstance(args[0], CImg):
-                self.fromarray(args[0].asarray())
+                if not copy:
+                    self._share(args[0].asarray())
+                elif args[0].dtype == self.dtype:
+                    self._cimg = type(self._cimg)(args[0]._cimg)
+                else:
+                    self.fromarray(args[0].asarray())
             elif isinstance(args[0], tuple):
                 shape = [max(1, sz) for sz in args[0]]
                 self.resize(*shape, interpolation_type=NONE_RAW)
@@ -135,6 +245,185 @@ class CImg:
         elif len(args) > 1:
             raise RuntimeError("More than one argument not supported")
 
+    @classmethod
+    def _fromcimg(cls, cimg):
+        """ Create CImg wrapping the given CImg_* instance without copy. """
+        img = cls.__new__(cls)
+        img._cimg = cimg
+        img.dtype = _DTYPES[type(cimg)]
+        return img
+
+    @classmethod
+    def frombytes(cls, buffer, format=None, dtype=float32):
+        """ Create CImg from encoded image data in memory.
+
+            Args:
+                buffer: Encoded image data as bytes, memoryview or any
+                        object supporting the buffer protocol.
+                format (str): Image format, one of 'jpeg', 'png', 'bmp',
+                              'tiff' or 'cimg'. If None, the format is
+                              detected from the data. Default: None.
+                dtype: Data type of CImg. Default: float32.
+
+            Raises:
+                RuntimeError: If the data cannot be decoded.
+        """
+        img = cls(dtype=dtype)
+        img._cimg.frombytes(buffer, format or '')
+        return img
+
+    def load(self, file, format=None):
+        """ Load image from a file.
+
+            Args:
+                file: Filename of image or file-like object opened
+                      in binary mode.
+                format (str): Image format of a file-like object.
+                              If None, the format is detected from
+                              the data. Default: None.
+
+            Raises:
+                RuntimeError: If file does not exist or cannot be decoded.
+        """
+        if isinstance(file, (str, os.PathLike)):
+            self._cimg.load(os.fspath(file))
+        else:
+            self._cimg.frombytes(file.read(), format or '')
+        return self
+
+    @classmethod
+    def iter_tiff_frames(cls, filename, batch=1, dtype=float32):
+        """ Iterate over the frames of a multi-page TIFF file.
+
+            The file is opened once and frames are decoded lazily,
+            so that at most batch frames are held in memory at a time.
+
+            Args:
+                filename (str): Filename of image.
+                batch (int): Number of frames per yielded image. Frames
+                             are stacked along the z-axis. Default: 1.
+                dtype: Data type of images. Default: float32.
+
+            Yields:
+                CImg holding the next batch of frames. The last
+                batch may contain fewer frames.
+
+            Raises:
+                RuntimeError: If file cannot be opened or decoded.
+        """
+        if batch < 1:
+            raise RuntimeError('Batch size needs to be at least 1.')
+        tiff = TiffFile(os.fspath(filename))
+        try:
+            for first in range(0, tiff.frames(), batch):
+                img = cls(dtype=dtype)
+                img._cimg.load_tiff_frames(tiff, first, batch)
+                yield img
+        finally:
+            tiff.close()
+
+    @classmethod
+    def open_memmap(cls, filename, mode='r', shape=None, dtype=float32, offset=0):
+        """ Open a .cimg or raw file as an image sharing a memory map of the file.
+
+            Opening does not read the pixel data, pages of the file
+            are only loaded when accessed. The image size cannot be
+            changed, use the get_* methods (e.g. get_crop) instead.
+
+            Args:
+                filename (str): Filename of image.
+                mode (str): 'r' to open the file read-only, changes of
+                            the pixel data are not written to the file.
+                            'r+' to write changes back to the file.
+                            Default: 'r'.
+                shape (tuple): Shape of the pixel data of a raw file,
+                               e.g. (spectrum, depth, height, width).
+                               If None, the file is read as .cimg file.
+                               Default: None.
+                dtype: Data type of a raw file. Default: float32.
+                offset (int): Offset of the pixel data in a raw file.
+                              Default: 0.
+
+            Raises:
+                RuntimeError: If the file cannot be memory-mapped.
+        """
+        if mode not in ('r', 'r+'):
+            raise RuntimeError("Mode needs to be 'r' or 'r+'.")
+        if shape is None:
+            shape, dtype, offset = _read_cimg_header(filename)
+        else:
+            shape = tuple(shape)
+        # Copy-on-write keeps the memory map writeable without modifying the file
+        arr = np.memmap(filename, dtype=dtype, mode='c' if mode == 'r' else mode,
+                        offset=offset, shape=shape)
+        return cls(arr, copy=False)
+
+    def tobytes(self, format, **kwargs):
+        """ Encode image into memory.
+
+            Args:
+                format (str): Image format, one of 'jpeg', 'png', 'bmp',
+                              'tiff' or 'cimg'.
+
+            Keyword arguments:
+                quality: Image quality (in %) of JPEG images.
+                bytes_per_pixel: Force the number of bytes per pixels for
+                                 saving PNG images, when possible.
+                compression_type: Type of data compression of TIFF images.
+                    Can be: C_NONE, C_LZW, C_JPEG.
+                voxel_size: Voxel size, to be stored in TIFF images.
+                description: Description, to be stored in TIFF images.
+                use_bigtiff: Allow to save big tiff images (>4Gb).
+                is_compressed: Compress data of .cimg images.
+
+            Returns:
+                memoryview of the encoded image data. The data is
+                not copied, use bytes() to convert it to bytes.
+
+            Raises:
+                RuntimeError: For unsupported image formats.
+        """
+        return memoryview(self._cimg.tobytes(format, **kwargs))
+
+    def save(self, file, *args, format=None, **kwargs):
+        """ Save image as a file.
+
+            Args:
+                file: Filename of image or file-like object opened
+                      in binary mode. The image format of a filename
+                      is defined by its file extension.
+                format (str): Image format of a file-like object.
+                              If None, the format is defined by the
+                              extension of the file name attribute.
+                              Default: None.
+
+            Further arguments:
+                number, digits for filenames (see CImg::save()), or the
+                keyword arguments of tobytes() for file-like objects.
+
+            Raises:
+                RuntimeError: If the image format is unknown or number,
+                              digits are given for a file-like object.
+        """
+        if isinstance(file, (str, os.PathLike)):
+            self._cimg.save(os.fspath(file), *args, **kwargs)
+            return self
+        if format is None:
+            name = getattr(file, 'name', None)
+            format = os.path.splitext(name)[1] if isinstance(name, str) else ''
+            if not format:
+                raise RuntimeError('Image format of file-like object is unknown.')
+        if args:
+            raise RuntimeError('Number and digits are only supported for filenames.')
+        file.write(self.tobytes(format, **kwargs))
+        return self
+
+    def _share(self, arr):
+        # Keep a reference to the shared array for the lifetime of the
+        # image, as in-place operations may replace self._cimg.
+        self._base = arr
+        self.fromarray_shared(arr)
+
     def asarray(self, copy=False):
         """ Returns image data as a numpy array.
             
@@ -186,45 +475,66 @@ class CImg:
     def __neq__(self, img):
         return self._cimg != img._cimg
 
+    def _operand(self, other):
+        """ Return native operand for arithmetic with other,
+            or None if other is not supported natively. """
+        if isinstance(other, CImg):
+            if other.dtype == self.dtype and other.shape == self.shape:
+                return other._cimg
+        elif isinstance(other, numbers.Real):
+            return other
+        return None
+
+    def _arithmetic(self, name, other, op):
+        """ Return result of arithmetic operation name with other.
+            Falls back to numpy operator op if other is not
+            supported natively. The result keeps the data type. """
+        operand = self._operand(other)
+        if operand is None:
+            return CImg(op(self.asarray(), other.asarray() if isinstance(other, CImg) else other),
+                        dtype=self.dtype)
+        return CImg._fromcimg(getattr(self._cimg, 'get_' + name)(operand))
+
+    def _inplace_arithmetic(self, name, other, op):
+        """ Apply in-place arithmetic operation name with other.
+            Falls back to numpy operator op if other is not
+            supported natively. """
+        operand = self._operand(other)
+        if operand is None:
+            op(self.asarray(), other.asarray() if isinstance(other, CImg) else other)
+        else:
+            getattr(self._cimg, name)(operand)
+        return self
+
     def __add__(self, other):
-        return CImg(self.asarray() + (other.asarray() if isinstance(other, CImg) else other))
+        return self._arithmetic('add', other, operator.add)
 
     def __sub__(self, other):
-        return CImg(self.asarray() - (other.asarray() if isinstance(other, CImg) else other))
+        return self._arithmetic('sub', other, operator.sub)
 
     def __mul__(self, other):
-        return CImg(self.asarray() * (other.asarray() if isinstance(other, CImg) else other))
+        return self._arithmetic('mul', other, operator.mul)
 
     def __truediv__(self, other):
-        return CImg(self.asarray() / (other.asarray() if isinstance(other, CImg) else other))
+        return self._arithmetic('div', other, operator.truediv)
 
     def __floordiv__(self, other):
-        return CImg(self.asarray() // (other.asarray() if isinstance(other, CImg) else other))
+        return self._arithmetic('floordiv', other, operator.floordiv)
 
     def __iadd__(self, other):
-        a = self.asarray()
-        a += (other.asarray() if isinstance(other, CImg) else other)
-        return self
+        return self._inplace_arithmetic('add', other, operator.iadd)
 
     def __isub__(self, other):
-        a = self.asarray()
-        a -= (other.asarray() if isinstance(other, CImg) else other)
-        return self
+        return self._inplace_arithmetic('sub', other, operator.isub)
 
     def __imul__(self, other):
-        a = self.asarray()
-        a *= (other.asarray() if isinstance(other, CImg) else other)
-        return self
+        return self._inplace_arithmetic('mul', other, operator.imul)
 
     def __itruediv__(self, other):
-        a = self.asarray()
-        a /= (other.asarray() if isinstance(other, CImg) else other)
-        return self
+        return self._inplace_arithmetic('div', other, operator.itruediv)
 
     def __ifloordiv__(self, other):
-        a = self.asarray()
-        a //= (other.asarray() if isinstance(other, CImg) else other)
-        return self
+        return self._inplace_arithmetic('floordiv', other, operator.ifloordiv)
 
     def __repr__(self):
         if self.isempty():
@@ -243,83 +553,644 @@ class CImg:
                  "spectrum:", self.spectrum,
                  "data:    ", arr) 
 
-    def __getattr__(self, attr):
-        if hasattr(self._cimg, attr):
-            func = getattr(self._cimg, attr)
-            @functools.wraps(func)
-            def wrapper(*args, **kwargs):
-                # Unwrap CImg arguments
-                cargs = [arg._cimg if isinstance(arg, CImg) else arg for arg in args]
-                cargs = []
-                for arg in args:
-                    if isinstance(arg, CImg):
-                        cargs.append(arg._cimg)
-                    else:
-                        cargs.append(arg)
-                r = func(*cargs, **kwargs)
-                if isinstance(r, CImg_uint8)   or \
-                   isinstance(r, CImg_uint16)  or \
-                   isinstance(r, CImg_uint32)  or \
-                   isinstance(r, CImg_float32) or \
-                   isinstance(r, CImg_float64):
-                    self._cimg = r
-                    return self
-                else:
-                    return r 
-            return wrapper
-        raise AttributeError(attr)
-
-    def _check_index(self, index):
-        cls = type(self)
-        def raiseError():
-            msg = 'only integers and slices (`:`) are valid indices'
-            raise IndexError(msg.format(cls=cls))
-
-        # Handle special case of single index
-        if isinstance(index, numbers.Integral):
-            index = tuple([index])
-        if isinstance(index, tuple):
-            # Check number of indices
-            if len(index) > 4:
-                raise IndexError('Image has < 5 dimensions.')
-            index = list(index)
-            # Case 1: indices are a mix of integers and slices
-            if any(map(lambda t: isinstance(t, slice), index)):
-                # Expand integers to slices
-                slice_index = []
-                for idx in index:
-                    if isinstance(idx, numbers.Integral):
-                        slice_index.append(slice(idx, idx+1, None))
-                    elif isinstance(idx, slice):
-                        slice_index.append(idx)
-                    else:
-                        raiseError()
-                index = slice_index
-                # Expand slices to cover all dimensions
-                while len(index) < 4:
-                    index.append(slice(None, None, None))
-                index = list(reversed(index))
-                return (index, True)
-            # Case 2: all indices are integers
-            elif all(map(lambda t: isinstance(t, numbers.Integral), index)):
-                # Expand indices to cover all dimensions
-                while len(index) < 4:
-                    index.append(0)
-                index = tuple(reversed(index))
-                return (index, False)
-            else:
-                raiseError()
-        else:
-            raiseError()
+    def _array_index(self, index):
+        """ Return index into asarray() for index given in
+            (x, y, z, c) order. Integers are converted to slices,
+            so that the dimensions are kept. """
+        array_index = []
+        for idx in index:
+            if isinstance(idx, numbers.Integral):
+                idx = int(idx)
+                idx = slice(idx, idx + 1 if idx != -1 else None)
+            elif isinstance(idx, CImg):
+                idx = idx.asarray()
+            elif not isinstance(idx, (slice, np.ndarray, list)):
+                raise IndexError('only integers, slices (`:`), and integer '
+                                 'or boolean arrays are valid indices')
+            array_index.append(idx)
+        while len(array_index) < 4:
+            array_index.append(slice(None))
+        return tuple(reversed(array_index))
+
+    def _mask(self, index):
+        """ Return index as boolean mask of the image data, or None
+            if index is not a boolean array. """
+        if isinstance(index, CImg):
+            index = index.asarray()
+        if not isinstance(index, np.ndarray) or index.dtype != np.bool_:
+            return None
+        if index.size != self.size:
+            raise IndexError('Boolean index needs to have the size of the image.')
+        return index.reshape(self.shape)
+
+    def get(self, index, copy=True):
+        """ Return pixel value or image region.
+
+            Indices are given in (x, y, z, c) order. Missing
+            indices select the whole axis.
+
+            Examples:
+                1. Pixel value at x=2, y=1
+                v = img.get((2, 1))
+
+                2. Rows 10 to 19 of channel 0
+                rows = img.get((slice(None), slice(10, 20), 0, 0))
+
+                3. Channel 0 sharing the memory of the image
+                channel = img.get((slice(None), slice(None), slice(None), 0), copy=False)
+
+                4. Pixel values where a boolean mask is true
+                values = img.get(img.asarray() > 0.5)
+
+            Args:
+                index: Integer, slice, integer array, or tuple of them,
+                       or a boolean array with the size of the image.
+                copy (bool): If False, regions that are contiguous in memory
+                             are returned as image sharing the memory of
+                             this image. Other regions are copied.
+                             Shared regions must not be used after
+                             operations changing the size of this image
+                             in place, e.g. resize(), which free its
+                             memory. Default: True.
+
+            Returns:
+                Pixel value if all indices are integers. Otherwise CImg
+                of the data type of the image, with pixel values selected
+                by a boolean array along the X-axis.
+
+            Raises:
+                IndexError: For invalid indices.
+        """
+        if not isinstance(index, tuple):
+            mask = self._mask(index)
+            if mask is not None:
+                return CImg(self.asarray()[mask], dtype=self.dtype)
+            index = (index,)
+        if len(index) > 4:
+            raise IndexError('Image has < 5 dimensions.')
+        if all(isinstance(idx, numbers.Integral) for idx in index):
+            return self._cimg.at(*index)
+        region = self.asarray()[self._array_index(index)]
+        if not copy and region.size and region.flags.c_contiguous:
+            return CImg(region, copy=False)
+        return CImg(region, dtype=self.dtype)
 
     def __getitem__(self, index):
-        index, is_slice = self._check_index(index)
-        if is_slice:
-            cls = type(self)
-            return cls(self.asarray()[tuple(index)])
-        else:
-            return self.asarray()[index]
+        return self.get(index)
 
     def __setitem__(self, index, value):
-        index, is_slice = self._check_index(index)
-        self.asarray()[tuple(index)] = value
+        if isinstance(value, CImg):
+            value = value.asarray()
+        if not isinstance(index, tuple):
+            mask = self._mask(index)
+            if mask is not None:
+                self.asarray()[mask] = value
+                return
+            index = (index,)
+        if len(index) > 4:
+            raise IndexError('Image has < 5 dimensions.')
+        if isinstance(value, numbers.Real) and all(isinstance(idx, numbers.Integral) for idx in index):
+            self._cimg.set_at(value, *index)
+        else:
+            self.asarray()[self._array_index(index)] = value
+
+
+def _copy_to(cimg, out):
+    """ Copy the pixel data of a CImg_* instance into out and return out.
+
+        Args:
+            cimg: CImg_* instance.
+            out: CImg or numpy array of the same shape and data type. Arrays
+                 may omit leading dimensions of size 1.
+
+        Raises:
+            RuntimeError: If shape or data type of out differ.
+    """
+    src = np.asarray(cimg)
+    dst = out.asarray() if isinstance(out, CImg) else out
+    if not isinstance(dst, np.ndarray) or dst.ndim > 4 or src.shape != (1,) * (4 - dst.ndim) + dst.shape:
+        raise RuntimeError("Output needs to be a CImg or array of shape {}.".format(src.shape))
+    if dst.dtype != src.dtype:
+        raise RuntimeError("Output needs to have data type {}.".format(src.dtype))
+    np.copyto(dst, src.reshape(dst.shape))
+    return out
+
+
+# Operations keeping the image size, which CImg computes in place. Their
+# get_* methods write into out by running them in place on a copy of the
+# image in out, instead of copying a new result image into out.
+_OUT_INPLACE = frozenset([
+    'abs', 'acos', 'asin', 'atan', 'cos', 'exp', 'log', 'log10', 'log2', 'sign', 'sin',
+    'sinc', 'sinh', 'sqr', 'sqrt', 'tan', 'tanh', 'add', 'sub', 'mul', 'div', 'floordiv',
+    'pow', 'fill', 'cut', 'threshold', 'normalize', 'quantize', 'round', 'equalize',
+    'mirror', 'cumulate', 'blur', 'blur_box', 'boxfilter', 'deriche', 'vanvliet',
+])
+
+
+def _out_target(out, cimg, dtype, args, kwargs):
+    """ Return CImg_* instance sharing the memory of out, or None if out
+        is not a contiguous image of data type dtype, or shares memory
+        with the image cimg or an image argument. """
+    if isinstance(out, CImg):
+        target = out._cimg if out.dtype == dtype else None
+    elif (isinstance(out, np.ndarray) and out.dtype == dtype and 1 <= out.ndim <= 4
+          and out.flags.c_contiguous and out.flags.writeable):
+        target = CImg(out, copy=False)._cimg
+    else:
+        return None
+    for arg in itertools.chain((cimg,), args, kwargs.values()):
+        if type(arg) in _DTYPES and np.shares_memory(np.asarray(arg), np.asarray(target)):
+            return None
+    return target
+
+
+def _into(cimg, name, target, *args, **kwargs):
+    """ Compute get_<name> of the CImg_* instance cimg into target without
+        allocating a result image. """
+    if name == 'crop':
+        cimg._crop_into(target, *args, **kwargs)
+        return
+    src, dst = np.asarray(cimg), np.asarray(target)
+    if src.shape != dst.shape:
+        raise RuntimeError("Output needs to be a CImg or array of shape {}.".format(src.shape))
+    np.copyto(dst, src)
+    getattr(target, name)(*args, **kwargs)
+
+
+# Documentation of the keyword argument out of get_* methods
+_OUT_DOC = """
+              Keyword arguments:
+                  out: CImg or numpy array with the shape and data type of the
+                       result, into which the result is written instead of
+                       returning a new image. Returned if given. get_crop()
+                       and get_* methods of operations computed in place by
+                       CImg (e.g. get_blur, get_mirror, get_sqr) write into
+                       contiguous outputs directly, other methods compute a
+                       new image and copy it into out.
+"""
+
+
+def _native_method(name, doc):
+    """ Return method of CImg calling method name of the CImg_* instance. """
+    is_get = name.startswith('get_')
+
+    def method(self, *args, **kwargs):
+        func = getattr(self._cimg, name)
+        if args:
+            # Unwrap CImg arguments
+            args = [arg._cimg if isinstance(arg, CImg) else arg for arg in args]
+        num_threads = kwargs.pop('num_threads', None) if kwargs else None
+        out = kwargs.pop('out', None) if is_get and kwargs else None
+        target = None
+        if out is not None and (name[4:] in _OUT_INPLACE or name == 'get_crop'):
+            target = _out_target(out, self._cimg, self.dtype, args, kwargs)
+            if target is not None:
+                func = functools.partial(_into, self._cimg, name[4:], target)
+        if _profiler is not None:
+            func = _profiler.wrap(self, name, func)
+        if num_threads is None:
+            r = func(*args, **kwargs)
+        else:
+            with threads(num_threads):
+                r = func(*args, **kwargs)
+        if target is not None:
+            return out
+        if type(r) in _DTYPES:
+            # get_* methods return a new image
+            if is_get:
+                if out is not None:
+                    return _copy_to(r, out)
+                return CImg._fromcimg(r)
+            self._cimg = r
+            return self
+        return r
+
+    method.__name__ = name
+    method.__qualname__ = 'CImg.' + name
+    method.__doc__ = doc + _OUT_DOC if is_get and doc else doc
+    return method
+
+
+# Add the methods of the CImg_* classes to CImg once, instead of
+# looking them up and wrapping them on every call. The classes of
+# all data types share the methods of the default type float32.
+for _name, _func in vars(_native_class(float32)).items():
+    if not _name.startswith('_') and not hasattr(CImg, _name):
+        setattr(CImg, _name, _native_method(_name, getattr(_func, '__doc__', None)))
+del _name, _func
+
+
+class Pipeline:
+    """ Sequence of operations applied to images in a single native call.
+
+        The arguments of the operations are validated when they are added.
+        Running the pipeline does not hold the GIL, and operations keeping
+        the image size work in place on the same buffer.
+
+        The values of fill, normalize, cut, threshold and equalize are
+        converted to the data type of each image it is run on. Values are
+        truncated and clamped to the range of integer data types, e.g.
+        ('threshold', 0.5) thresholds uint8 images at 0.
+
+        Supported operations are the CImg methods resize, resize_halfXY,
+        resize_doubleXY, resize_tripleXY, crop, mirror, shift, rotate,
+        permute_axes, blur, blur_box, blur_median, deriche, vanvliet,
+        sharpen, fill, normalize, cut, quantize, threshold, equalize,
+        round, pow, the arithmetic add, sub, mul, div, floordiv with a
+        value, and the pointwise functions sqr, sqrt, exp, log, log2, log10,
+        abs, sign, cos, sin, sinc, tan, sinh, tanh, acos, asin, and atan.
+
+        Examples:
+            1. Create pipeline from a list of operations
+            p = Pipeline([('resize', 256, 256), ('blur', 2.5),
+                          ('normalize', 0, 255), ('threshold', 128)])
+
+            2. Create pipeline by chaining operations
+            p = Pipeline().resize(256, 256).blur(2.5, is_gaussian=True)
+
+            3. Apply pipeline to an image and to a batch of images
+            res = p.run(img)
+            results = p.map(images, workers=4)
+
+        Args:
+            ops: Operations as method names, or tuples of the method name
+                 followed by its arguments. A dict as last element of a
+                 tuple holds keyword arguments.
+
+        Raises:
+            RuntimeError: If an operation is not supported.
+            TypeError: If the arguments of an operation are invalid.
+    """
+
+    def __init__(self, ops=()):
+        self._ops = []
+        self._native = {}
+        for op in ops:
+            if isinstance(op, str):
+                self.append(op)
+            else:
+                name, *args = op
+                kwargs = args.pop() if args and isinstance(args[-1], dict) else {}
+                self.append(name, *args, **kwargs)
+
+    @staticmethod
+    def _add(native, name, args, kwargs):
+        """ Append operation name to native pipeline. """
+        if name.startswith('_') or name in ('run', 'get_run', 'map') or not hasattr(native, name):
+            raise RuntimeError("Operation '{}' is not supported in pipelines.".format(name))
+        getattr(native, name)(*args, **kwargs)
+
+    def _compile(self, dtype):
+        """ Return native pipeline for images of data type dtype. """
+        native = self._native.get(dtype)
+        if native is None:
+            native = _native_class(dtype, 'Pipeline')()
+            for name, args, kwargs in self._ops:
+                self._add(native, name, args, kwargs)
+            self._native[dtype] = native
+        return native
+
+    def append(self, name, *args, **kwargs):
+        """ Append operation to the pipeline.
+
+            Args:
+                name (str): Method name of operation.
+
+            Further arguments:
+                Arguments of the method.
+
+            Raises:
+                RuntimeError: If the operation is not supported.
+                TypeError: If the arguments are invalid.
+        """
+        # Validate the operation by compiling it for float32 images,
+        # pipelines of other data types are compiled again when run.
+        native = self._compile(float32)
+        self._add(native, name, args, kwargs)
+        self._ops.append((name, args, kwargs))
+        self._native = {float32: native}
+        return self
+
+    def __getattr__(self, attr):
+        if attr.startswith('_'):
+            raise AttributeError(attr)
+        return functools.partial(self.append, attr)
+
+    def __len__(self):
+        return len(self._ops)
+
+    def run(self, img, inplace=False, out=None):
+        """ Apply the pipeline to an image.
+
+            Args:
+                img: CImg or numpy array.
+                inplace (bool): If True, modify the CImg instead of
+                                returning a new image. Default: False.
+                out: CImg or numpy array with the shape and data type of
+                     the result, into which the result is copied instead
+                     of returning a new image. Default: None.
+
+            Returns:
+                Processed image, or out if given.
+
+            Raises:
+                RuntimeError: If shape or data type of out differ, or
+                              inplace is True for a numpy array.
+        """
+        if not isinstance(img, CImg):
+            if inplace:
+                raise RuntimeError('In-place processing needs a CImg.')
+            img = CImg(img)
+        native = self._compile(img.dtype)
+        if inplace:
+            native.run(img._cimg)
+            return img
+        if out is not None:
+            return _copy_to(native.get_run(img._cimg), out)
+        return CImg._fromcimg(native.get_run(img._cimg))
+
+    def map(self, images, workers=None):
+        """ Apply the pipeline to images concurrently.
+
+            The images are processed in native threads without holding
+            the GIL. Use threads() to limit the number of threads of each
+            operation.
+
+            Args:
+                images: CImg or numpy arrays.
+                workers (int): Number of threads processing images.
+                               Default: number of CPUs.
+
+            Returns:
+                List of processed images in the order of images.
+        """
+        images = [img if isinstance(img, CImg) else CImg(img) for img in images]
+        if workers is None:
+            workers = os.cpu_count() or 1
+        results = [None] * len(images)
+        for dtype in set(img.dtype for img in images):
+            indices = [i for i, img in enumerate(images) if img.dtype == dtype]
+            outputs = self._compile(dtype).map([images[i]._cimg for i in indices], max(1, workers))
+            for i, output in zip(indices, outputs):
+                results[i] = CImg._fromcimg(output)
+        return results
+
+
+@contextlib.contextmanager
+def threads(n):
+    """ Context manager setting the number of threads used by
+        parallelized operations called from the current thread.
+
+        The number of threads of a single operation can be set with
+        its num_threads keyword argument, e.g. img.blur(5, num_threads=2).
+
+        Example:
+            with threads(2):
+                img.blur(5)
+
+        Args:
+            n (int): Number of threads. 0 uses the number of
+                     threads set by set_num_threads().
+
+        Raises:
+            RuntimeError: If n is negative.
+    """
+    previous = _set_local_num_threads(n)
+    try:
+        yield
+    finally:
+        _set_local_num_threads(previous)
+
+
+@contextlib.contextmanager
+def buffer_pool(max_bytes):
+    """ Context manager reusing the pixel buffers of released images
+        for new images, e.g. for processing frames of the same size.
+
+        Buffers of at least 64 KiB are kept in buckets of similar size
+        and evicted least recently released first, if more than max_bytes
+        are held. The pool is shared by all threads. Use
+        buffer_pool_stats() to check the hits and misses of the pool.
+
+        Example:
+            with buffer_pool(256 * 2**20):
+                for frame in frames:
+                    CImg(frame).resize(640, 480).blur(2)
+
+        Args:
+            max_bytes (int): Maximum size of the buffers held by the pool.
+
+        Raises:
+            RuntimeError: If max_bytes is negative.
+    """
+    previous = buffer_pool_stats()['max_bytes']
+    set_buffer_pool_size(max_bytes)
+    try:
+        yield
+    finally:
+        set_buffer_pool_size(previous)
+
+
+class Profile:
+    """ Statistics of the CImg methods called while profiling. """
+
+    def __init__(self, trace=True):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self._events = [] if trace else None
+        self._start = time.perf_counter()
+
+    def wrap(self, img, name, func):
+        """ Return func recording the statistics of calls of method name on img. """
+        def call(*args, **kwargs):
+            cimg = img._cimg
+            shape = img.shape
+            data = _data_pointer(cimg)
+            gil = _gil_released_time()
+            cpu = time.process_time()
+            wall = time.perf_counter()
+            try:
+                return_value = func(*args, **kwargs)
+            finally:
+                end = time.perf_counter()
+                cpu = time.process_time() - cpu
+                gil = _gil_released_time() - gil
+            nbytes = 0
+            if type(return_value) in _DTYPES:
+                if return_value is not cimg or _data_pointer(cimg) != data:
+                    nbytes = return_value.size() * np.dtype(_DTYPES[type(return_value)]).itemsize
+            self._record(name, shape, np.dtype(img.dtype).name, wall, end, cpu, gil, nbytes)
+            return return_value
+        return call
+
+    def _record(self, name, shape, dtype, start, end, cpu, gil, nbytes):
+        with self._lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = {'calls': 0, 'wall_time': 0.0, 'cpu_time': 0.0,
+                                             'gil_released_time': 0.0, 'bytes_allocated': 0,
+                                             'inputs': {}}
+            stats['calls'] += 1
+            stats['wall_time'] += end - start
+            stats['cpu_time'] += cpu
+            stats['gil_released_time'] += gil
+            stats['bytes_allocated'] += nbytes
+            stats['inputs'][shape, dtype] = stats['inputs'].get((shape, dtype), 0) + 1
+            if self._events is not None:
+                self._events.append({
+                    'name': name, 'cat': 'pycimg', 'ph': 'X',
+                    'ts': (start - self._start) * 1e6, 'dur': (end - start) * 1e6,
+                    'pid': os.getpid(), 'tid': threading.get_ident(),
+                    'args': {'shape': list(shape), 'dtype': dtype, 'cpu_time': cpu,
+                             'gil_released_time': gil, 'bytes_allocated': nbytes},
+                })
+
+    def stats(self):
+        """ Return the statistics per method name.
+
+            Returns:
+                dict of method name and dict with the keys
+                calls, wall_time, cpu_time, gil_released_time (in seconds),
+                bytes_allocated (by new or resized images), and inputs
+                (dict of (shape, dtype) of the image and number of calls).
+                The CPU time includes all threads of the process.
+        """
+        with self._lock:
+            return {name: dict(stats, inputs=dict(stats['inputs'])) for name, stats in self._stats.items()}
+
+    def trace(self):
+        """ Return the calls in the Chrome trace event format.
+
+            Returns:
+                dict with the list of events under the key traceEvents.
+
+            Raises:
+                RuntimeError: If the profile was created with trace=False.
+        """
+        if self._events is None:
+            raise RuntimeError('Profile does not record a trace.')
+        with self._lock:
+            return {'traceEvents': list(self._events), 'displayTimeUnit': 'ms'}
+
+    def save_trace(self, filename):
+        """ Save the calls as a Chrome trace JSON file, which can be
+            opened in chrome://tracing or https://ui.perfetto.dev.
+
+            Args:
+                filename (str): Filename of trace.
+
+            Raises:
+                RuntimeError: If the profile was created with trace=False.
+        """
+        import json
+        trace = self.trace()
+        with open(filename, 'w') as f:
+            json.dump(trace, f)
+
+
+def _data_pointer(cimg):
+    """ Return the address of the pixel data of a CImg_* instance. """
+    return np.asarray(cimg).ctypes.data if cimg.size() else 0
+
+
+# Profile recording the calls of CImg methods, None if not profiling
+_profiler = None
+
+
+@contextlib.contextmanager
+def profile(trace=True):
+    """ Context manager profiling the CImg methods called from all threads.
+
+        For each method, the number of calls, wall and CPU time, the time
+        running without the GIL, the bytes allocated for new or resized
+        images, and the shapes and data types of the images are recorded.
+        Profiling can be enabled for the whole process by setting the
+        environment variable PYCIMG_PROFILE to the filename of a trace,
+        which is saved at exit.
+
+        Example:
+            with profile() as prof:
+                img.blur(5)
+            print(prof.stats()['blur'])
+            prof.save_trace('trace.json')
+
+        Args:
+            trace (bool): If True, record every call for save_trace().
+                          Default: True.
+
+        Returns:
+            Profile
+    """
+    global _profiler
+    previous = _profiler
+    _profiler = Profile(trace)
+    _set_gil_timing(True)
+    try:
+        yield _profiler
+    finally:
+        _profiler = previous
+        _set_gil_timing(previous is not None)
+
+
+def load_many(paths, dtype=float32, workers=None, stack=False):
+    """ Load images from files concurrently.
+
+        The files are decoded in native threads without holding the GIL.
+
+        Args:
+            paths: Filenames of images.
+            dtype: Data type of images. Default: float32.
+            workers (int): Number of threads used for loading.
+                           Default: number of CPUs.
+            stack (bool): If True, return the pixel data of all images as
+                          one numpy array of shape
+                          (len(paths), spectrum, depth, height, width).
+                          Default: False.
+
+        Returns:
+            List of CImg in the order of paths, or a numpy array if stack
+            is True.
+
+        Raises:
+            RuntimeError: If a file cannot be loaded, or if stack is True
+                          and the images do not have the same shape.
+    """
+    cls = type(CImg(dtype=dtype)._cimg)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    images = [CImg._fromcimg(img) for img in
+              cls.load_many([os.fspath(path) for path in paths], max(1, workers))]
+    if not stack:
+        return images
+    if len(set(img.shape for img in images)) > 1:
+        raise RuntimeError('Images need to have the same shape to be stacked.')
+    if not images:
+        return np.empty((0, 1, 1, 1, 1), dtype=dtype)
+    return np.stack([img.asarray() for img in images])
+
+
+def tiff_info(filename):
+    """ Return information about a TIFF file without decoding pixel data.
+
+        Args:
+            filename (str): Filename of image.
+
+        Returns:
+            dict with the number of frames, and the width, height,
+            spectrum, bits_per_sample, and dtype of the first frame.
+
+        Raises:
+            RuntimeError: If file cannot be opened.
+    """
+    tiff = TiffFile(os.fspath(filename))
+    try:
+        return tiff.info()
+    finally:
+        tiff.close()
+
+
+# Profile the whole process if PYCIMG_PROFILE is set to the filename of a trace
+if os.environ.get('PYCIMG_PROFILE'):
+    _profiler = Profile()
+    _set_gil_timing(True)
+    atexit.register(_profiler.save_trace, os.environ['PYCIMG_PROFILE'])
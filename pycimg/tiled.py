@@ -0,0 +1,236 @@
+""" Tiled processing of images larger than memory.
+
+    Example:
+        from pycimg import tiled
+        # Blur a large .cimg volume tile by tile into another .cimg file
+        tiled.apply('volume.cimg', 'blur', 2.5, out='blurred.cimg', workers=4)
+"""
+import math
+import os
+import tempfile
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from .pycimg import CImg, TiffFile, _PIXEL_TYPES, _create_cimg_file, float32
+
+# Number of standard deviations covered by the halo of recursive
+# (blur, deriche, vanvliet) filters. Their boundary effects decay exponentially,
+# so that the result matches the in-memory filter up to rounding errors.
+RECURSIVE_SUPPORT = 10
+
+
+def _kernel_halo(kernel, *args, xdilation=1, ydilation=1, **kwargs):
+    return kernel.width * abs(xdilation), kernel.height * abs(ydilation)
+
+
+def _sigma_halo(sigma):
+    if sigma < 0:
+        raise RuntimeError('Relative filter sizes are not supported for tiled processing.')
+    return int(math.ceil(RECURSIVE_SUPPORT * sigma))
+
+
+def _axis_halo(halo, axis):
+    return (halo if axis in 'xX' else 0, halo if axis in 'yY' else 0)
+
+
+def _blur_halo(sigma, *args, **kwargs):
+    halo = _sigma_halo(sigma)
+    return halo, halo
+
+
+def _recursive_halo(sigma, order=0, axis='x', *args, **kwargs):
+    return _axis_halo(_sigma_halo(sigma), axis)
+
+
+def _blur_box_halo(boxsize, *args, **kwargs):
+    if boxsize < 0:
+        raise RuntimeError('Relative filter sizes are not supported for tiled processing.')
+    halo = int(math.ceil(boxsize))
+    return halo, halo
+
+
+def _boxfilter_halo(boxsize, order, axis='x', boundary_conditions=True, nb_iter=1):
+    halo, _ = _blur_box_halo(boxsize)
+    return _axis_halo(halo * max(1, nb_iter), axis)
+
+
+def _median_halo(n, *args, **kwargs):
+    return n, n
+
+
+# Functions returning the halo (x, y) of operations from their arguments
+HALOS = {
+    'blur': _blur_halo,
+    'blur_box': _blur_box_halo,
+    'blur_median': _median_halo,
+    'boxfilter': _boxfilter_halo,
+    'convolve': _kernel_halo,
+    'correlate': _kernel_halo,
+    'deriche': _recursive_halo,
+    'dilate': _kernel_halo,
+    'erode': _kernel_halo,
+    'vanvliet': _recursive_halo,
+}
+
+
+def _halo(op, halo, args, kwargs):
+    """ Return halo (x, y) of operation op. """
+    if halo == 'auto':
+        if callable(op) or op not in HALOS:
+            raise RuntimeError("Halo of operation '{}' needs to be given.".format(op))
+        return HALOS[op](*args, **kwargs)
+    if isinstance(halo, int):
+        return halo, halo
+    return tuple(halo)
+
+
+def _run(op, img, args, kwargs):
+    """ Apply operation op to img and return the result. """
+    if callable(op):
+        res = op(img, *args, **kwargs)
+        return img if res is None else res
+    return getattr(img, op)(*args, **kwargs)
+
+
+class _Source:
+    """ Image to process, opened from a CImg, numpy array, or file. """
+
+    def __init__(self, src):
+        self._tmpfile = None
+        if isinstance(src, CImg):
+            self.img = src
+        elif isinstance(src, np.ndarray):
+            self.img = CImg(src, copy=False)
+        elif os.path.splitext(os.fspath(src))[1].lower() in ('.tif', '.tiff'):
+            self.img = self._open_tiff(os.fspath(src))
+        else:
+            self.img = CImg.open_memmap(src)
+
+    def _open_tiff(self, filename):
+        # TIFF frames cannot be read partially, so they are decoded one
+        # at a time into a temporary memory-mapped .cimg file.
+        tiff = TiffFile(filename)
+        try:
+            info = tiff.info()
+            dtype = next((t for t in _PIXEL_TYPES if np.dtype(t).name == info['dtype']), float32)
+            fd, self._tmpfile = tempfile.mkstemp(suffix='.cimg')
+            os.close(fd)
+            shape = (info['spectrum'], info['frames'], info['height'], info['width'])
+            _create_cimg_file(self._tmpfile, shape, dtype)
+            img = CImg.open_memmap(self._tmpfile, mode='r+')
+            arr = img.asarray()
+            frame = CImg(dtype=dtype)
+            for z in range(info['frames']):
+                frame._cimg.load_tiff_frames(tiff, z, 1)
+                arr[:frame.spectrum, z:z + 1, :frame.height, :frame.width] = frame.asarray()
+            return img
+        finally:
+            tiff.close()
+
+    def close(self):
+        # The memory map of the temporary file is released with the last
+        # reference to the image, files in use cannot be removed on Windows.
+        self.img = None
+        if self._tmpfile is not None:
+            try:
+                os.remove(self._tmpfile)
+            except OSError as e:
+                warnings.warn('Temporary file {} could not be removed: {}'.format(self._tmpfile, e))
+            self._tmpfile = None
+
+
+def apply(src, op, *args, tile=(1024, 1024), halo='auto', out=None, workers=1, **kwargs):
+    """ Apply an operation to an image tile by tile.
+
+        The image is split into tiles in the xy-plane, each tile spanning
+        the full depth and spectrum. Every tile is cropped with a halo of
+        neighboring pixels, processed, and its interior is written to the
+        output. Only the tiles in process are held in memory.
+
+        Linear filters with finite support (convolve, correlate) and
+        morphological filters (erode, dilate, blur_median) give results
+        identical to the in-memory operation. Recursive filters (blur,
+        blur_box, boxfilter, deriche, vanvliet) match up to rounding
+        errors.
+
+        Args:
+            src: Image to process. Either a CImg, a numpy array, or the
+                 filename of a .cimg or TIFF file. .cimg files are
+                 memory-mapped, TIFF files are decoded frame by frame
+                 into a temporary .cimg file.
+            op: Name of a CImg method, e.g. 'blur', or a function taking
+                a CImg and returning the processed CImg. The operation
+                needs to preserve width and height of the image.
+            args: Positional arguments of the operation.
+            tile (tuple): Tile size (width, height). Default: (1024, 1024).
+            halo: Halo size as int or (x, y) tuple. 'auto' derives the
+                  halo from the arguments of the operations blur,
+                  blur_box, blur_median, boxfilter, convolve, correlate,
+                  deriche, dilate, erode, and vanvliet. Default: 'auto'.
+            out (str): Filename of a .cimg file the result is written
+                       to. If None, the result is kept in memory.
+                       Default: None.
+            workers (int): Number of threads processing tiles.
+                           Default: 1.
+            kwargs: Keyword arguments of the operation.
+
+        Returns:
+            CImg with the result, memory-mapped from out if given.
+
+        Raises:
+            RuntimeError: If the image is empty, the halo cannot be
+                          derived, or the operation changes the image
+                          size.
+    """
+    hx, hy = _halo(op, halo, args, kwargs)
+    tw, th = tile
+    source = _Source(src)
+    img = None
+    try:
+        img = source.img
+        if img.size == 0:
+            raise RuntimeError('Image is empty.')
+        width, height = img.width, img.height
+        tiles = [(x0, y0, min(x0 + tw, width), min(y0 + th, height))
+                 for y0 in range(0, height, th) for x0 in range(0, width, tw)]
+
+        def process(t):
+            x0, y0, x1, y1 = t
+            ex0, ey0 = max(0, x0 - hx), max(0, y0 - hy)
+            ex1, ey1 = min(width, x1 + hx), min(height, y1 + hy)
+            region = img.get_crop(ex0, ey0, 0, 0, ex1 - 1, ey1 - 1, img.depth - 1, img.spectrum - 1)
+            res = _run(op, region, args, kwargs)
+            if (res.width, res.height) != (ex1 - ex0, ey1 - ey0):
+                raise RuntimeError('Operation needs to preserve width and height of the image.')
+            return res.asarray()[:, :, y0 - ey0:y1 - ey0, x0 - ex0:x1 - ex0]
+
+        # The first tile defines spectrum, depth and data type of the result
+        first = process(tiles[0])
+        shape = (first.shape[0], first.shape[1], height, width)
+        if out is None:
+            res = CImg(np.empty(shape, dtype=first.dtype), copy=False)
+        else:
+            _create_cimg_file(out, shape, first.dtype)
+            res = CImg.open_memmap(out, mode='r+')
+        arr = res.asarray()
+
+        def store(t, data):
+            x0, y0, x1, y1 = t
+            arr[:, :, y0:y1, x0:x1] = data
+
+        store(tiles[0], first)
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(lambda t: store(t, process(t)), tiles[1:]))
+        else:
+            for t in tiles[1:]:
+                store(t, process(t))
+        return res
+    finally:
+        # Drop the reference of process() to the source image before closing it
+        img = None
+        source.close()
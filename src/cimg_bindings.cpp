@@ -1,6 +1,25 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/numpy.h>
 #include <pybind11/operators.h>
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <cctype>
+#include <chrono>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <deque>
+#include <exception>
+#include <functional>
+#include <list>
+#include <mutex>
+#include <new>
+#include <string>
+#include <thread>
+#include <unordered_map>
+#include <utility>
+#include <vector>
 
 #define cimg_use_zlib 1
 #define cimg_use_jpeg 1
@@ -10,6 +29,18 @@
 #define cimg_use_openmp 1
 #define cimg_verbosity 1
 #endif
+
+// Half-precision floats are stored as float16 and computed in float,
+// if supported by the compiler.
+#ifdef __FLT16_MAX__
+#define cimg_use_half 1
+typedef _Float16 half;
+#endif
+
+// Factor scaling the minimum image sizes from which CImg runs loops in
+// parallel (see cimg_openmp_if_size), set by set_parallel_size_factor().
+static std::atomic<double> openmp_size_factor(1.0);
+#define cimg_openmp_sizefactor openmp_size_factor.load(std::memory_order_relaxed)
 #include <CImg.h>
 
 using namespace cimg_library;
@@ -19,1390 +50,5020 @@ using namespace cimg_library;
 
 namespace py = pybind11;
 
+#ifdef cimg_use_half
+// Conversion of half-precision floats from and to python floats and
+// numpy float16 arrays.
+namespace pybind11 { namespace detail {
 
-// Helper function to create CImg<T> from a python array.
-template <typename T>
-CImg<T> fromarray(py::array_t<T, py::array::c_style | py::array::forcecast> a)
+template <> struct type_caster<half>
 {
-    auto dims = a.ndim();
-    if (dims < 1)
-        throw std::runtime_error("Array should have at least 1 dimension.");
-    if (dims > 4)
-        throw std::runtime_error("Array should have less than 4 dimensions.");
+    PYBIND11_TYPE_CASTER(half, const_name("float"));
 
-    auto shape = a.shape();
-    if (dims == 1)
-    {
-        return CImg<T>(a.data(), shape[0]);
-    }
-    else if (dims == 2)
+    bool load(handle src, bool convert)
     {
-        return CImg<T>(a.data(), shape[1], shape[0]);
+        type_caster<float> caster;
+        if (!caster.load(src, convert))
+            return false;
+        value = (half)(float)caster;
+        return true;
     }
-    else if (dims == 3)
+
+    static handle cast(const half src, return_value_policy, handle)
     {
-        return CImg<T>(a.data(), shape[2], shape[1], shape[0]);
+        return PyFloat_FromDouble((double)src);
     }
-    return CImg<T>(a.data(), shape[3], shape[2], shape[1], shape[0]);
-}
+};
 
-// Declare CImg class of pixel type T
-template <typename T>
-void declare(py::module &m, const std::string &typestr)
+template <> struct npy_format_descriptor<half>
 {
-    using pyarray = py::array_t<T, py::array::c_style | py::array::forcecast>;
-    using pyarray_float = py::array_t<float, py::array::c_style | py::array::forcecast>;
-
-    using Class = CImg<T>;
-    using Tfloat = typename CImg<T>::Tfloat;
-    using ulongT = typename CImg<T>::ulongT;
-    std::string pyclass_name = std::string("CImg_") + typestr;
-    py::class_<Class> cl(m, pyclass_name.c_str(), py::buffer_protocol());
+    static constexpr auto name = const_name("numpy.float16");
+    static pybind11::dtype dtype() { return pybind11::dtype("float16"); }
+};
 
+} // namespace detail
 
-    // Constructor
-    cl.def(py::init<>());
+template <> struct format_descriptor<half>
+{
+    static constexpr const char c = 'e';
+    static constexpr const char value[2] = {c, '\0'};
+    static std::string format() { return std::string(1, c); }
+};
 
-    cl.def("fromarray",
-           [](Class& im, pyarray a) { im = fromarray<T>(a); },
-           "Create CImg from array.");
+} // namespace pybind11
+#endif
 
-    // Operators
-    cl.def(py::self == py::self);
-    cl.def(py::self != py::self);
+#if cimg_use_openmp!=0
+// Number of threads of OpenMP teams when no thread count is set.
+static const int openmp_default_threads = omp_get_max_threads();
+#endif
 
-    // Load 
-    cl.def("load", 
-           &Class::load, 
-           R"doc(
-            Load image from a file.
+// Number of threads of OpenMP teams set by set_num_threads() for all
+// threads, and by threads() for the calling thread. 0 if not set.
+static std::atomic<int> global_num_threads(0);
+static thread_local int local_num_threads = 0;
 
-            Args:
-                filename (str): Filename of image.
-            Raises:
-                RuntimeError: If file does not exist.
-           )doc"        
-    );
+// Helper function to return the number of threads of OpenMP teams
+// started from the calling thread.
+inline int num_threads()
+{
+#if cimg_use_openmp!=0
+    if (local_num_threads > 0)
+        return local_num_threads;
+    const int n = global_num_threads.load(std::memory_order_relaxed);
+    return n > 0 ? n : openmp_default_threads;
+#else
+    return 1;
+#endif
+}
 
-    cl.def("load_bmp", 
-           (Class &(Class::*)(const char* const))&Class::load_bmp,
-           R"doc(
-            Load image from a BMP file.
+// Helper function to let OpenMP teams started from the calling
+// thread use n threads.
+inline void use_num_threads(const int n)
+{
+#if cimg_use_openmp!=0
+    omp_set_num_threads(n);
+#else
+    (void)n;
+#endif
+}
 
-            Args:
-                filename (str): Filename of image.
-            Raises:
-                RuntimeError: If file does not exist.
-           )doc"
-    );
+// Time in seconds that native calls of the current thread ran without
+// the GIL, measured while profiling is enabled by set_gil_timing().
+static std::atomic<bool> gil_timing(false);
+static thread_local double gil_released_seconds = 0;
 
-    cl.def("load_jpeg", 
-           (Class &(Class::*)(const char* const))&Class::load_jpeg,
-           R"doc(
-            Load image from a JPEG file.
+// Scope releasing the GIL while a binding runs in native code. OpenMP
+// teams started within the scope use num_threads() threads.
+class native_scope
+{
+public:
+    native_scope() : _timed(gil_timing.load(std::memory_order_relaxed))
+    {
+        use_num_threads(num_threads());
+        if (_timed)
+            _start = std::chrono::steady_clock::now();
+    }
 
-            Args:
-                filename (str): Filename of image.
-            Raises:
-                RuntimeError: If file does not exist.
-           )doc"
-    );
+    ~native_scope()
+    {
+        if (_timed)
+            gil_released_seconds += std::chrono::duration<double>(std::chrono::steady_clock::now() - _start).count();
+    }
 
-    cl.def("load_png", 
-           (Class& (Class::*)(const char* const, unsigned int *const))&Class::load_png,
-           R"doc(
-              Load image from a PNG file.
+private:
+    py::gil_scoped_release _release;
+    bool _timed;
+    std::chrono::steady_clock::time_point _start;
+};
+
+// Call guard releasing the GIL while a binding runs in native code.
+// Bindings taking python objects (e.g. arrays) by value must not use it,
+// since their arguments are copied without holding the GIL. These
+// release the GIL themselves with a native_scope in their body.
+using release_gil = py::call_guard<native_scope>;
+
+// Pool of pixel buffers. CImg allocates and frees pixel data with new[]
+// and delete[], which are replaced below for this module. While the pool
+// is enabled, released buffers of at least min_bytes are kept in buckets
+// of similar size and reused by later allocations, evicting the least
+// recently released buffers if more than max_bytes are held.
+//
+// The replacements are not exported from the module (see CMakeLists.txt),
+// so that they neither interpose on the allocations of other libraries
+// nor are interposed by the operators of the C++ runtime.
+class BufferPool
+{
+public:
+    static constexpr size_t min_bytes = size_t(1) << 16;
 
-              Args:
-                  filename (str): Filename of image.
-              Returns:
-                  Bits per pixel
-              Raises:
-                  RuntimeError: If file does not exist.
-           )doc",
-           py::arg("filename"),
-           py::arg("bits_per_pixel") = 0
-    );
+    // The pool is never destroyed, since buffers may be released
+    // during the destruction of static objects.
+    static BufferPool& instance()
+    {
+        static BufferPool* pool = new BufferPool();
+        return *pool;
+    }
 
-    cl.def("load_tiff", 
-           [](Class& im,  const char* const filename, const unsigned int first_frame, const unsigned int last_frame, const unsigned int step_frame)
-           {
-               return im.load_tiff(filename, first_frame, last_frame, step_frame);
-           },
-           R"doc(
-            Load image from a TIFF file.
+    void* allocate(const size_t n)
+    {
+        // Buffers are only rounded up to the bucket size while the pool is enabled
+        const bool pooled = _max_bytes.load(std::memory_order_relaxed) != 0;
+        const size_t capacity = pooled ? bucket(n) : n;
+        if (pooled && capacity >= min_bytes)
+        {
+            std::lock_guard<std::mutex> lock(_mutex);
+            auto it = _buckets.find(capacity);
+            if (it != _buckets.end() && !it->second.empty())
+            {
+                const auto block = it->second.back();
+                it->second.pop_back();
+                void* p = block->data;
+                _lru.erase(block);
+                _bytes_held -= capacity;
+                ++_hits;
+                return p;
+            }
+            ++_misses;
+        }
+        void* p = std::malloc(capacity + sizeof(Header));
+        if (!p)
+            throw std::bad_alloc();
+        static_cast<Header*>(p)->capacity = capacity;
+        return static_cast<Header*>(p) + 1;
+    }
 
-            Args:
-                filename (str): Filename of image.
-                first_frame: First frame to read (for multi-pages tiff).
-                last_frame: Last frame to read (for multi-pages tiff).
-                step_frame: Step value of frame reading.
-            Returns:
-                Voxel size, as stored in the filename.
-            Raises:
-                RuntimeError: If file does not exist.
-           )doc",
-           py::arg("filename"),
-           py::arg("first_frame") = 0,
-           py::arg("last_frame") = ~0U,
-           py::arg("step_frame") = 1
-    );
+    void release(void* p) noexcept
+    {
+        if (!p)
+            return;
+        Header* header = static_cast<Header*>(p) - 1;
+        const size_t capacity = header->capacity;
+        if (capacity >= min_bytes && capacity <= _max_bytes.load(std::memory_order_relaxed) &&
+            capacity == bucket(capacity))
+        {
+            std::lock_guard<std::mutex> lock(_mutex);
+            try
+            {
+                _lru.push_front({p, capacity});
+                _buckets[capacity].push_back(_lru.begin());
+                _bytes_held += capacity;
+                evict(_max_bytes);
+                return;
+            }
+            catch (...)
+            {
+                if (!_lru.empty() && _lru.front().data == p)
+                    _lru.pop_front();
+            }
+        }
+        std::free(header);
+    }
 
-    // Save
-    cl.def("save", 
-           &Class::save,
-           R"doc(
-              Save image as a file.
+    void set_max_bytes(const size_t max_bytes)
+    {
+        std::lock_guard<std::mutex> lock(_mutex);
+        _max_bytes = max_bytes;
+        evict(max_bytes);
+    }
 
-              The used file format is defined by the file extension
-              in the filename.
+    void clear()
+    {
+        std::lock_guard<std::mutex> lock(_mutex);
+        evict(0);
+    }
 
-              Args:
-                  filename (str): Filneame of image.
-                  number: When positive, represents an index added to the filename.
-                          Otherwise, no number is added.
-                  digits: Number of digits used for adding the number to the filename.
-           )doc",
-           py::arg("filename"),
-           py::arg("number") = -1,
-           py::arg("digits") = 6
-    );
+    py::dict stats()
+    {
+        std::lock_guard<std::mutex> lock(_mutex);
+        py::dict res;
+        res["max_bytes"] = _max_bytes.load();
+        res["bytes_held"] = _bytes_held;
+        res["buffers_held"] = _lru.size();
+        res["hits"] = _hits;
+        res["misses"] = _misses;
+        res["evictions"] = _evictions;
+        return res;
+    }
 
-    cl.def("save_bmp", 
-           (const Class& (Class::*)(const char* const) const)&Class::save_bmp,
-           R"doc(
-             Save image as a BMP file.
+private:
+    // Header before the pixel data, keeping its alignment
+    struct alignas(alignof(std::max_align_t)) Header { size_t capacity; };
 
-             Args:
-                filename (str): Filename of image.
-           )doc"
-    );
+    struct Block { void* data; size_t capacity; };
 
-    cl.def("save_jpeg", 
-           (const Class& (Class::*)(const char* const, const unsigned int) const)&Class::save_jpeg,
-           R"doc(
-              Save image as a JPEG file.
+    // Return the capacity of the bucket of n bytes. Sizes of at least
+    // min_bytes are rounded up to 8 buckets per power of two.
+    static size_t bucket(const size_t n)
+    {
+        if (n < min_bytes)
+            return n;
+        size_t step = min_bytes >> 3;
+        while ((step << 4) <= n)
+            step <<= 1;
+        return (n + step - 1) / step * step;
+    }
 
-              Args:
-                  filename (str): Filename of image.
-                  quality: Image quality (in %).
-           )doc",
-           py::arg("filename"),
-           py::arg("quality") = 100
-    );
+    // Free the least recently released buffers until at most
+    // max_bytes are held. Needs to be called with the mutex locked.
+    void evict(const size_t max_bytes)
+    {
+        while (_bytes_held > max_bytes)
+        {
+            const Block block = _lru.back();
+            auto& bucket = _buckets[block.capacity];
+            // The least recently released buffer is the first of its bucket
+            bucket.pop_front();
+            _lru.pop_back();
+            _bytes_held -= block.capacity;
+            ++_evictions;
+            std::free(static_cast<Header*>(block.data) - 1);
+        }
+    }
 
-    cl.def("save_png", 
-           (const Class& (Class::*)(const char* const, const unsigned int) const)&Class::save_png,
-           R"doc(
-              Save image as a PNG file.
+    std::mutex _mutex;
+    std::atomic<size_t> _max_bytes{0};
+    size_t _bytes_held = 0;
+    size_t _hits = 0, _misses = 0, _evictions = 0;
+    std::list<Block> _lru;
+    std::unordered_map<size_t, std::deque<std::list<Block>::iterator>> _buckets;
+};
 
-              Args:
-                  filename (str): Filename of image.
-                  bytes_per_pixel: Force the number of bytes per pixels for
-                                   saving, when possible.
-           )doc",
-           py::arg("filename"),
-           py::arg("bytes_per_pixel") = 0
-    );
+void* operator new[](std::size_t n)
+{
+    return BufferPool::instance().allocate(n);
+}
 
-    cl.def("save_tiff", 
-           [](const Class& im, const char* const filename, const unsigned int compression_type, pyarray_float voxel_size, const char* const description, bool use_bigtiff)
-           {
-               return im.save_tiff(filename, compression_type, voxel_size.size() == 0 ? 0 : voxel_size.data(), description, use_bigtiff);
-           },
-           R"doc(
-              Save image as a TIFF file.
+void* operator new[](std::size_t n, const std::nothrow_t&) noexcept
+{
+    try
+    {
+        return BufferPool::instance().allocate(n);
+    }
+    catch (...)
+    {
+        return nullptr;
+    }
+}
 
-              Args:
-                  filename (str): Filename of image.
-                  compression_type:    Type of data compression.
-                      Can be: C_NONE, C_LZW, C_JPEG.
-                  voxel_size: Voxel size, to be stored in the filename.
-                  description: Description, to be stored in the filename.
-                  use_bigtiff: Allow to save big tiff files (>4Gb).
-           )doc",
-           py::arg("filename"),
-           py::arg("compression_type") = 0,
-           py::arg("voxel_size") = pyarray_float(),
-           py::arg("description") = "",
-           py::arg("use_bigtiff") = true
-     );
+void operator delete[](void* p) noexcept
+{
+    BufferPool::instance().release(p);
+}
 
-    // Instance characteristics
-    cl.def("spectrum", 
-           &Class::spectrum,
-           "Return spectrum (number of channels) of image."
-    );
+void operator delete[](void* p, std::size_t) noexcept
+{
+    BufferPool::instance().release(p);
+}
 
-    cl.def("depth", 
-           &Class::depth,
-           "Return depth of image"
-    );
+void operator delete[](void* p, const std::nothrow_t&) noexcept
+{
+    BufferPool::instance().release(p);
+}
 
-    cl.def("height", 
-           &Class::height,
-           "Return height of image"
-    );
+// Helper function to return the dimensions (width, height, depth, spectrum)
+// of a CImg holding the data of a python array.
+inline std::array<unsigned int, 4> array_dims(const py::array& a)
+{
+    auto dims = a.ndim();
+    if (dims < 1)
+        throw std::runtime_error("Array should have at least 1 dimension.");
+    if (dims > 4)
+        throw std::runtime_error("Array should have less than 4 dimensions.");
 
-    cl.def("width", 
-           &Class::width,
-           "Return width of image"
-    );
+    std::array<unsigned int, 4> res = {1, 1, 1, 1};
+    for (py::ssize_t i = 0; i < dims; ++i)
+        res[i] = static_cast<unsigned int>(a.shape(dims - 1 - i));
+    return res;
+}
 
-    cl.def("size", 
-           &Class::size,
-           "Return the total number of pixel values in the image."
-    );
+// Helper function to create CImg<T> from a python array.
+template <typename T>
+CImg<T> fromarray(const py::array_t<T, py::array::c_style | py::array::forcecast>& a)
+{
+    auto d = array_dims(a);
+    return CImg<T>(a.data(), d[0], d[1], d[2], d[3]);
+}
 
-    // Buffer protocol
-    cl.def_buffer([](Class &c) -> py::buffer_info {
-            return py::buffer_info(
-                c.data(),                               /* Pointer to buffer */
-                sizeof(T),                              /* Size of one scalar */
-                py::format_descriptor<T>::format(),     /* Python struct-style format descriptor */
-                4,                                      /* Number of dimensions */
-                { c.spectrum(), c.depth(), c.height(), c.width() }, /* Buffer dimensions */
-                { sizeof(T) * c.depth() * c.height() * c.width(),
-                  sizeof(T) * c.height() * c.width(),
-                  sizeof(T) * c.width(),                /* Strides (in bytes) for each index */
-                  sizeof(T) }
-            );
-        });
+// Helper function to let CImg<T> share the memory of a python array.
+template <typename T>
+CImg<T>& fromarray_shared(CImg<T>& im, py::array& a)
+{
+    if (!a.dtype().is(py::dtype::of<T>()))
+        throw std::runtime_error("Array has data type '" + py::str(a.dtype()).cast<std::string>() +
+                                 "', expected '" + py::str(py::dtype::of<T>()).cast<std::string>() + "'.");
+    if (!(a.flags() & py::array::c_style))
+        throw std::runtime_error("Array needs to be C-contiguous.");
+    if (!a.writeable())
+        throw std::runtime_error("Array needs to be writeable.");
+    auto d = array_dims(a);
+    return im.assign(static_cast<T*>(a.mutable_data()), d[0], d[1], d[2], d[3], true);
+}
+
+// Helper function to convert the result of a get_* method to CImg<T>.
+template <typename T, typename t>
+CImg<T> as_class(CImg<t>&& img)
+{
+    CImg<T> res;
+    img.move_to(res);
+    return res;
+}
+
+// Helper function to check that two images have the same dimensions.
+template <typename T>
+void check_same_dims(const CImg<T>& a, const CImg<T>& b)
+{
+    if (!a.is_sameXYZC(b))
+        throw std::runtime_error("Images need to have the same dimensions.");
+}
+
+// Helper function to convert value to pixel type T. Values outside the
+// range of integer types are clamped, NaN is converted to 0.
+template <typename T>
+T saturate_cast(const double value)
+{
+    if (cimg::type<T>::is_float())
+        return (T)value;
+    return std::isnan(value) ? (T)0 : cimg::type<T>::cut(value);
+}
+
+// Pointwise arithmetic operations. Floating point images are computed in
+// their own precision, integer images in double precision.
+struct Add { template <typename t> t operator()(const t a, const t b) const { return a + b; } };
+struct Sub { template <typename t> t operator()(const t a, const t b) const { return a - b; } };
+struct Mul { template <typename t> t operator()(const t a, const t b) const { return a * b; } };
+struct Div { template <typename t> t operator()(const t a, const t b) const { return a / b; } };
+struct FloorDiv { template <typename t> t operator()(const t a, const t b) const { return std::floor(a / b); } };
+
+template <typename Op> struct is_division : std::false_type {};
+template <> struct is_division<Div> : std::true_type {};
+template <> struct is_division<FloorDiv> : std::true_type {};
+
+template <typename T>
+using Tcalc = typename std::conditional<std::is_floating_point<T>::value, T, double>::type;
+
+// Helper function to apply op to the pixel values a and b. Results of
+// integer images are clamped to the range of T, and division by zero
+// gives 0, as in numpy.
+template <typename T, typename Op>
+inline T apply_op(const Tcalc<T> a, const Tcalc<T> b, Op op)
+{
+    if (cimg::type<T>::is_float())
+        return (T)op(a, b);
+    if (is_division<Op>::value && b == 0)
+        return (T)0;
+    return saturate_cast<T>((double)op(a, b));
+}
+
+// Helper function to apply op to the pixel values of img and a value.
+// The result is stored in res, which may be img itself.
+template <typename T, typename Op>
+CImg<T>& pointwise(CImg<T>& res, const CImg<T>& img, const double value, Op op)
+{
+    const Tcalc<T> val = (Tcalc<T>)value;
+    const T *const ps = img.data();
+    T *const pd = res.data();
+    const std::ptrdiff_t siz = (std::ptrdiff_t)img.size();
+    cimg_pragma_openmp(parallel for cimg_openmp_if_size(siz, 131072))
+    for (std::ptrdiff_t off = 0; off < siz; ++off)
+        pd[off] = apply_op<T>((Tcalc<T>)ps[off], val, op);
+    return res;
+}
+
+// Helper function to apply op to the pixel values of img and other.
+// The result is stored in res, which may be img itself.
+template <typename T, typename Op>
+CImg<T>& pointwise(CImg<T>& res, const CImg<T>& img, const CImg<T>& other, Op op)
+{
+    check_same_dims(img, other);
+    const T *const ps = img.data();
+    const T *const po = other.data();
+    T *const pd = res.data();
+    const std::ptrdiff_t siz = (std::ptrdiff_t)img.size();
+    cimg_pragma_openmp(parallel for cimg_openmp_if_size(siz, 131072))
+    for (std::ptrdiff_t off = 0; off < siz; ++off)
+        pd[off] = apply_op<T>((Tcalc<T>)ps[off], (Tcalc<T>)po[off], op);
+    return res;
+}
+
+// Helper function to return the result of op applied to img and operand.
+template <typename T, typename Operand, typename Op>
+CImg<T> get_pointwise(const CImg<T>& img, const Operand& operand, Op op)
+{
+    CImg<T> res(img.width(), img.height(), img.depth(), img.spectrum());
+    return pointwise(res, img, operand, op);
+}
+
+// Helper class to read a memory buffer through a std::FILE*, as expected
+// by the CImg loaders.
+class MemoryFile
+{
+public:
+    MemoryFile(const unsigned char* data, const size_t size)
+    {
+#ifdef _WIN32
+        // fmemopen() is not available on Windows, use a temporary file instead.
+        _file = std::tmpfile();
+        if (_file && (std::fwrite(data, 1, size, _file) != size || std::fseek(_file, 0, SEEK_SET))) {
+            std::fclose(_file);
+            _file = nullptr;
+        }
+#else
+        _file = fmemopen(const_cast<unsigned char*>(data), size, "rb");
+#endif
+        if (!_file)
+            throw std::runtime_error("Failed to open memory buffer.");
+    }
+    MemoryFile(const MemoryFile&) = delete;
+    MemoryFile& operator=(const MemoryFile&) = delete;
+    ~MemoryFile() { std::fclose(_file); }
+
+    std::FILE* get() const { return _file; }
+
+private:
+    std::FILE* _file;
+};
+
+// Helper function to detect the image format of a memory buffer
+// from its magic bytes. Returns an empty string if unknown.
+inline std::string detect_format(const unsigned char* data, const size_t size)
+{
+    if (size >= 3 && data[0] == 0xFF && data[1] == 0xD8 && data[2] == 0xFF)
+        return "jpeg";
+    if (size >= 8 && !std::memcmp(data, "\x89PNG\r\n\x1A\n", 8))
+        return "png";
+    if (size >= 2 && data[0] == 'B' && data[1] == 'M')
+        return "bmp";
+    if (size >= 4 && (!std::memcmp(data, "II*\0", 4) || !std::memcmp(data, "MM\0*", 4)))
+        return "tiff";
+    // .cimg files start with a header line like '1 float little_endian'.
+    const size_t n = std::min<size_t>(size, 256);
+    const unsigned char* eol = static_cast<const unsigned char*>(std::memchr(data, '\n', n));
+    if (n && std::isdigit(data[0]) && eol &&
+        std::string(data, eol).find("_endian") != std::string::npos)
+        return "cimg";
+    return "";
+}
+
+// Helper function to normalize the name of an image format.
+inline std::string normalize_format(std::string format)
+{
+    std::transform(format.begin(), format.end(), format.begin(),
+                   [](unsigned char c) { return std::tolower(c); });
+    if (!format.empty() && format[0] == '.')
+        format.erase(0, 1);
+    if (format == "jpg")
+        return "jpeg";
+    if (format == "tif")
+        return "tiff";
+    return format;
+}
+
+#ifdef cimg_use_tiff
+// Memory buffer read by libtiff through TIFFClientOpen().
+struct TiffMemory
+{
+    const unsigned char* data;
+    toff_t size;
+    toff_t pos;
+};
+
+inline tsize_t tiff_memory_read(thandle_t handle, tdata_t buf, tsize_t size)
+{
+    auto mem = static_cast<TiffMemory*>(handle);
+    const toff_t avail = mem->pos < mem->size ? mem->size - mem->pos : 0;
+    const toff_t n = std::min<toff_t>(static_cast<toff_t>(size), avail);
+    std::memcpy(buf, mem->data + mem->pos, static_cast<size_t>(n));
+    mem->pos += n;
+    return static_cast<tsize_t>(n);
+}
+
+inline tsize_t tiff_memory_write(thandle_t, tdata_t, tsize_t)
+{
+    return -1;
+}
+
+inline toff_t tiff_memory_seek(thandle_t handle, toff_t offset, int whence)
+{
+    auto mem = static_cast<TiffMemory*>(handle);
+    switch (whence) {
+    case SEEK_SET: mem->pos = offset; break;
+    case SEEK_CUR: mem->pos += offset; break;
+    case SEEK_END: mem->pos = mem->size + offset; break;
+    }
+    return mem->pos;
+}
+
+inline int tiff_memory_close(thandle_t)
+{
+    return 0;
+}
+
+inline toff_t tiff_memory_size(thandle_t handle)
+{
+    return static_cast<TiffMemory*>(handle)->size;
+}
+
+inline int tiff_memory_map(thandle_t handle, tdata_t* base, toff_t* size)
+{
+    auto mem = static_cast<TiffMemory*>(handle);
+    *base = const_cast<unsigned char*>(mem->data);
+    *size = mem->size;
+    return 1;
+}
+
+inline void tiff_memory_unmap(thandle_t, tdata_t, toff_t)
+{
+}
+
+// Helper function to load frames first_frame to last_frame of an open TIFF
+// file with nb_images frames, stacked along the z-axis.
+// Mirrors CImg<T>::load_tiff(), which only reads from files.
+template <typename T>
+CImg<T>& load_tiff_frames(CImg<T>& im, TIFF* tif, const unsigned int nb_images,
+                          const unsigned int first_frame, const unsigned int last_frame,
+                          const unsigned int step_frame)
+{
+    const unsigned int nfirst_frame = std::min(first_frame, last_frame);
+    const unsigned int nstep_frame = step_frame ? step_frame : 1;
+    unsigned int nlast_frame = std::max(first_frame, last_frame);
+    if (nfirst_frame >= nb_images)
+        return im.assign();
+    if (nlast_frame >= nb_images)
+        nlast_frame = nb_images - 1;
+
+    CImg<T> frame;
+    for (unsigned int l = nfirst_frame; l <= nlast_frame; l += nstep_frame) {
+        frame._load_tiff(tif, l, 0, 0, 0);
+        if (l == nfirst_frame)
+            im.assign(frame.width(), frame.height(), 1 + (nlast_frame - nfirst_frame) / nstep_frame, frame.spectrum());
+        if (frame.width() > im.width() || frame.height() > im.height() || frame.spectrum() > im.spectrum())
+            im.resize(std::max(frame.width(), im.width()),
+                      std::max(frame.height(), im.height()), -100,
+                      std::max(frame.spectrum(), im.spectrum()), 0);
+        im.draw_image(0, 0, (l - nfirst_frame) / nstep_frame, frame);
+    }
+    return im;
+}
+
+// Helper function to load the frames of a TIFF image from a memory buffer.
+template <typename T>
+CImg<T>& load_tiff_memory(CImg<T>& im, const unsigned char* data, const size_t size,
+                          const unsigned int first_frame, const unsigned int last_frame,
+                          const unsigned int step_frame)
+{
+    TiffMemory mem = {data, static_cast<toff_t>(size), 0};
+    TIFF* tif = TIFFClientOpen("memory", "r", static_cast<thandle_t>(&mem),
+                               tiff_memory_read, tiff_memory_write, tiff_memory_seek,
+                               tiff_memory_close, tiff_memory_size,
+                               tiff_memory_map, tiff_memory_unmap);
+    if (!tif)
+        throw std::runtime_error("Failed to decode TIFF image.");
+    load_tiff_frames(im, tif, TIFFNumberOfDirectories(tif), first_frame, last_frame, step_frame);
+    TIFFClose(tif);
+    return im;
+}
+
+// TIFF file kept open to read its frames one batch at a time.
+class TiffFile
+{
+public:
+    explicit TiffFile(const std::string& filename)
+        : _filename(filename)
+    {
+#if cimg_verbosity<3
+        TIFFSetWarningHandler(0);
+        TIFFSetErrorHandler(0);
+#endif
+        _tif = TIFFOpen(filename.c_str(), "r");
+        if (!_tif)
+            throw std::runtime_error("Failed to open file '" + filename + "'.");
+        _frames = TIFFNumberOfDirectories(_tif);
+    }
+    TiffFile(const TiffFile&) = delete;
+    TiffFile& operator=(const TiffFile&) = delete;
+    ~TiffFile() { close(); }
+
+    void close()
+    {
+        std::lock_guard<std::mutex> lock(_mutex);
+        if (_tif)
+            TIFFClose(_tif);
+        _tif = nullptr;
+    }
+
+    bool closed() const { return !_tif; }
+
+    unsigned int frames() const { return _frames; }
+
+    // Return frame count, dimensions and pixel type of the first frame
+    // without decoding pixel data.
+    py::dict info()
+    {
+        cimg_uint32 width = 0, height = 0;
+        cimg_uint16 spectrum = 1, bits = 8, format = SAMPLEFORMAT_UINT;
+        {
+            native_scope release;
+            std::lock_guard<std::mutex> lock(_mutex);
+            check_open();
+            TIFFSetDirectory(_tif, 0);
+            TIFFGetField(_tif, TIFFTAG_IMAGEWIDTH, &width);
+            TIFFGetField(_tif, TIFFTAG_IMAGELENGTH, &height);
+            TIFFGetFieldDefaulted(_tif, TIFFTAG_SAMPLESPERPIXEL, &spectrum);
+            TIFFGetFieldDefaulted(_tif, TIFFTAG_BITSPERSAMPLE, &bits);
+            TIFFGetFieldDefaulted(_tif, TIFFTAG_SAMPLEFORMAT, &format);
+        }
+        std::string dtype = format == SAMPLEFORMAT_IEEEFP ? "float" :
+                            format == SAMPLEFORMAT_INT ? "int" : "uint";
+        dtype += std::to_string(bits <= 8 ? 8 : bits);
+
+        py::dict res;
+        res["frames"] = _frames;
+        res["width"] = width;
+        res["height"] = height;
+        res["spectrum"] = spectrum;
+        res["bits_per_sample"] = bits;
+        res["dtype"] = dtype;
+        return res;
+    }
+
+    // Read count frames starting at first into im, stacked along the z-axis.
+    template <typename T>
+    CImg<T>& read(CImg<T>& im, const unsigned int first, const unsigned int count)
+    {
+        std::lock_guard<std::mutex> lock(_mutex);
+        check_open();
+        if (!count || first >= _frames)
+            return im.assign();
+        try {
+            return load_tiff_frames(im, _tif, _frames, first, first + std::min(count, _frames - first) - 1, 1);
+        } catch (...) {
+            // CImg closes the file when decoding fails.
+            _tif = nullptr;
+            throw;
+        }
+    }
+
+private:
+    void check_open() const
+    {
+        if (!_tif)
+            throw std::runtime_error("TIFF file '" + _filename + "' is closed.");
+    }
+
+    std::string _filename;
+    TIFF* _tif;
+    unsigned int _frames;
+    std::mutex _mutex;
+};
+#endif
+
+// Helper function to decode an image of the given format from a memory
+// buffer. The format is detected from the data if empty.
+template <typename T>
+CImg<T>& load_memory(CImg<T>& im, const unsigned char* data, const size_t size, const std::string& format)
+{
+    if (!size)
+        throw std::runtime_error("Buffer is empty.");
+    const std::string fmt = format.empty() ? detect_format(data, size) : normalize_format(format);
+    if (fmt.empty())
+        throw std::runtime_error("Unable to detect image format.");
+    if (fmt == "tiff") {
+#ifdef cimg_use_tiff
+        return load_tiff_memory(im, data, size, 0, ~0U, 1);
+#else
+        throw std::runtime_error("Decoding TIFF images requires libtiff.");
+#endif
+    }
+
+    MemoryFile file(data, size);
+    if (fmt == "jpeg")
+        return im.load_jpeg(file.get());
+    if (fmt == "png")
+        return im.load_png(file.get());
+    if (fmt == "bmp")
+        return im.load_bmp(file.get());
+    if (fmt == "cimg")
+        return im.load_cimg(file.get());
+    throw std::runtime_error("Unsupported image format '" + format + "'.");
+}
+
+// Helper function to return the data of a C-contiguous python buffer.
+inline std::pair<const unsigned char*, size_t> buffer_data(const py::buffer_info& info)
+{
+    if (!PyBuffer_IsContiguous(info.view(), 'C'))
+        throw std::runtime_error("Buffer needs to be C-contiguous.");
+    return {static_cast<const unsigned char*>(info.ptr), static_cast<size_t>(info.view()->len)};
+}
+
+// Growable memory buffer holding encoded image data.
+// The data is allocated with std::malloc() so that it can be handed over
+// to an open_memstream() stream or a python object.
+class MemoryBuffer
+{
+public:
+    MemoryBuffer() = default;
+    MemoryBuffer(const MemoryBuffer&) = delete;
+    MemoryBuffer& operator=(const MemoryBuffer&) = delete;
+    ~MemoryBuffer() { std::free(_data); }
+
+    unsigned char* data() const { return _data; }
+    size_t size() const { return _size; }
+
+    // Resize buffer, new bytes are set to zero.
+    void resize(const size_t size)
+    {
+        if (size > _capacity) {
+            const size_t capacity = std::max(size, 2 * _capacity);
+            auto data = static_cast<unsigned char*>(std::realloc(_data, capacity));
+            if (!data)
+                throw std::bad_alloc();
+            _data = data;
+            _capacity = capacity;
+        }
+        if (size > _size)
+            std::memset(_data + _size, 0, size - _size);
+        _size = size;
+    }
+
+    // Take ownership of data allocated with std::malloc().
+    void reset(unsigned char* data, const size_t size)
+    {
+        std::free(_data);
+        _data = data;
+        _size = _capacity = size;
+    }
+
+    // Release ownership of the data.
+    unsigned char* release()
+    {
+        auto data = _data;
+        _data = nullptr;
+        _size = _capacity = 0;
+        return data;
+    }
+
+private:
+    unsigned char* _data = nullptr;
+    size_t _size = 0;
+    size_t _capacity = 0;
+};
+
+// Helper class to write to a memory buffer through a std::FILE*, as
+// expected by the CImg savers.
+class MemoryWriteFile
+{
+public:
+    MemoryWriteFile()
+    {
+#ifdef _WIN32
+        // open_memstream() is not available on Windows, use a temporary file instead.
+        _file = std::tmpfile();
+#else
+        _file = open_memstream(&_data, &_size);
+#endif
+        if (!_file)
+            throw std::runtime_error("Failed to open memory buffer.");
+    }
+    MemoryWriteFile(const MemoryWriteFile&) = delete;
+    MemoryWriteFile& operator=(const MemoryWriteFile&) = delete;
+    ~MemoryWriteFile()
+    {
+        if (_file)
+            std::fclose(_file);
+        std::free(_data);
+    }
+
+    std::FILE* get() const { return _file; }
+
+    // Close the stream and move the written data to buf.
+    void close(MemoryBuffer& buf)
+    {
+#ifdef _WIN32
+        long size = -1;
+        if (!std::fseek(_file, 0, SEEK_END) && (size = std::ftell(_file)) >= 0 && !std::fseek(_file, 0, SEEK_SET)) {
+            _data = static_cast<char*>(std::malloc(size ? size : 1));
+            _size = _data ? std::fread(_data, 1, size, _file) : 0;
+        }
+        if (!_data || _size != static_cast<size_t>(size))
+            throw std::runtime_error("Failed to read memory buffer.");
+#endif
+        const int res = std::fclose(_file);
+        _file = nullptr;
+        if (res)
+            throw std::runtime_error("Failed to write memory buffer.");
+        buf.reset(reinterpret_cast<unsigned char*>(_data), _size);
+        _data = nullptr;
+        _size = 0;
+    }
+
+private:
+    std::FILE* _file;
+    char* _data = nullptr;
+    size_t _size = 0;
+};
+
+#ifdef cimg_use_tiff
+// Memory buffer written by libtiff through TIFFClientOpen().
+struct TiffBuffer
+{
+    MemoryBuffer& buf;
+    toff_t pos;
+};
+
+inline tsize_t tiff_buffer_read(thandle_t handle, tdata_t data, tsize_t size)
+{
+    auto out = static_cast<TiffBuffer*>(handle);
+    const toff_t avail = out->pos < out->buf.size() ? out->buf.size() - out->pos : 0;
+    const toff_t n = std::min<toff_t>(static_cast<toff_t>(size), avail);
+    std::memcpy(data, out->buf.data() + out->pos, static_cast<size_t>(n));
+    out->pos += n;
+    return static_cast<tsize_t>(n);
+}
+
+inline tsize_t tiff_buffer_write(thandle_t handle, tdata_t data, tsize_t size)
+{
+    auto out = static_cast<TiffBuffer*>(handle);
+    const toff_t end = out->pos + static_cast<toff_t>(size);
+    if (end > out->buf.size())
+        out->buf.resize(static_cast<size_t>(end));
+    std::memcpy(out->buf.data() + out->pos, data, static_cast<size_t>(size));
+    out->pos = end;
+    return size;
+}
+
+inline toff_t tiff_buffer_seek(thandle_t handle, toff_t offset, int whence)
+{
+    auto out = static_cast<TiffBuffer*>(handle);
+    switch (whence) {
+    case SEEK_SET: out->pos = offset; break;
+    case SEEK_CUR: out->pos += offset; break;
+    case SEEK_END: out->pos = out->buf.size() + offset; break;
+    }
+    return out->pos;
+}
+
+inline toff_t tiff_buffer_size(thandle_t handle)
+{
+    return static_cast<TiffBuffer*>(handle)->buf.size();
+}
+
+inline int tiff_buffer_map(thandle_t, tdata_t*, toff_t*)
+{
+    return 0;
+}
+
+// Helper function to save an image as TIFF into a memory buffer.
+// Mirrors CImg<T>::save_tiff(), which only writes to files.
+template <typename T>
+void save_tiff_memory(const CImg<T>& im, MemoryBuffer& buf, const unsigned int compression_type,
+                      const float* const voxel_size, const char* const description, const bool use_bigtiff)
+{
+    if (im.is_empty())
+        return;
+    const bool big = use_bigtiff && sizeof(cimg_ulong) >= 8 && im.size() * sizeof(T) >= 1UL << 31;
+    TiffBuffer out = {buf, 0};
+    TIFF* tif = TIFFClientOpen("memory", big ? "w8" : "w4", static_cast<thandle_t>(&out),
+                               tiff_buffer_read, tiff_buffer_write, tiff_buffer_seek,
+                               tiff_memory_close, tiff_buffer_size,
+                               tiff_buffer_map, tiff_memory_unmap);
+    if (!tif)
+        throw std::runtime_error("Failed to encode TIFF image.");
+    cimg_forZ(im, z) im._save_tiff(tif, z, z, compression_type, voxel_size, description);
+    TIFFClose(tif);
+}
+#endif
+
+// Parameters of the image encoders.
+struct SaveOptions
+{
+    unsigned int quality;
+    unsigned int bytes_per_pixel;
+    unsigned int compression_type;
+    const float* voxel_size;
+    const char* description;
+    bool use_bigtiff;
+    bool is_compressed;
+};
+
+// Helper function to encode an image in the given format into a memory buffer.
+template <typename T>
+void save_memory(const CImg<T>& im, MemoryBuffer& buf, const std::string& format, const SaveOptions& opts)
+{
+    const std::string fmt = normalize_format(format);
+    if (fmt == "tiff") {
+#ifdef cimg_use_tiff
+        save_tiff_memory(im, buf, opts.compression_type, opts.voxel_size, opts.description, opts.use_bigtiff);
+        return;
+#else
+        throw std::runtime_error("Encoding TIFF images requires libtiff.");
+#endif
+    }
+    if (fmt != "jpeg" && fmt != "png" && fmt != "bmp" && fmt != "cimg")
+        throw std::runtime_error("Unsupported image format '" + format + "'.");
+
+    MemoryWriteFile file;
+    if (fmt == "jpeg")
+        im.save_jpeg(file.get(), opts.quality);
+    else if (fmt == "png")
+        im.save_png(file.get(), opts.bytes_per_pixel);
+    else if (fmt == "bmp")
+        im.save_bmp(file.get());
+    else
+        im.save_cimg(file.get(), opts.is_compressed);
+    file.close(buf);
+}
+
+// Helper function to return a memory buffer as a uint8 python array
+// without copying. The array takes ownership of the data.
+inline py::array_t<unsigned char> buffer_array(MemoryBuffer& buf)
+{
+    if (!buf.size())
+        return py::array_t<unsigned char>(0);
+    py::capsule owner(buf.data(), [](void* p) { std::free(p); });
+    const size_t size = buf.size();
+    return py::array_t<unsigned char>(size, buf.release(), owner);
+}
+
+// Interpolation modes of sample_at().
+enum class Interp { Nearest, Linear, Cubic };
+
+// Helper function to return the pixel value of img at (fx,fy,fz,c) with
+// Neumann boundary conditions. Only the first k coordinates are interpolated.
+template <Interp interp, typename T>
+typename CImg<T>::Tfloat interpolate(const CImg<T>& img, const int k,
+                                     const float fx, const float fy, const float fz, const int c)
+{
+    switch (interp) {
+    case Interp::Nearest:
+        return img._atXYZC((int)cimg::round(fx), (int)cimg::round(fy), (int)cimg::round(fz), c);
+    case Interp::Linear:
+        return k == 1 ? img._linear_atX(fx, 0, 0, c) :
+               k == 2 ? img._linear_atXY(fx, fy, 0, c) :
+                        img._linear_atXYZ(fx, fy, fz, c);
+    case Interp::Cubic:
+        return k == 1 ? img._cubic_atX(fx, 0, 0, c) :
+               k == 2 ? img._cubic_atXY(fx, fy, 0, c) :
+                        img._cubic_atXYZ(fx, fy, fz, c);
+    }
+    return 0;
+}
+
+// Helper function to return the pixel value of img at (fx,fy,fz,fc) with
+// Neumann boundary conditions. Cubic interpolation is linear along C.
+template <Interp interp, typename T>
+typename CImg<T>::Tfloat interpolate(const CImg<T>& img,
+                                     const float fx, const float fy, const float fz, const float fc)
+{
+    switch (interp) {
+    case Interp::Nearest:
+        return img._atXYZC((int)cimg::round(fx), (int)cimg::round(fy), (int)cimg::round(fz), (int)cimg::round(fc));
+    case Interp::Linear:
+        return img._linear_atXYZC(fx, fy, fz, fc);
+    case Interp::Cubic: {
+        const float nfc = cimg::cut(fc, 0.f, img.spectrum() - 1.f);
+        const int c = (int)nfc;
+        const float dc = nfc - c;
+        const auto Ic = img._cubic_atXYZ(fx, fy, fz, c);
+        return dc > 0 ? Ic + dc * (img._cubic_atXYZ(fx, fy, fz, c + 1) - Ic) : Ic;
+    }
+    }
+    return 0;
+}
+
+// Statistics of pixel values. Merging the statistics of consecutive
+// pixels keeps the offsets of the first minimum and maximum. Mean and sum
+// of squared deviations (m2) are computed per chunk of pixels, reading the
+// chunk a second time from the cache, and merged with the formula of Chan
+// et al., which unlike sums of squares does not cancel for values with a
+// large offset.
+template <typename T>
+struct Stats
+{
+    size_t count = 0;
+    double sum = 0, mean = 0, m2 = 0, product = 1;
+    T min = 0, max = 0;
+    size_t argmin = 0, argmax = 0;
+
+    void add(const T *const data, const size_t begin, const size_t end)
+    {
+        if (begin >= end)
+            return;
+        T m = data[begin], M = m;
+        size_t offm = begin, offM = begin;
+        double S = 0, P = 1;
+        for (size_t off = begin; off < end; ++off)
+        {
+            const T val = data[off];
+            const double v = (double)val;
+            if (val < m) { m = val; offm = off; }
+            if (val > M) { M = val; offM = off; }
+            S += v;
+            P *= v;
+        }
+        const double mean = S / (double)(end - begin);
+        double m2 = 0;
+        for (size_t off = begin; off < end; ++off)
+        {
+            const double delta = (double)data[off] - mean;
+            m2 += delta * delta;
+        }
+        merge(Stats{end - begin, S, mean, m2, P, m, M, offm, offM});
+    }
+
+    void merge(const Stats& other)
+    {
+        if (!other.count)
+            return;
+        if (!count)
+        {
+            *this = other;
+            return;
+        }
+        const double n = (double)(count + other.count);
+        const double delta = other.mean - mean;
+        mean += delta * ((double)other.count / n);
+        m2 += other.m2 + delta * delta * ((double)count * (double)other.count / n);
+        count += other.count;
+        sum += other.sum;
+        product *= other.product;
+        if (other.min < min) { min = other.min; argmin = other.argmin; }
+        if (other.max > max) { max = other.max; argmax = other.argmax; }
+    }
+};
+
+// Helper function to compute the statistics of img in a single parallel
+// pass, per slice and/or per channel. Returns the statistics of the
+// groups in the order (c, z).
+template <typename T>
+std::vector<Stats<T>> group_stats(const CImg<T>& img, const bool per_slice, const bool per_channel)
+{
+    if (img.is_empty())
+        throw std::runtime_error("Statistics of empty image are undefined.");
+    const size_t depth = img.depth();
+    const size_t run = per_slice ? (size_t)img.width() * img.height() :
+                       per_channel ? (size_t)img.width() * img.height() * depth : img.size();
+    // Chunks of consecutive pixels of the same group, computed in parallel
+    // and merged in the order of the pixels, so that the result does not
+    // depend on the number of threads.
+    const size_t chunk_size = 65536;
+    std::vector<std::pair<size_t, size_t>> chunks;
+    for (size_t begin = 0; begin < img.size(); begin += run)
+        for (size_t off = begin; off < begin + run; off += chunk_size)
+            chunks.emplace_back(off, std::min(off + chunk_size, begin + run));
+
+    std::vector<Stats<T>> partial(chunks.size());
+    const std::ptrdiff_t n = (std::ptrdiff_t)chunks.size();
+    cimg_pragma_openmp(parallel for cimg_openmp_if_size(img.size(), 131072))
+    for (std::ptrdiff_t i = 0; i < n; ++i)
+        partial[i].add(img.data(), chunks[i].first, chunks[i].second);
+
+    std::vector<Stats<T>> res((per_slice ? depth : 1) * (per_channel ? img.spectrum() : 1));
+    for (size_t i = 0; i < chunks.size(); ++i)
+    {
+        const size_t r = chunks[i].first / run;
+        res[per_slice && !per_channel ? r % depth : r].merge(partial[i]);
+    }
+    return res;
+}
+
+// Helper function to sample img at the coordinates (x[,y[,z[,c]]]) given
+// as rows of an (N,k) array. Missing coordinates are 0. Returns an
+// (N,spectrum) array, or an (N,) array if the C-coordinate is given.
+template <Interp interp, typename T>
+py::array_t<typename CImg<T>::Tfloat> sample_at(const CImg<T>& img,
+    const py::array_t<float, py::array::c_style | py::array::forcecast>& coords)
+{
+    using Tfloat = typename CImg<T>::Tfloat;
+    if (coords.ndim() != 2 || coords.shape(1) < 1 || coords.shape(1) > 4)
+        throw std::runtime_error("Coordinates need to be an (N,k) array with 1 <= k <= 4.");
+    if (img.is_empty())
+        throw std::runtime_error("Image is empty.");
+
+    const py::ssize_t n = coords.shape(0);
+    const int k = (int)coords.shape(1);
+    const int nc = k == 4 ? 1 : img.spectrum();
+    py::array_t<Tfloat> res = k == 4 ? py::array_t<Tfloat>(n) :
+                                       py::array_t<Tfloat>({n, (py::ssize_t)nc});
+    const float* const pc = coords.data();
+    Tfloat* const pr = res.mutable_data();
+    {
+        native_scope release;
+        cimg_pragma_openmp(parallel for cimg_openmp_if_size(n * nc, 4096))
+        for (py::ssize_t i = 0; i < n; ++i) {
+            const float* const p = pc + i * k;
+            const float fx = p[0], fy = k > 1 ? p[1] : 0, fz = k > 2 ? p[2] : 0;
+            if (k == 4)
+                pr[i] = interpolate<interp>(img, fx, fy, fz, p[3]);
+            else
+                for (int c = 0; c < nc; ++c)
+                    pr[i * nc + c] = interpolate<interp>(img, k, fx, fy, fz, c);
+        }
+    }
+    return res;
+}
+
+// Helper function to mirror a coordinate into [0,size), repeating the
+// border pixels as CImg's mirror boundary conditions.
+inline float mirror_coord(const float f, const int size)
+{
+    const float period = 2.f * size;
+    const float m = f - period * std::floor(f / period);
+    return m >= size ? period - 1 - m : m;
+}
+
+// Helper function to compute the indices and weights of the linear or
+// cubic interpolation taps at coordinate f, with periodic boundary conditions.
+inline void periodic_taps(const float f, const int size, const bool is_cubic, int* idx, float* w)
+{
+    const float fl = std::floor(f);
+    const float d = f - fl;
+    const int i0 = (int)fl;
+    if (is_cubic) {
+        // Same cubic kernel as CImg<T>::cubic_at*()
+        const float d2 = d * d, d3 = d2 * d;
+        w[0] = 0.5f * (-d + 2 * d2 - d3);
+        w[1] = 0.5f * (2 - 5 * d2 + 3 * d3);
+        w[2] = 0.5f * (d + 4 * d2 - 3 * d3);
+        w[3] = 0.5f * (-d2 + d3);
+        for (int i = 0; i < 4; ++i)
+            idx[i] = cimg::mod(i0 - 1 + i, size);
+    } else {
+        w[0] = 1 - d;
+        w[1] = d;
+        idx[0] = cimg::mod(i0, size);
+        idx[1] = cimg::mod(i0 + 1, size);
+    }
+}
+
+// Helper function to return the pixel value of img at (fx,fy,fz,c) using
+// linear or cubic interpolation and periodic boundary conditions.
+// CImg's *_p() variants wrap coordinates with a period of size - 0.5.
+template <typename T>
+typename CImg<T>::Tfloat periodic_at(const CImg<T>& img, const float fx, const float fy, const float fz,
+                                     const int c, const bool is3d, const bool is_cubic)
+{
+    using Tfloat = typename CImg<T>::Tfloat;
+    int ix[4], iy[4], iz[4] = {(int)fz};
+    float wx[4], wy[4], wz[4] = {1};
+    const int n = is_cubic ? 4 : 2, nz = is3d ? n : 1;
+    periodic_taps(fx, img.width(), is_cubic, ix, wx);
+    periodic_taps(fy, img.height(), is_cubic, iy, wy);
+    if (is3d)
+        periodic_taps(fz, img.depth(), is_cubic, iz, wz);
+    Tfloat res = 0;
+    for (int k = 0; k < nz; ++k)
+        for (int j = 0; j < n; ++j)
+            for (int i = 0; i < n; ++i)
+                res += wx[i] * wy[j] * wz[k] * (Tfloat)img(ix[i], iy[j], iz[k], c);
+    return res;
+}
+
+// Helper function to return the pixel value of img at (fx,fy,fz,c) for
+// the given interpolation type (NEAREST, LINEAR, CUBIC) and boundary
+// conditions. If not is3d, the Z-coordinate is not interpolated.
+template <typename T>
+typename CImg<T>::Tfloat warp_at(const CImg<T>& img, float fx, float fy, float fz, const int c,
+                                 const bool is3d, const int interpolation, unsigned int boundary)
+{
+    if (boundary == 3) {
+        fx = mirror_coord(fx, img.width());
+        fy = mirror_coord(fy, img.height());
+        fz = is3d ? mirror_coord(fz, img.depth()) : fz;
+        boundary = 1;
+    }
+    const int z = (int)fz;
+    switch (interpolation) {
+    case 1: {
+        int nx = (int)cimg::round(fx), ny = (int)cimg::round(fy), nz = (int)cimg::round(fz);
+        if (boundary == 0) {
+            if (nx < 0 || ny < 0 || nz < 0 || nx >= img.width() || ny >= img.height() || nz >= img.depth())
+                return 0;
+        } else if (boundary == 2) {
+            nx = cimg::mod(nx, img.width());
+            ny = cimg::mod(ny, img.height());
+            nz = cimg::mod(nz, img.depth());
+        }
+        return img._atXYZC(nx, ny, nz, c);
+    }
+    case 3:
+        if (boundary == 0)
+            return is3d ? img.linear_atXYZ(fx, fy, fz, c, (T)0) : img.linear_atXY(fx, fy, z, c, (T)0);
+        if (boundary == 2)
+            return periodic_at(img, fx, fy, fz, c, is3d, false);
+        return is3d ? img._linear_atXYZ(fx, fy, fz, c) : img._linear_atXY(fx, fy, z, c);
+    default:
+        if (boundary == 0)
+            return is3d ? img.cubic_atXYZ(fx, fy, fz, c, (T)0) : img.cubic_atXY(fx, fy, z, c, (T)0);
+        if (boundary == 2)
+            return periodic_at(img, fx, fy, fz, c, is3d, true);
+        return is3d ? img._cubic_atXYZ(fx, fy, fz, c) : img._cubic_atXY(fx, fy, z, c);
+    }
+}
+
+// Helper function to warp img into the preallocated image res.
+// A is the row-major 4x4 matrix mapping homogeneous output coordinates
+// (x,y,z,1) to input coordinates. If not is3d, the Z-coordinate of the
+// output is kept.
+template <typename T>
+CImg<T>& warp_affine(const CImg<T>& img, CImg<T>& res, const std::array<double, 16>& A, const bool is3d,
+                     const int interpolation, const unsigned int boundary)
+{
+    if (interpolation != 1 && interpolation != 3 && interpolation != 5)
+        throw std::runtime_error("Interpolation type needs to be NEAREST, LINEAR, or CUBIC.");
+    if (boundary > 3)
+        throw std::runtime_error("Boundary conditions need to be DIRICHLET, NEUMANN, PERIODIC, or MIRROR.");
+    if (img.is_empty())
+        throw std::runtime_error("Image is empty.");
+
+    const bool is_projective = A[12] != 0 || A[13] != 0 || A[14] != 0 || A[15] != 1;
+    const int w = res.width(), h = res.height(), d = res.depth(), s = res.spectrum();
+    const size_t whd = (size_t)w * h * d;
+    cimg_pragma_openmp(parallel for cimg_openmp_collapse(2) cimg_openmp_if_size(res.size(), 4096))
+    for (int z = 0; z < d; ++z)
+        for (int y = 0; y < h; ++y) {
+            // Coordinates are updated incrementally along the row
+            double X = A[1] * y + A[2] * z + A[3];
+            double Y = A[5] * y + A[6] * z + A[7];
+            double Z = is3d ? A[9] * y + A[10] * z + A[11] : z;
+            double W = A[13] * y + A[14] * z + A[15];
+            T* pd = res.data(0, y, z, 0);
+            for (int x = 0; x < w; ++x, ++pd) {
+                const double iW = is_projective ? 1 / W : 1;
+                const float fx = (float)(X * iW), fy = (float)(Y * iW), fz = (float)(is3d ? Z * iW : Z);
+                for (int c = 0; c < s; ++c)
+                    pd[c * whd] = cimg::type<T>::cut(warp_at(img, fx, fy, fz, c, is3d, interpolation, boundary));
+                X += A[0];
+                Y += A[4];
+                if (is3d)
+                    Z += A[8];
+                W += A[12];
+            }
+        }
+    return res;
+}
+
+// Helper function to return the 4x4 matrix mapping output to input
+// coordinates from a forward affine or projective transformation matrix
+// of shape (2,3), (3,3) for 2D or (3,4), (4,4) for 3D transformations.
+inline std::array<double, 16> warp_matrix(const py::array_t<double, py::array::c_style | py::array::forcecast>& matrix,
+                                          bool& is3d)
+{
+    const auto rows = matrix.ndim() == 2 ? matrix.shape(0) : 0;
+    const auto cols = matrix.ndim() == 2 ? matrix.shape(1) : 0;
+    CImg<double> F = CImg<double>::identity_matrix(4);
+    if (cols == 3 && (rows == 2 || rows == 3)) {
+        is3d = false;
+        const int idx[] = {0, 1, 3};
+        for (int i = 0; i < rows; ++i)
+            for (int j = 0; j < 3; ++j)
+                F(idx[j], idx[i]) = matrix.at(i, j);
+    } else if (cols == 4 && (rows == 3 || rows == 4)) {
+        is3d = true;
+        for (int i = 0; i < rows; ++i)
+            for (int j = 0; j < 4; ++j)
+                F(j, i) = matrix.at(i, j);
+    } else
+        throw std::runtime_error("Matrix needs to be of shape (2,3), (3,3), (3,4), or (4,4).");
+    if (F.det() == 0)
+        throw std::runtime_error("Matrix is not invertible.");
+    F.invert();
+    std::array<double, 16> A;
+    std::copy(F.begin(), F.end(), A.begin());
+    return A;
+}
+
+// Helper function to convert a python sequence to integers.
+inline std::vector<int> to_ints(const py::sequence& seq)
+{
+    std::vector<int> res;
+    for (auto item : seq)
+        res.push_back(item.cast<int>());
+    return res;
+}
+
+// Helper function to return the result of warp_affine() as a new image.
+// output_shape is (height, width) or (depth, height, width), empty for
+// the size of img.
+template <typename T>
+CImg<T> get_warp_affine(const CImg<T>& img,
+                        const py::array_t<double, py::array::c_style | py::array::forcecast>& matrix,
+                        const std::vector<int>& output_shape, const int interpolation,
+                        const unsigned int boundary)
+{
+    bool is3d = false;
+    const auto A = warp_matrix(matrix, is3d);
+    const size_t n = output_shape.size();
+    if (n && n != 2 && (n != 3 || !is3d))
+        throw std::runtime_error("Output shape needs to be (height, width), or (depth, height, width) for 3D matrices.");
+    if (std::any_of(output_shape.begin(), output_shape.end(), [](int v) { return v <= 0; }))
+        throw std::runtime_error("Output shape needs to be positive.");
+    CImg<T> res(n ? output_shape[n - 1] : img.width(),
+                n ? output_shape[n - 2] : img.height(),
+                n == 3 ? output_shape[0] : img.depth(),
+                img.spectrum());
+    native_scope release;
+    return warp_affine(img, res, A, is3d, interpolation, boundary);
+}
+
+// Helper function to return img warped by a displacement field, see
+// CImg<T>::get_warp(). interpolation is NEAREST, LINEAR, or CUBIC.
+template <typename T, typename t>
+CImg<T> get_warp(const CImg<T>& img, const CImg<t>& field, const unsigned int mode,
+                 const int interpolation, const unsigned int boundary)
+{
+    if (field.spectrum() < 1 || field.spectrum() > 3)
+        throw std::runtime_error("Warping field needs to have 1, 2, or 3 channels.");
+    if (mode > 3)
+        throw std::runtime_error("Mode needs to be BACKWARD_ABSOLUTE, BACKWARD_RELATIVE, "
+                                 "FORWARD_ABSOLUTE, or FORWARD_RELATIVE.");
+    if (boundary > 3)
+        throw std::runtime_error("Boundary conditions need to be DIRICHLET, NEUMANN, PERIODIC, or MIRROR.");
+    unsigned int interp = 0;
+    if (interpolation == 3)
+        interp = 1;
+    else if (interpolation == 5)
+        interp = 2;
+    else if (interpolation != 1)
+        throw std::runtime_error("Interpolation type needs to be NEAREST, LINEAR, or CUBIC.");
+    return img.get_warp(field, mode, interp, boundary);
+}
+
+// Helper function to return img warped by a displacement field given as
+// python array. float32 and float64 arrays are used without copy.
+template <typename T>
+CImg<T> get_warp(const CImg<T>& img, const py::array& field, const unsigned int mode,
+                 const int interpolation, const unsigned int boundary)
+{
+    const auto d = array_dims(field);
+    if (field.dtype().is(py::dtype::of<double>()) && (field.flags() & py::array::c_style)) {
+        const CImg<double> f(static_cast<const double*>(field.data()), d[0], d[1], d[2], d[3], true);
+        native_scope release;
+        return get_warp(img, f, mode, interpolation, boundary);
+    }
+    const auto values = py::array_t<float, py::array::c_style | py::array::forcecast>::ensure(field);
+    if (!values)
+        throw py::error_already_set();
+    const CImg<float> f(values.data(), d[0], d[1], d[2], d[3], true);
+    native_scope release;
+    return get_warp(img, f, mode, interpolation, boundary);
+}
+
+// Helper function to call fn(i) for i in [0, count) concurrently in up to
+// workers threads. Exceptions are rethrown in the order of i. Must be
+// called without holding the GIL.
+template <typename Fn>
+void parallel_for(const size_t count, unsigned int workers, Fn fn)
+{
+    std::vector<std::exception_ptr> errors(count);
+    std::atomic<size_t> next(0);
+    const int n = num_threads();
+    auto work = [&]()
+    {
+        use_num_threads(n);
+        for (size_t i = next++; i < count; i = next++) {
+            try {
+                fn(i);
+            } catch (...) {
+                errors[i] = std::current_exception();
+            }
+        }
+    };
+
+    workers = std::max(1u, std::min<unsigned int>(workers, static_cast<unsigned int>(count)));
+    std::vector<std::thread> threads;
+    for (unsigned int i = 1; i < workers; ++i)
+        threads.emplace_back(work);
+    work();
+    for (auto& thread : threads)
+        thread.join();
+
+    for (auto& error : errors)
+        if (error)
+            std::rethrow_exception(error);
+}
+
+// Helper function to load images from files concurrently in up to
+// workers threads. Must be called without holding the GIL.
+template <typename T>
+std::vector<CImg<T>> load_many(const std::vector<std::string>& filenames, const unsigned int workers)
+{
+    std::vector<CImg<T>> images(filenames.size());
+    parallel_for(filenames.size(), workers,
+                 [&](const size_t i) { images[i].load(filenames[i].c_str()); });
+    return images;
+}
+
+// Sequence of operations applied in place to an image, see pycimg.Pipeline.
+// The arguments of the operations are converted when they are added, so
+// that running the pipeline does not need the GIL.
+template <typename T>
+class Pipeline
+{
+public:
+    using Step = std::function<void(CImg<T>&)>;
+
+    void add(Step step) { _steps.push_back(std::move(step)); }
+
+    size_t size() const { return _steps.size(); }
+
+    CImg<T>& run(CImg<T>& img) const
+    {
+        for (const auto& step : _steps)
+            step(img);
+        return img;
+    }
+
+private:
+    std::vector<Step> _steps;
+};
+
+// Helper function to write the region (x0, y0, z0, c0) - (x1, y1, z1, c1)
+// of img into res, as CImg::get_crop() does, without allocating a result.
+template <typename T>
+void crop_into(const CImg<T>& img, CImg<T>& res, const int x0, const int y0, const int z0, const int c0,
+               const int x1, const int y1, const int z1, const int c1, const unsigned int boundary_conditions)
+{
+    if (img.is_empty())
+        throw std::runtime_error("Cannot crop empty image.");
+    const int
+        nx0 = std::min(x0, x1), nx1 = std::max(x0, x1),
+        ny0 = std::min(y0, y1), ny1 = std::max(y0, y1),
+        nz0 = std::min(z0, z1), nz1 = std::max(z0, z1),
+        nc0 = std::min(c0, c1), nc1 = std::max(c0, c1);
+    if (res.width() != nx1 - nx0 + 1 || res.height() != ny1 - ny0 + 1 ||
+        res.depth() != nz1 - nz0 + 1 || res.spectrum() != nc1 - nc0 + 1)
+        throw std::runtime_error("Output needs to have the size of the cropped region.");
+    if (res.is_overlapped(img))
+    {
+        res = img.get_crop(x0, y0, z0, c0, x1, y1, z1, c1, boundary_conditions);
+        return;
+    }
+    const bool is_inside = nx0 >= 0 && nx1 < img.width() && ny0 >= 0 && ny1 < img.height() &&
+                           nz0 >= 0 && nz1 < img.depth() && nc0 >= 0 && nc1 < img.spectrum();
+    if (is_inside || boundary_conditions == 0)
+    {
+        if (!is_inside)
+            res.fill((T)0);
+        res.draw_image(-nx0, -ny0, -nz0, -nc0, img);
+        return;
+    }
+    // Coordinate of the pixel of img at v for the boundary conditions
+    const auto coord = [boundary_conditions](const int v, const int n)
+    {
+        switch (boundary_conditions)
+        {
+        case 3: { const int m = cimg::mod(v, 2 * n); return m < n ? m : 2 * n - m - 1; } // Mirror
+        case 2: return cimg::mod(v, n); // Periodic
+        default: return v < 0 ? 0 : v >= n ? n - 1 : v; // Neumann
+        }
+    };
+    cimg_pragma_openmp(parallel for cimg_openmp_collapse(3) cimg_openmp_if_size(res.size(), 131072))
+    cimg_forYZC(res, y, z, c) cimg_forX(res, x)
+        res(x, y, z, c) = img(coord(nx0 + x, img.width()), coord(ny0 + y, img.height()),
+                              coord(nz0 + z, img.depth()), coord(nc0 + c, img.spectrum()));
+}
+
+// Helper function to convert value to pixel type T. Raises OverflowError
+// for NaN and values outside the range of integer types.
+template <typename T>
+T checked_cast(const double value)
+{
+    if (!cimg::type<T>::is_float() && !std::is_same<T, bool>::value &&
+        !(value >= (double)cimg::type<T>::min() && value <= (double)cimg::type<T>::max()))
+        throw std::overflow_error("Value " + std::to_string(value) + " is out of bounds for pixel type " +
+                                  cimg::type<T>::string() + ".");
+    return (T)value;
+}
+
+// Helper function to return the offset of pixel (x, y, z, c) of img.
+// Negative coordinates count from the end of the axis.
+template <typename T>
+size_t pixel_offset(const CImg<T>& img, int x, int y, int z, int c)
+{
+    const std::array<int, 4> dims = {img.width(), img.height(), img.depth(), img.spectrum()};
+    std::array<int, 4> index = {x, y, z, c};
+    for (size_t i = 0; i < 4; ++i) {
+        if (index[i] < 0)
+            index[i] += dims[i];
+        if (index[i] < 0 || index[i] >= dims[i])
+            throw py::index_error("Index " + std::to_string(i == 0 ? x : i == 1 ? y : i == 2 ? z : c) +
+                                  " is out of bounds for axis of size " + std::to_string(dims[i]) + ".");
+    }
+    return img.offset(index[0], index[1], index[2], index[3]);
+}
+
+// Declare CImg class of pixel type T
+template <typename T>
+void declare(py::module &m, const std::string &typestr)
+{
+    using pyarray = py::array_t<T, py::array::c_style | py::array::forcecast>;
+    using pyarray_float = py::array_t<float, py::array::c_style | py::array::forcecast>;
+    using pyarray_double = py::array_t<double, py::array::c_style | py::array::forcecast>;
+
+    using Class = CImg<T>;
+    using Tfloat = typename CImg<T>::Tfloat;
+    using ulongT = typename CImg<T>::ulongT;
+    std::string pyclass_name = std::string("CImg_") + typestr;
+    py::class_<Class> cl(m, pyclass_name.c_str(), py::buffer_protocol());
+
+
+    // Constructor
+    cl.def(py::init<>());
+
+    cl.def(py::init([](const Class& img) { return Class(img, false); }),
+           "Create a copy of image.",
+           release_gil()
+    );
+
+    cl.def("fromarray",
+           [](Class& im, pyarray a)
+           {
+               native_scope release;
+               im = fromarray<T>(a);
+           },
+           "Create CImg from array.");
+
+    cl.def("fromarray_shared",
+           [](Class& im, py::array a) { fromarray_shared<T>(im, a); },
+           R"doc(
+              Create CImg sharing the memory of an array.
+
+              The array is kept alive as long as the CImg exists.
+
+              Args:
+                  a (ndarray): C-contiguous, writeable array with pixel type
+                               of the CImg and at most 4 dimensions.
+
+              Raises:
+                  RuntimeError: If the array cannot be shared.
+           )doc",
+           py::arg("a"),
+           py::keep_alive<1, 2>()
+    );
+
+    // Operators
+    cl.def(py::self == py::self, release_gil());
+    cl.def(py::self != py::self, release_gil());
+
+    // Arithmetic
+    cl.def("add",
+           [](Class& im, const Class& img) -> Class& { return pointwise(im, im, img, Add()); },
+           R"doc(
+              In-place pointwise addition of an image.
+
+              Args:
+                  img (CImg): Image with the same dimensions and data type.
+
+              Raises:
+                  RuntimeError: If the image dimensions differ.
+           )doc",
+           py::arg("img"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
+
+    cl.def("add",
+           [](Class& im, const double value) -> Class& { return pointwise(im, im, value, Add()); },
+           R"doc(
+              In-place pointwise addition of a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
+
+    cl.def("sub",
+           [](Class& im, const Class& img) -> Class& { return pointwise(im, im, img, Sub()); },
+           R"doc(
+              In-place pointwise subtraction of an image.
+
+              Args:
+                  img (CImg): Image with the same dimensions and data type.
+
+              Raises:
+                  RuntimeError: If the image dimensions differ.
+           )doc",
+           py::arg("img"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
+
+    cl.def("sub",
+           [](Class& im, const double value) -> Class& { return pointwise(im, im, value, Sub()); },
+           R"doc(
+              In-place pointwise subtraction of a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
+
+    cl.def("mul",
+           [](Class& im, const double value) -> Class& { return pointwise(im, im, value, Mul()); },
+           R"doc(
+              In-place pointwise multiplication by a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
+
+    cl.def("div",
+           [](Class& im, const double value) -> Class& { return pointwise(im, im, value, Div()); },
+           R"doc(
+              In-place pointwise division by a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
+
+    cl.def("floordiv",
+           [](Class& im, const Class& img) -> Class& { return pointwise(im, im, img, FloorDiv()); },
+           R"doc(
+              In-place pointwise floor division by an image.
+
+              Args:
+                  img (CImg): Image with the same dimensions and data type.
+
+              Raises:
+                  RuntimeError: If the image dimensions differ.
+           )doc",
+           py::arg("img"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
+
+    cl.def("floordiv",
+           [](Class& im, const double value) -> Class& { return pointwise(im, im, value, FloorDiv()); },
+           R"doc(
+              In-place pointwise floor division by a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
+
+    cl.def("get_add",
+           [](const Class& im, const Class& img) { return get_pointwise(im, img, Add()); },
+           R"doc(
+              Return result of pointwise addition of an image.
+
+              Args:
+                  img (CImg): Image with the same dimensions and data type.
+
+              Raises:
+                  RuntimeError: If the image dimensions differ.
+           )doc",
+           py::arg("img"),
+           release_gil()
+    );
+
+    cl.def("get_add",
+           [](const Class& im, const double value) { return get_pointwise(im, value, Add()); },
+           R"doc(
+              Return result of pointwise addition of a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           release_gil()
+    );
+
+    cl.def("get_sub",
+           [](const Class& im, const Class& img) { return get_pointwise(im, img, Sub()); },
+           R"doc(
+              Return result of pointwise subtraction of an image.
+
+              Args:
+                  img (CImg): Image with the same dimensions and data type.
+
+              Raises:
+                  RuntimeError: If the image dimensions differ.
+           )doc",
+           py::arg("img"),
+           release_gil()
+    );
+
+    cl.def("get_sub",
+           [](const Class& im, const double value) { return get_pointwise(im, value, Sub()); },
+           R"doc(
+              Return result of pointwise subtraction of a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           release_gil()
+    );
+
+    cl.def("get_mul",
+           [](const Class& im, const Class& img) { return get_pointwise(im, img, Mul()); },
+           R"doc(
+              Return result of pointwise multiplication by an image.
+
+              Args:
+                  img (CImg): Image with the same dimensions and data type.
+
+              Raises:
+                  RuntimeError: If the image dimensions differ.
+           )doc",
+           py::arg("img"),
+           release_gil()
+    );
+
+    cl.def("get_mul",
+           [](const Class& im, const double value) { return get_pointwise(im, value, Mul()); },
+           R"doc(
+              Return result of pointwise multiplication by a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           release_gil()
+    );
+
+    cl.def("get_div",
+           [](const Class& im, const Class& img) { return get_pointwise(im, img, Div()); },
+           R"doc(
+              Return result of pointwise division by an image.
+
+              Args:
+                  img (CImg): Image with the same dimensions and data type.
+
+              Raises:
+                  RuntimeError: If the image dimensions differ.
+           )doc",
+           py::arg("img"),
+           release_gil()
+    );
+
+    cl.def("get_div",
+           [](const Class& im, const double value) { return get_pointwise(im, value, Div()); },
+           R"doc(
+              Return result of pointwise division by a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           release_gil()
+    );
+
+    cl.def("get_floordiv",
+           [](const Class& im, const Class& img) { return get_pointwise(im, img, FloorDiv()); },
+           R"doc(
+              Return result of pointwise floor division by an image.
+
+              Args:
+                  img (CImg): Image with the same dimensions and data type.
+
+              Raises:
+                  RuntimeError: If the image dimensions differ.
+           )doc",
+           py::arg("img"),
+           release_gil()
+    );
+
+    cl.def("get_floordiv",
+           [](const Class& im, const double value) { return get_pointwise(im, value, FloorDiv()); },
+           R"doc(
+              Return result of pointwise floor division by a value.
+
+              Args:
+                  value (float): Second operand.
+           )doc",
+           py::arg("value"),
+           release_gil()
+    );
+
+    // Load 
+    cl.def("load", 
+           &Class::load, 
+           R"doc(
+            Load image from a file.
+
+            Args:
+                filename (str): Filename of image.
+            Raises:
+                RuntimeError: If file does not exist.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("load_bmp", 
+           (Class &(Class::*)(const char* const))&Class::load_bmp,
+           R"doc(
+            Load image from a BMP file.
+
+            Args:
+                filename (str): Filename of image.
+            Raises:
+                RuntimeError: If file does not exist.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("load_jpeg", 
+           (Class &(Class::*)(const char* const))&Class::load_jpeg,
+           R"doc(
+            Load image from a JPEG file.
+
+            Args:
+                filename (str): Filename of image.
+            Raises:
+                RuntimeError: If file does not exist.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("load_png", 
+           (Class& (Class::*)(const char* const, unsigned int *const))&Class::load_png,
+           R"doc(
+              Load image from a PNG file.
+
+              Args:
+                  filename (str): Filename of image.
+              Returns:
+                  Bits per pixel
+              Raises:
+                  RuntimeError: If file does not exist.
+           )doc",
+           py::arg("filename"),
+           py::arg("bits_per_pixel") = 0,
+           release_gil()
+    );
+
+    cl.def("load_tiff", 
+           [](Class& im,  const char* const filename, const unsigned int first_frame, const unsigned int last_frame, const unsigned int step_frame)
+           {
+               return im.load_tiff(filename, first_frame, last_frame, step_frame);
+           },
+           R"doc(
+            Load image from a TIFF file.
+
+            Args:
+                filename (str): Filename of image.
+                first_frame: First frame to read (for multi-pages tiff).
+                last_frame: Last frame to read (for multi-pages tiff).
+                step_frame: Step value of frame reading.
+            Returns:
+                Voxel size, as stored in the filename.
+            Raises:
+                RuntimeError: If file does not exist.
+           )doc",
+           py::arg("filename"),
+           py::arg("first_frame") = 0,
+           py::arg("last_frame") = ~0U,
+           py::arg("step_frame") = 1,
+           release_gil()
+    );
+
+    cl.def("frombytes",
+           [](Class& im, const py::buffer& buffer, const std::string& format) -> Class&
+           {
+               py::buffer_info info = buffer.request();
+               auto data = buffer_data(info);
+               native_scope release;
+               return load_memory(im, data.first, data.second, format);
+           },
+           R"doc(
+            Load image from encoded image data in memory.
+
+            Args:
+                buffer: Encoded image data as bytes or any object
+                        supporting the buffer protocol.
+                format (str): Image format, one of 'jpeg', 'png', 'bmp',
+                              'tiff' or 'cimg'. Detected from the data
+                              if empty.
+            Raises:
+                RuntimeError: If the data cannot be decoded.
+           )doc",
+           py::arg("buffer"),
+           py::arg("format") = "",
+           py::return_value_policy::reference
+    );
+
+    cl.def_static("load_many",
+           [](const py::iterable& filenames, const unsigned int workers)
+           {
+               std::vector<std::string> names;
+               for (auto filename : filenames)
+                   names.push_back(filename.cast<std::string>());
+               std::vector<Class> images;
+               {
+                   native_scope release;
+                   images = load_many<T>(names, workers);
+               }
+               py::list res;
+               for (auto& img : images)
+                   res.append(py::cast(std::move(img)));
+               return res;
+           },
+           R"doc(
+            Load images from files concurrently.
+
+            Args:
+                filenames (list): Filenames of images.
+                workers: Number of threads used for loading.
+            Returns:
+                List of images in the order of the filenames.
+            Raises:
+                RuntimeError: If a file does not exist.
+           )doc",
+           py::arg("filenames"),
+           py::arg("workers") = 1
+    );
+
+#ifdef cimg_use_tiff
+    cl.def("load_tiff_frames",
+           [](Class& im, TiffFile& file, const unsigned int first_frame, const unsigned int count) -> Class&
+           {
+               return file.read(im, first_frame, count);
+           },
+           R"doc(
+            Load frames of an open TIFF file.
+
+            The frames are stacked along the z-axis.
+
+            Args:
+                file (TiffFile): Open TIFF file.
+                first_frame: First frame to read.
+                count: Number of frames to read.
+           )doc",
+           py::arg("file"),
+           py::arg("first_frame") = 0,
+           py::arg("count") = 1,
+           py::return_value_policy::reference,
+           release_gil()
+    );
+#endif
+
+    // Save
+    cl.def("save", 
+           &Class::save,
+           R"doc(
+              Save image as a file.
+
+              The used file format is defined by the file extension
+              in the filename.
+
+              Args:
+                  filename (str): Filneame of image.
+                  number: When positive, represents an index added to the filename.
+                          Otherwise, no number is added.
+                  digits: Number of digits used for adding the number to the filename.
+           )doc",
+           py::arg("filename"),
+           py::arg("number") = -1,
+           py::arg("digits") = 6,
+           release_gil()
+    );
+
+    cl.def("save_bmp", 
+           (const Class& (Class::*)(const char* const) const)&Class::save_bmp,
+           R"doc(
+             Save image as a BMP file.
+
+             Args:
+                filename (str): Filename of image.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("save_jpeg", 
+           (const Class& (Class::*)(const char* const, const unsigned int) const)&Class::save_jpeg,
+           R"doc(
+              Save image as a JPEG file.
+
+              Args:
+                  filename (str): Filename of image.
+                  quality: Image quality (in %).
+           )doc",
+           py::arg("filename"),
+           py::arg("quality") = 100,
+           release_gil()
+    );
+
+    cl.def("save_png", 
+           (const Class& (Class::*)(const char* const, const unsigned int) const)&Class::save_png,
+           R"doc(
+              Save image as a PNG file.
+
+              Args:
+                  filename (str): Filename of image.
+                  bytes_per_pixel: Force the number of bytes per pixels for
+                                   saving, when possible.
+           )doc",
+           py::arg("filename"),
+           py::arg("bytes_per_pixel") = 0,
+           release_gil()
+    );
+
+    cl.def("save_tiff", 
+           [](const Class& im, const char* const filename, const unsigned int compression_type, pyarray_float voxel_size, const char* const description, bool use_bigtiff)
+           {
+               native_scope release;
+               return im.save_tiff(filename, compression_type, voxel_size.size() == 0 ? 0 : voxel_size.data(), description, use_bigtiff);
+           },
+           R"doc(
+              Save image as a TIFF file.
+
+              Args:
+                  filename (str): Filename of image.
+                  compression_type:    Type of data compression.
+                      Can be: C_NONE, C_LZW, C_JPEG.
+                  voxel_size: Voxel size, to be stored in the filename.
+                  description: Description, to be stored in the filename.
+                  use_bigtiff: Allow to save big tiff files (>4Gb).
+           )doc",
+           py::arg("filename"),
+           py::arg("compression_type") = 0,
+           py::arg("voxel_size") = pyarray_float(),
+           py::arg("description") = "",
+           py::arg("use_bigtiff") = true
+     );
+
+    cl.def("tobytes",
+           [](const Class& im, const std::string& format, const unsigned int quality,
+              const unsigned int bytes_per_pixel, const unsigned int compression_type,
+              const pyarray_float& voxel_size, const std::string& description,
+              const bool use_bigtiff, const bool is_compressed)
+           {
+               const SaveOptions opts = {quality, bytes_per_pixel, compression_type,
+                                         voxel_size.size() == 0 ? nullptr : voxel_size.data(),
+                                         description.c_str(), use_bigtiff, is_compressed};
+               MemoryBuffer buf;
+               {
+                   native_scope release;
+                   save_memory(im, buf, format, opts);
+               }
+               return buffer_array(buf);
+           },
+           R"doc(
+              Encode image into memory.
+
+              Args:
+                  format (str): Image format, one of 'jpeg', 'png', 'bmp',
+                                'tiff' or 'cimg'.
+                  quality: Image quality (in %) of JPEG images.
+                  bytes_per_pixel: Force the number of bytes per pixels for
+                                   saving PNG images, when possible.
+                  compression_type: Type of data compression of TIFF images.
+                      Can be: C_NONE, C_LZW, C_JPEG.
+                  voxel_size: Voxel size, to be stored in TIFF images.
+                  description: Description, to be stored in TIFF images.
+                  use_bigtiff: Allow to save big tiff images (>4Gb).
+                  is_compressed: Compress data of .cimg images.
+              Returns:
+                  Encoded image data as uint8 array.
+           )doc",
+           py::arg("format"),
+           py::arg("quality") = 100,
+           py::arg("bytes_per_pixel") = 0,
+           py::arg("compression_type") = 0,
+           py::arg("voxel_size") = pyarray_float(),
+           py::arg("description") = "",
+           py::arg("use_bigtiff") = true,
+           py::arg("is_compressed") = false
+    );
+
+    // Instance characteristics
+    cl.def("spectrum", 
+           &Class::spectrum,
+           "Return spectrum (number of channels) of image."
+    );
+
+    cl.def("depth", 
+           &Class::depth,
+           "Return depth of image"
+    );
+
+    cl.def("height", 
+           &Class::height,
+           "Return height of image"
+    );
+
+    cl.def("width", 
+           &Class::width,
+           "Return width of image"
+    );
+
+    cl.def("size", 
+           &Class::size,
+           "Return the total number of pixel values in the image."
+    );
+
+    // Buffer protocol
+    cl.def_buffer([](Class &c) -> py::buffer_info {
+            return py::buffer_info(
+                c.data(),                               /* Pointer to buffer */
+                sizeof(T),                              /* Size of one scalar */
+                py::format_descriptor<T>::format(),     /* Python struct-style format descriptor */
+                4,                                      /* Number of dimensions */
+                { c.spectrum(), c.depth(), c.height(), c.width() }, /* Buffer dimensions */
+                { sizeof(T) * c.depth() * c.height() * c.width(),
+                  sizeof(T) * c.height() * c.width(),
+                  sizeof(T) * c.width(),                /* Strides (in bytes) for each index */
+                  sizeof(T) }
+            );
+        });
 
     cl.def("display",
+#if cimg_display==0
+           [](const Class&, const char *const, const bool, unsigned int *const, const bool) -> const Class&
+           {
+               throw std::runtime_error("Display is not available, pycimg was built without display support.");
+           },
+#else
            (const Class& (Class::*)(const char *const, const bool, unsigned int *const, const bool) const)(&Class::display),
+#endif
+           R"doc(
+              Display image into a CImgDisplay window.
+
+              Args:
+                  title (str): Title of window.
+
+              Raises:
+                  RuntimeError: If pycimg was built without display support.
+           )doc",
+           py::arg("title") = "",
+           py::arg("display_info") = true,
+           py::arg("XYZ") = 0,
+           py::arg("exit_on_anykey") = false,
+           release_gil()
+    );
+    
+    cl.def("resize",
+           (Class& (Class::*)(const int, const int, const int, const int, const int, const unsigned int, const float, const float, const float, const float))(&Class::resize),
+           R"doc(
+            Resize image to new dimensions.
+
+            Args:
+                size_x (int): Number of columns (new size along the X-axis).
+                size_y (int): Number of rows (new size along the Y-axis).
+                size_z (int): Number of slices (new size along the Z-axis).
+                size_c (int): Number of vector-channels (new size along the C-axis).
+                interpolation_type (int):  Method of interpolation:
+                    NONE_RAW = no interpolation: raw memory resizing.
+                    NONE = no interpolation: additional space is filled according to boundary_conditions.
+                    NEAREST = nearest-neighbor interpolation.
+                    MOVING_AVERAGE = moving average interpolation.
+                    LINEAR = linear interpolation.
+                    GRID = grid interpolation.
+                    CUBIC = cubic interpolation.
+                    LANCZOS = lanczos interpolation.
+                boundary_conditions (int): Type of boundary conditions used if
+                                     necessary. Can be: DIRICHLET | NEUMANN | PERIODIC | MIRROR
+                centering_x (int): Set centering type (only if interpolation_type=NONE).
+                centering_y (int): Set centering type (only if interpolation_type=NONE).
+                centering_z (int): Set centering type (only if interpolation_type=NONE).
+                centering_c (int): Set centering type (only if interpolation_type=NONE).
+                  )doc",
+           py::arg("size_x"),
+           py::arg("size_y") = -100,
+           py::arg("size_z") = -100,
+           py::arg("size_c") = -100,
+           py::arg("interpolation_type") = 1,
+           py::arg("boundary_conditions") = 0,
+           py::arg("centering_x") = 0.0f,
+           py::arg("centering_y") = 0.0f,
+           py::arg("centering_z") = 0.0f,
+           py::arg("centering_c") = 0.0f,
+           release_gil()
+    );
+
+    cl.def("get_resize",
+           [](const Class& im, const int size_x, const int size_y, const int size_z, const int size_c, const int interpolation_type, const unsigned int boundary_conditions, const float centering_x, const float centering_y, const float centering_z, const float centering_c)
+           {
+               return im.get_resize(size_x, size_y, size_z, size_c, interpolation_type, boundary_conditions, centering_x, centering_y, centering_z, centering_c);
+           },
+           R"doc(
+              Return result of resize() as a new image.
+           )doc",
+           py::arg("size_x"),
+           py::arg("size_y") = -100,
+           py::arg("size_z") = -100,
+           py::arg("size_c") = -100,
+           py::arg("interpolation_type") = 1,
+           py::arg("boundary_conditions") = 0,
+           py::arg("centering_x") = 0.0f,
+           py::arg("centering_y") = 0.0f,
+           py::arg("centering_z") = 0.0f,
+           py::arg("centering_c") = 0.0f,
+           release_gil()
+    );
+
+    cl.def("resize_halfXY",
+           &Class::resize_halfXY,
+           R"doc(
+              Resize image to half-size along XY axes, using an optimized filter.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("get_resize_halfXY",
+           [](const Class& im)
+           {
+               return im.get_resize_halfXY();
+           },
+           R"doc(
+              Return result of resize_halfXY() as a new image.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("resize_doubleXY",
+           &Class::resize_doubleXY,
+           R"doc(
+              Resize image to double-size, using the Scale2X algorithm.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("get_resize_doubleXY",
+           [](const Class& im)
+           {
+               return im.get_resize_doubleXY();
+           },
+           R"doc(
+              Return result of resize_doubleXY() as a new image.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("resize_tripleXY",
+           &Class::resize_tripleXY,
+           R"doc(
+              Resize image to triple-size, using the Scale3X algorithm.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("get_resize_tripleXY",
+           [](const Class& im)
+           {
+               return im.get_resize_tripleXY();
+           },
+           R"doc(
+              Return result of resize_tripleXY() as a new image.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("mirror", 
+           (Class& (Class::*)(const char* const))&Class::mirror,
+           R"doc(
+              Mirror image content along specified axes.
+
+              Args:
+                  axes (str): Mirror axes as string, e.g. "x" or "xyz"
+           )doc",
+           py::arg("axes"),
+           release_gil()
+    );
+
+    cl.def("get_mirror",
+           [](const Class& im, const char* const axes)
+           {
+               return im.get_mirror(axes);
+           },
+           R"doc(
+              Return result of mirror() as a new image.
+           )doc",
+           py::arg("axes"),
+           release_gil()
+    );
+
+    cl.def("shift",
+           (Class& (Class::*)(const int, const int, const int, const int, const unsigned int))&Class::shift,
+           R"doc(
+              Shift image content.
+
+              Args:
+                  delta_x (int): Amount of displacement along the X-axis.
+                  delta_y (int): Amount of displacement along the Y-axis.
+                  delta_z (int): Amount of displacement along the Z-axis.
+                  delta_c (int): Amount of displacement along the C-axis.
+                  boundary_conditions (int): Border condition.
+           )doc",
+           py::arg("delta_x"),
+           py::arg("delta_y") = 0,
+           py::arg("delta_z") = 0,
+           py::arg("delta_c") = 0,
+           py::arg("boundary_conditions") = 0,
+           release_gil()
+    );
+
+    cl.def("get_shift",
+           [](const Class& im, const int delta_x, const int delta_y, const int delta_z, const int delta_c, const unsigned int boundary_conditions)
+           {
+               return im.get_shift(delta_x, delta_y, delta_z, delta_c, boundary_conditions);
+           },
+           R"doc(
+              Return result of shift() as a new image.
+           )doc",
+           py::arg("delta_x"),
+           py::arg("delta_y") = 0,
+           py::arg("delta_z") = 0,
+           py::arg("delta_c") = 0,
+           py::arg("boundary_conditions") = 0,
+           release_gil()
+    );
+
+    cl.def("permute_axes", 
+           &Class::permute_axes,
+           R"doc(
+              Permute axes order.
+
+              Args:
+                  order (str): Axes permutations as string of length 4.
+
+              Raises: RuntimeError if order is invalid.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("get_permute_axes",
+           [](const Class& im, const char* const order)
+           {
+               return im.get_permute_axes(order);
+           },
+           R"doc(
+              Return result of permute_axes() as a new image.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("unroll", 
+           &Class::unroll,
+           R"doc(
+              Unroll pixel values along specified axis.
+
+              Args:
+                  axis (str): 'x', 'y', 'z', or 'c'.
+
+              Raises: RuntimeError if axis is invalid.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("get_unroll",
+           [](const Class& im, const char axis)
+           {
+               return im.get_unroll(axis);
+           },
+           R"doc(
+              Return result of unroll() as a new image.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("rotate",
+           (Class& (Class::*)(const float, const unsigned int, const unsigned int))&Class::rotate,
+           R"doc(
+              Rotate image with arbitrary angle.
+
+              Args:
+                  angle (float): Rotation angle, in degrees.
+                  interpolation (int): Type of interpolation.
+                                 Can be { 0=nearest | 1=linear | 2=cubic | 3=mirror }.
+                  boundary_conditions (int): Boundary conditions.
+           )doc",
+           py::arg("angle"),
+           py::arg("interpolation") = 1,
+           py::arg("boundary_conditions") = 0,
+           release_gil()
+    );
+
+    cl.def("get_rotate",
+           [](const Class& im, const float angle, const unsigned int interpolation, const unsigned int boundary_conditions)
+           {
+               return im.get_rotate(angle, interpolation, boundary_conditions);
+           },
+           R"doc(
+              Return result of rotate() as a new image.
+           )doc",
+           py::arg("angle"),
+           py::arg("interpolation") = 1,
+           py::arg("boundary_conditions") = 0,
+           release_gil()
+    );
+
+    cl.def("crop",
+           (Class& (Class::*)(const int, const int, const int, const int, const int, const int, const int, const int, const unsigned int))&Class::crop,
+           R"doc(
+              Crop image region.
+
+              Args:
+                 x0 (int): X-coordinate of the upper-left crop rectangle corner.
+                 y0 (int): Y-coordinate of the upper-left crop rectangle corner.
+                 z0 (int): Z-coordinate of the upper-left crop rectangle corner.
+                 c0 (int): C-coordinate of the upper-left crop rectangle corner.
+                 x1 (int): X-coordinate of the lower-right crop rectangle corner.
+                 y1 (int): Y-coordinate of the lower-right crop rectangle corner.
+                 z1 (int): Z-coordinate of the lower-right crop rectangle corner.
+                 c1 (int): C-coordinate of the lower-right crop rectangle corner.
+                 boundary_conditions (int): boundary conditions.
+           )doc",
+           py::arg("x0"),
+           py::arg("y0"),
+           py::arg("z0"),
+           py::arg("c0"),
+           py::arg("x1"),
+           py::arg("y1"),
+           py::arg("z1"),
+           py::arg("c1"),
+           py::arg("boundary_conditions") = 0,
+           release_gil()
+    );
+
+    cl.def("get_crop",
+           [](const Class& im, const int x0, const int y0, const int z0, const int c0, const int x1, const int y1, const int z1, const int c1, const unsigned int boundary_conditions)
+           {
+               return im.get_crop(x0, y0, z0, c0, x1, y1, z1, c1, boundary_conditions);
+           },
+           R"doc(
+              Return result of crop() as a new image.
+           )doc",
+           py::arg("x0"),
+           py::arg("y0"),
+           py::arg("z0"),
+           py::arg("c0"),
+           py::arg("x1"),
+           py::arg("y1"),
+           py::arg("z1"),
+           py::arg("c1"),
+           py::arg("boundary_conditions") = 0,
+           release_gil()
+    );
+
+    cl.def("_crop_into",
+           [](const Class& im, Class& out, const int x0, const int y0, const int z0, const int c0,
+              const int x1, const int y1, const int z1, const int c1, const unsigned int boundary_conditions)
+           {
+               crop_into(im, out, x0, y0, z0, c0, x1, y1, z1, c1, boundary_conditions);
+           },
+           R"doc(
+              Write result of get_crop() into out, an image of the size of the region.
+           )doc",
+           py::arg("out"),
+           py::arg("x0"),
+           py::arg("y0"),
+           py::arg("z0"),
+           py::arg("c0"),
+           py::arg("x1"),
+           py::arg("y1"),
+           py::arg("z1"),
+           py::arg("c1"),
+           py::arg("boundary_conditions") = 0,
+           release_gil()
+    );
+
+    cl.def("autocrop",
+           [](Class& im, pyarray color, const char* const axes)
+           {
+                if(color.size() != 0 && color.size() != im.spectrum())
+                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
+                native_scope release;
+                if(color.size() == 0)
+                    return im.autocrop(nullptr, axes);
+                return im.autocrop(color.data(), axes);
+           }, 
+           R"doc(
+              Autocrop image region, regarding the specified background color.
+
+              Args:
+                  color (int/list): Color used for the crop. If 0, color is guessed.
+                  axes (str): Axes used for crop.
+           )doc",
+           py::arg("color") = pyarray(),
+           py::arg("axes") = "czyx"
+    );
+
+    cl.def("get_autocrop",
+           [](const Class& im, pyarray color, const char* const axes)
+           {
+                if(color.size() != 0 && color.size() != im.spectrum())
+                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
+                native_scope release;
+                return im.get_autocrop(color.size() == 0 ? nullptr : color.data(), axes);
+           },
+           R"doc(
+              Return result of autocrop() as a new image.
+           )doc",
+           py::arg("color") = pyarray(),
+           py::arg("axes") = "czyx"
+    );
+
+    cl.def("append",
+           (Class& (Class::*)(const Class&, const char, const float))&Class::append,
+           R"doc(
+              Append two images along specified axis.
+
+              Args:
+                  img (CImg): Image to append with instance image.
+                  axis (str): Appending axis. Can be { 'x' | 'y' | 'z' | 'c' }.
+                  align (float): Append alignment in [0,1].
+           )doc",
+           py::arg("img"),
+           py::arg("axis") = 'x',
+           py::arg("align") = 0,
+           release_gil()
+    );
+
+    cl.def("get_append",
+           [](const Class& im, const Class& img, const char axis, const float align)
+           {
+               return im.get_append(img, axis, align);
+           },
+           R"doc(
+              Return result of append() as a new image.
+           )doc",
+           py::arg("img"),
+           py::arg("axis") = 'x',
+           py::arg("align") = 0,
+           release_gil()
+    );
+       
+    cl.def("at",
+           [](const Class& im, const int x, const int y, const int z, const int c)
+           {
+               return im[pixel_offset(im, x, y, z, c)];
+           },
+           R"doc(
+              Return pixel value.
+
+              Args:
+                  x (int): X-coordinate of the pixel value.
+                  y (int): Y-coordinate of the pixel value.
+                  z (int): Z-coordinate of the pixel value.
+                  c (int): C-coordinate of the pixel value.
+              Negative coordinates count from the end of the axis.
+
+              Raises:
+                  IndexError: If the pixel is outside the image.
+           )doc",
+           py::arg("x"),
+           py::arg("y") = 0,
+           py::arg("z") = 0,
+           py::arg("c") = 0
+    );
+
+    cl.def("set_at",
+           [](Class& im, const double value, const int x, const int y, const int z, const int c)
+           {
+               im[pixel_offset(im, x, y, z, c)] = checked_cast<T>(value);
+           },
+           R"doc(
+              Set pixel value.
+
+              Args:
+                  value (float): New pixel value.
+                  x (int): X-coordinate of the pixel value.
+                  y (int): Y-coordinate of the pixel value.
+                  z (int): Z-coordinate of the pixel value.
+                  c (int): C-coordinate of the pixel value.
+              Negative coordinates count from the end of the axis.
+
+              Raises:
+                  IndexError: If the pixel is outside the image.
+                  OverflowError: If value is out of the range of an integer
+                                 pixel type.
+           )doc",
+           py::arg("value"),
+           py::arg("x"),
+           py::arg("y") = 0,
+           py::arg("z") = 0,
+           py::arg("c") = 0
+    );
+
+    cl.def("linear_atX",
+           (Tfloat (Class::*)(const float, const  int, const int, const int) const)(&Class::linear_atX),
+           R"doc(
+              Return pixel value, using linear interpolation
+              and Neumann boundary conditions for the X-coordinate.
+
+              Args:
+                  fx (float): X-coordinate of the pixel value.
+                  y (int):    Y-coordinate of the pixel value
+                  z (int):    Z-coordinate of the pixel value.
+                  c (int):    C-coordinate of the pixel value.
+
+              Returns: a linearly-interpolated pixel value of the image
+                       instance located at (fx,y,z,c).
+           )doc",
+           py::arg("fx"),
+           py::arg("y") = 0,
+           py::arg("z") = 0,
+           py::arg("c") = 0
+    );
+
+
+    cl.def("linear_atXY",
+           (Tfloat (Class::*)(const float, const float, const int, const int) const)(&Class::linear_atXY),
+           R"doc(
+              Return pixel value, using linear interpolation
+              and Neumann boundary conditions for the X and Y-coordinates.
+
+              Args:
+                  fx (float): X-coordinate of the pixel value.
+                  fy (float): Y-coordinate of the pixel value.
+                  z (int):    Z-coordinate of the pixel value.
+                  c (int):    C-coordinate of the pixel value.
+
+              Returns: a linearly-interpolated pixel value of the image
+                       instance located at (fx,fy,z,c).
+           )doc",
+           py::arg("fx"),
+           py::arg("fy"),
+           py::arg("z") = 0,
+           py::arg("c") = 0
+    );
+
+    cl.def("linear_atXYZ",
+           (Tfloat (Class::*)(const float, const float, const float, const int) const)(&Class::linear_atXYZ),
+           R"doc(
+              Return pixel value, using linear interpolation
+              and Neumann boundary conditions for the X, Y, and Z-coordinates.
+
+              Args:
+                  fx (float): X-coordinate of the pixel value.
+                  fy (float): Y-coordinate of the pixel value.
+                  fz (float): Z-coordinate of the pixel value.
+                  c (int):    C-coordinate of the pixel value.
+
+              Returns: a linearly-interpolated pixel value of the image
+                       instance located at (fx,fy,fz,c).
+           )doc",
+           py::arg("fx"),
+           py::arg("fy"),
+           py::arg("fz"),
+           py::arg("c") = 0
+    );
+   
+    cl.def("linear_atXYZC",
+           (Tfloat (Class::*)(const float, const float, const float, const float) const)(&Class::linear_atXYZC),
+           R"doc(
+              Return pixel value, using linear interpolation
+              and Neumann boundary conditions for the X, Y, Z, and C-coordinates.
+
+              Args:
+                  fx (float): X-coordinate of the pixel value.
+                  fy (float): Y-coordinate of the pixel value.
+                  fz (float): Z-coordinate of the pixel value.
+                  fc (float):    C-coordinate of the pixel value.
+
+              Returns: a linearly-interpolated pixel value of the image
+                       instance located at (fx,fy,fz,fc).
+           )doc",
+           py::arg("fx"),
+           py::arg("fy"),
+           py::arg("fz"),
+           py::arg("fc")
+    ); 
+
+    cl.def("nearest_at",
+           [](const Class& im, const pyarray_float& coords) { return sample_at<Interp::Nearest>(im, coords); },
+           R"doc(
+              Return pixel values at many coordinates, using nearest neighbor
+              interpolation and Neumann boundary conditions.
+
+              Args:
+                  coords: (N,k) array of coordinates (x[,y[,z[,c]]]),
+                          with 1 <= k <= 4. Missing coordinates are 0.
+
+              Returns: (N,spectrum) array of the nearest
+                       pixel values of all channels, or (N,) array
+                       if the C-coordinate is given.
+           )doc",
+           py::arg("coords")
+    );
+
+    cl.def("linear_at",
+           [](const Class& im, const pyarray_float& coords) { return sample_at<Interp::Linear>(im, coords); },
+           R"doc(
+              Return pixel values at many coordinates, using linear
+              interpolation and Neumann boundary conditions.
+
+              Args:
+                  coords: (N,k) array of coordinates (x[,y[,z[,c]]]),
+                          with 1 <= k <= 4. Missing coordinates are 0.
+
+              Returns: (N,spectrum) array of the linearly-interpolated
+                       pixel values of all channels, or (N,) array
+                       if the C-coordinate is given.
+           )doc",
+           py::arg("coords")
+    );
+
+    cl.def("cubic_at",
+           [](const Class& im, const pyarray_float& coords) { return sample_at<Interp::Cubic>(im, coords); },
+           R"doc(
+              Return pixel values at many coordinates, using cubic
+              interpolation and Neumann boundary conditions.
+
+              Args:
+                  coords: (N,k) array of coordinates (x[,y[,z[,c]]]),
+                          with 1 <= k <= 4. Missing coordinates are 0.
+                          Interpolation along C is linear.
+
+              Returns: (N,spectrum) array of the cubic-interpolated
+                       pixel values of all channels, or (N,) array
+                       if the C-coordinate is given.
+           )doc",
+           py::arg("coords")
+    );
+
+    // Value manipulation
+    cl.def("fill",
+           (Class& (Class::*)(const T&))(&Class::fill),
            R"doc(
-              Display image into a CImgDisplay window.
+              Fill all pixel values with specified value.
+
+              Args:
+                  val (float): Fill value.
+           )doc",
+           py::arg("val"),
+           release_gil()
+    );
+
+    cl.def("get_fill",
+           [](const Class& im, const T val)
+           {
+               return im.get_fill(val);
+           },
+           R"doc(
+              Return result of fill() as a new image.
+           )doc",
+           py::arg("val"),
+           release_gil()
+    );
+
+    cl.def("invert_endianness", 
+           &Class::invert_endianness,
+           "Invert endianness of all pixel values.",
+           release_gil()
+    );
+
+    cl.def("get_invert_endianness",
+           [](const Class& im)
+           {
+               return im.get_invert_endianness();
+           },
+           R"doc(
+              Return result of invert_endianness() as a new image.
+           )doc",
+           release_gil()
+    );
+
+    cl.def("rand", 
+           (Class& (Class::*)(const T&, const T&))(&Class::rand),
+           R"doc(
+               Fill image with random values in specified range.
+
+               Args:
+                   val_min (float): Minimal authorized random value.
+                   val_max (float): Maximal authorized random value.
+             )doc",
+             py::arg("val_min"),
+             py::arg("val_max"),
+           release_gil()
+    );
+
+    cl.def("get_rand",
+           [](const Class& im, const T val_min, const T val_max)
+           {
+               return im.get_rand(val_min, val_max);
+           },
+           R"doc(
+              Return result of rand() as a new image.
+           )doc",
+           py::arg("val_min"),
+           py::arg("val_max"),
+           release_gil()
+    );
+
+    cl.def("round", 
+           (Class& (Class::*)(const double, const int))&Class::round,
+           R"doc(
+              Round pixel values.
+
+              Args:
+                  y (int): Rounding precision.
+                  rounding_type (int): Rounding type. Can be:
+                      R_BACKWARD, R_NEAREST, R_FORWARD
+           )doc",
+           py::arg("y") = 1,
+           py::arg("rounding_type") = 0,
+           release_gil()
+    );
+
+    cl.def("get_round",
+           [](const Class& im, const double y, const int rounding_type)
+           {
+               return im.get_round(y, rounding_type);
+           },
+           R"doc(
+              Return result of round() as a new image.
+           )doc",
+           py::arg("y") = 1,
+           py::arg("rounding_type") = 0,
+           release_gil()
+    );
+
+    cl.def("noise", 
+           (Class& (Class::*)(const double, const unsigned int))&Class::noise,
+           R"doc(
+              Add random noise to pixel values.
+
+              Args:
+                  sigma (float): Amplitude of the random additive noise.
+                                 If sigma<0, it stands for a percentage of
+                                 the global value range.
+
+                  noise_type (int): Type of additive noise (can be
+                                    GAUSSIAN,
+                                    UNIFORM,
+                                    SALT_AND_PEPPER,
+                                    POISSON or
+                                    RICIAN).
+           )doc",
+           py::arg("sigma"),
+           py::arg("noise_type") = 0,
+           release_gil()
+    );
+
+    cl.def("get_noise",
+           [](const Class& im, const double sigma, const unsigned int noise_type)
+           {
+               return im.get_noise(sigma, noise_type);
+           },
+           R"doc(
+              Return result of noise() as a new image.
+           )doc",
+           py::arg("sigma"),
+           py::arg("noise_type") = 0,
+           release_gil()
+    );
+
+
+    cl.def("normalize", 
+           (Class& (Class::*)(const T&, const T&, const float))&Class::normalize,
+           R"doc(
+              Linearly normalize pixel values.
+
+              Args:
+                  min_value (float): Minimum desired value of resulting image.
+                  max_value (float): Maximum desired value of resulting image.
+                  constant_case_ratio (float): in case of instance image having a constant value, 
+                                               tell what ratio of [min_value,max_value] is used to fill the normalized image 
+                                               (=0 for min_value, =1 for max_value, =0.5 for (min_value + max_value)/2).
+           )doc",
+           py::arg("min_value"),
+           py::arg("max_value"),
+           py::arg("constant_case_ratio") = 0,
+           release_gil()
+    );
+
+    cl.def("get_normalize",
+           [](const Class& im, const T min_value, const T max_value, const float constant_case_ratio)
+           {
+               Class res(im, false);
+               res.normalize(min_value, max_value, constant_case_ratio);
+               return res;
+           },
+           R"doc(
+              Return result of normalize() as a new image.
+           )doc",
+           py::arg("min_value"),
+           py::arg("max_value"),
+           py::arg("constant_case_ratio") = 0,
+           release_gil()
+    );
+
+    cl.def("norm", 
+           (Class& (Class::*)(const int))&Class::norm,
+           R"doc(
+              Compute Lp-norm of each multi-valued pixel of the
+              image instance.
+
+              Args:
+                  norm_type (int): Type of computed vector norm. Can be:
+                  LINF_NORM, L0_NORM, L1_NORM, L2_NORM, or value p>2
+           )doc",
+           py::arg("norm_type") = 1,
+           release_gil()
+    );
+
+    cl.def("get_norm",
+           [](const Class& im, const int norm_type)
+           {
+               Class res(im, false);
+               res.norm(norm_type);
+               return res;
+           },
+           R"doc(
+              Return result of norm() as a new image.
+           )doc",
+           py::arg("norm_type") = 1,
+           release_gil()
+    );
+
+    cl.def("cut", 
+           (Class& (Class::*)(const T&, const T&))&Class::cut,
+           R"doc(
+              Cut pixel values in specified range.
+
+              Args:
+                  min_value (float): Minimum desired value of resulting image.
+                  max_value (float): Maximum desired value of resulting image.
+           )doc",
+           py::arg("min_value"),
+           py::arg("max_value"),
+           release_gil()
+    );
+
+    cl.def("get_cut",
+           [](const Class& im, const T min_value, const T max_value)
+           {
+               return im.get_cut(min_value, max_value);
+           },
+           R"doc(
+              Return result of cut() as a new image.
+           )doc",
+           py::arg("min_value"),
+           py::arg("max_value"),
+           release_gil()
+    );
+
+    cl.def("quantize", 
+           (Class& (Class::*)(const unsigned int, const bool))&Class::quantize,
+           R"doc(
+              Uniformly quantize pixel values.
+
+              Args:
+                  nb_levels (int): Number of quantization levels.
+                  keep_range (bool): Tells if resulting values keep the same
+                                     range as the original ones.
+           )doc",
+           py::arg("nb_levels"),
+           py::arg("keep_range") = true,
+           release_gil()
+    );
+
+    cl.def("get_quantize",
+           [](const Class& im, const unsigned int nb_levels, const bool keep_range)
+           {
+               return im.get_quantize(nb_levels, keep_range);
+           },
+           R"doc(
+              Return result of quantize() as a new image.
+           )doc",
+           py::arg("nb_levels"),
+           py::arg("keep_range") = true,
+           release_gil()
+    );
+
+    cl.def("threshold", 
+           (Class& (Class::*)(const T&, const bool, const bool))&Class::threshold,
+           R"doc(
+              Threshold pixel values.
+
+              Args:
+                  value (float): Threshold value.
+                  soft_threshold (bool): Tells if soft thresholding must be
+                                          applied (instead of hard one).
+                  strict_threshold (bool): Tells if threshold value is strict.
+           )doc",
+           py::arg("value"),
+           py::arg("soft_threshold") = false,
+           py::arg("strict_threshold") = false,
+           release_gil()
+    );
+
+    cl.def("get_threshold",
+           [](const Class& im, const T value, const bool soft_threshold, const bool strict_threshold)
+           {
+               return im.get_threshold(value, soft_threshold, strict_threshold);
+           },
+           R"doc(
+              Return result of threshold() as a new image.
+           )doc",
+           py::arg("value"),
+           py::arg("soft_threshold") = false,
+           py::arg("strict_threshold") = false,
+           release_gil()
+    );
+
+    cl.def("histogram", 
+           (Class& (Class::*)(const unsigned int, const T&, const T&))&Class::histogram,
+           R"doc(
+              Compute the histogram of pixel values.
+
+              Args:
+              nb_levels (int): Number of desired histogram levels.
+              min_value (float): Minimum pixel value considered for the
+                                   histogram computation. All pixel values
+                                   lower than min_value will not be counted.
+              max_value (float): Maximum pixel value considered for the
+                                   histogram computation. All pixel values
+                                   higher than max_value will not be counted.
+           )doc",
+           py::arg("nb_levels"),
+           py::arg("min_value"),
+           py::arg("max_value"),
+           release_gil()
+    );
+
+    cl.def("get_histogram",
+           [](const Class& im, const unsigned int nb_levels, const T min_value, const T max_value)
+           {
+               return as_class<T>(im.get_histogram(nb_levels, min_value, max_value));
+           },
+           R"doc(
+              Return result of histogram() as a new image.
+           )doc",
+           py::arg("nb_levels"),
+           py::arg("min_value"),
+           py::arg("max_value"),
+           release_gil()
+    );
+
+    cl.def("equalize", 
+           (Class& (Class::*)(const unsigned int, const T&, const T&))&Class::equalize,
+           R"doc(
+              Equalize histogram of pixel values.
+
+              Args:
+                  nb_levels (int): Number of desired histogram levels.
+                  min_value (float): Minimum pixel value considered for the
+                                     histogram computation. All pixel values
+                                     lower than min_value will not be counted.
+                  max_value (float): Maximum pixel value considered for the
+                                     histogram computation. All pixel values
+                                     higher than max_value will not be counted.
+           )doc",
+           py::arg("nb_levels"),
+           py::arg("min_value"),
+           py::arg("max_value"),
+           release_gil()
+    );
+
+    cl.def("get_equalize",
+           [](const Class& im, const unsigned int nb_levels, const T min_value, const T max_value)
+           {
+               return im.get_equalize(nb_levels, min_value, max_value);
+           },
+           R"doc(
+              Return result of equalize() as a new image.
+           )doc",
+           py::arg("nb_levels"),
+           py::arg("min_value"),
+           py::arg("max_value"),
+           release_gil()
+    );
+
+    cl.def("label", 
+           (Class& (Class::*)(const bool, const Tfloat, const bool))&Class::label,
+           R"doc(
+              Label connected components.
 
               Args:
-                  title (str): Title of window.
-           )doc",
-           py::arg("title") = "",
-           py::arg("display_info") = true,
-           py::arg("XYZ") = 0,
-           py::arg("exit_on_anykey") = false
-     );
-    
-    cl.def("resize",
-           (Class& (Class::*)(const int, const int, const int, const int, const int, const unsigned int, const float, const float, const float, const float))(&Class::resize),
+                  is_high_connectivity (bool): Choose between 4(false)
+                  - or 8(true)-connectivity in 2d case, and between 6(false)
+                  - or 26(true)-connectivity in 3d case.
+                  tolerance (float): Tolerance used to determine if two neighboring
+                                     pixels belong to the same region.
+           )doc", 
+           py::arg("is_high_connectivity") = false,
+           py::arg("tolerance") = 0,
+           py::arg("is_L2_norm") = true,
+           release_gil()
+    );
+
+    cl.def("get_label",
+           [](const Class& im, const bool is_high_connectivity, const Tfloat tolerance, const bool is_L2_norm)
+           {
+               return as_class<T>(im.get_label(is_high_connectivity, tolerance, is_L2_norm));
+           },
            R"doc(
-            Resize image to new dimensions.
+              Return result of label() as a new image.
+           )doc",
+           py::arg("is_high_connectivity") = false,
+           py::arg("tolerance") = 0,
+           py::arg("is_L2_norm") = true,
+           release_gil()
+    );
 
-            Args:
-                size_x (int): Number of columns (new size along the X-axis).
-                size_y (int): Number of rows (new size along the Y-axis).
-                size_z (int): Number of slices (new size along the Z-axis).
-                size_c (int): Number of vector-channels (new size along the C-axis).
-                interpolation_type (int):  Method of interpolation:
-                    NONE_RAW = no interpolation: raw memory resizing.
-                    NONE = no interpolation: additional space is filled according to boundary_conditions.
-                    NEAREST = nearest-neighbor interpolation.
-                    MOVING_AVERAGE = moving average interpolation.
-                    LINEAR = linear interpolation.
-                    GRID = grid interpolation.
-                    CUBIC = cubic interpolation.
-                    LANCZOS = lanczos interpolation.
-                boundary_conditions (int): Type of boundary conditions used if
-                                     necessary. Can be: DIRICHLET | NEUMANN | PERIODIC | MIRROR
-                centering_x (int): Set centering type (only if interpolation_type=NONE).
-                centering_y (int): Set centering type (only if interpolation_type=NONE).
-                centering_z (int): Set centering type (only if interpolation_type=NONE).
-                centering_c (int): Set centering type (only if interpolation_type=NONE).
-                  )doc",
-           py::arg("size_x"),
-           py::arg("size_y") = -100,
-           py::arg("size_z") = -100,
-           py::arg("size_c") = -100,
-           py::arg("interpolation_type") = 1,
-           py::arg("boundary_conditions") = 0,
-           py::arg("centering_x") = 0.0f,
-           py::arg("centering_y") = 0.0f,
-           py::arg("centering_z") = 0.0f,
-           py::arg("centering_c") = 0.0f
+    cl.def("min_max", 
+           [](Class& im)
+           {
+               T max_val;
+               T min_val = im.min_max(max_val);
+               return std::pair<T,T>{min_val, max_val};
+           }, 
+           " Returns: tuple with minimum and maximum pixel value. ",
+           release_gil()
     );
 
-    cl.def("resize_halfXY",
-           &Class::resize_halfXY,
-           R"doc(
-              Resize image to half-size along XY axes, using an optimized filter.
-           )doc"
+    cl.def("max_min", 
+           [](Class& im)
+           {
+               T min_val;
+               T max_val = im.max_min(min_val);
+               return std::pair<T,T>{max_val, min_val};
+           }, 
+           " Returns: tuple with maximum and minimum pixel value. ",
+           release_gil()
     );
 
-    cl.def("resize_doubleXY",
-           &Class::resize_doubleXY,
+    // Filtering transforms
+    cl.def("correlate",
+           (Class& (Class::*)(
+               const Class&, const unsigned int, const bool, const unsigned int,
+               const int, const int, const int,
+               const unsigned int, const unsigned int, const unsigned int,
+               const int, const int, const int,
+               const int, const int, const int,
+               const unsigned int, const unsigned int, const unsigned int
+           ))&Class::correlate,
+           R"doc( 
+               Correlate image by a kernel.
+
+               Args:
+                   kernel (CImg): the correlation kernel.
+                   boundary_conditions: boundary conditions (False=dirichlet, True=neumann)
+                   is_normalized (bool): enable local normalization.
+            )doc",
+            py::arg("kernel"),
+            py::arg("boundary_conditions") = 1u,
+            py::arg("is_normalized") = false,
+            py::arg("channel_mode") = 1u,
+            py::arg("xcenter") = (int)(~0U>>1),
+            py::arg("ycenter") = (int)(~0U>>1),
+            py::arg("zcenter") = (int)(~0U>>1),
+            py::arg("xstride") = 1u,
+            py::arg("ystride") = 1u,
+            py::arg("zstride") = 1u,
+            py::arg("xdilation") = 1,
+            py::arg("ydilation") = 1,
+            py::arg("zdilation") = 1,
+            py::arg("xoffset") = 0,
+            py::arg("yoffset") = 0,
+            py::arg("zoffset") = 0,
+            py::arg("xsize") = ~0u,
+            py::arg("ysize") = ~0u,
+            py::arg("zsize") = ~0u,
+           release_gil()
+    );
+
+    cl.def("get_correlate",
+           [](const Class& im, const Class& kernel, const unsigned int boundary_conditions, const bool is_normalized, const unsigned int channel_mode, const int xcenter, const int ycenter, const int zcenter, const unsigned int xstride, const unsigned int ystride, const unsigned int zstride, const int xdilation, const int ydilation, const int zdilation, const int xoffset, const int yoffset, const int zoffset, const unsigned int xsize, const unsigned int ysize, const unsigned int zsize)
+           {
+               return as_class<T>(im.get_correlate(kernel, boundary_conditions, is_normalized, channel_mode, xcenter, ycenter, zcenter, xstride, ystride, zstride, xdilation, ydilation, zdilation, xoffset, yoffset, zoffset, xsize, ysize, zsize));
+           },
            R"doc(
-              Resize image to double-size, using the Scale2X algorithm.
-           )doc"
-     );
+              Return result of correlate() as a new image.
+           )doc",
+           py::arg("kernel"),
+           py::arg("boundary_conditions") = 1u,
+           py::arg("is_normalized") = false,
+           py::arg("channel_mode") = 1u,
+           py::arg("xcenter") = (int)(~0U>>1),
+           py::arg("ycenter") = (int)(~0U>>1),
+           py::arg("zcenter") = (int)(~0U>>1),
+           py::arg("xstride") = 1u,
+           py::arg("ystride") = 1u,
+           py::arg("zstride") = 1u,
+           py::arg("xdilation") = 1,
+           py::arg("ydilation") = 1,
+           py::arg("zdilation") = 1,
+           py::arg("xoffset") = 0,
+           py::arg("yoffset") = 0,
+           py::arg("zoffset") = 0,
+           py::arg("xsize") = ~0u,
+           py::arg("ysize") = ~0u,
+           py::arg("zsize") = ~0u,
+           release_gil()
+    );
+    cl.def("convolve",
+           (Class& (Class::*)(
+               const Class&, const unsigned int, const bool, const unsigned int,
+               const int, const int, const int,
+               const unsigned int, const unsigned int, const unsigned int,
+               const int, const int, const int,
+               const int, const int, const int,
+               const unsigned int, const unsigned int, const unsigned int
+           ))&Class::convolve,
+           R"doc( 
+               Convolve image by a kernel.
 
-    cl.def("resize_tripleXY",
-           &Class::resize_tripleXY,
+               Args:
+                   kernel (CImg): the correlation kernel.
+                   boundary_conditions: boundary conditions.
+                   is_normalized (bool): enable local normalization.
+            )doc",
+            py::arg("kernel"),
+            py::arg("boundary_conditions") = 1u,
+            py::arg("is_normalized") = false,
+            py::arg("channel_mode") = 1u,
+            py::arg("xcenter") = (int)(~0U>>1),
+            py::arg("ycenter") = (int)(~0U>>1),
+            py::arg("zcenter") = (int)(~0U>>1),
+            py::arg("xstride") = 1u,
+            py::arg("ystride") = 1u,
+            py::arg("zstride") = 1u,
+            py::arg("xdilation") = 1,
+            py::arg("ydilation") = 1,
+            py::arg("zdilation") = 1,
+            py::arg("xoffset") = 0,
+            py::arg("yoffset") = 0,
+            py::arg("zoffset") = 0,
+            py::arg("xsize") = ~0u,
+            py::arg("ysize") = ~0u,
+            py::arg("zsize") = ~0u,
+           release_gil()
+    );
+
+    cl.def("get_convolve",
+           [](const Class& im, const Class& kernel, const unsigned int boundary_conditions, const bool is_normalized, const unsigned int channel_mode, const int xcenter, const int ycenter, const int zcenter, const unsigned int xstride, const unsigned int ystride, const unsigned int zstride, const int xdilation, const int ydilation, const int zdilation, const int xoffset, const int yoffset, const int zoffset, const unsigned int xsize, const unsigned int ysize, const unsigned int zsize)
+           {
+               return as_class<T>(im.get_convolve(kernel, boundary_conditions, is_normalized, channel_mode, xcenter, ycenter, zcenter, xstride, ystride, zstride, xdilation, ydilation, zdilation, xoffset, yoffset, zoffset, xsize, ysize, zsize));
+           },
            R"doc(
-              Resize image to triple-size, using the Scale3X algorithm.
-           )doc"
-     );
+              Return result of convolve() as a new image.
+           )doc",
+           py::arg("kernel"),
+           py::arg("boundary_conditions") = 1u,
+           py::arg("is_normalized") = false,
+           py::arg("channel_mode") = 1u,
+           py::arg("xcenter") = (int)(~0U>>1),
+           py::arg("ycenter") = (int)(~0U>>1),
+           py::arg("zcenter") = (int)(~0U>>1),
+           py::arg("xstride") = 1u,
+           py::arg("ystride") = 1u,
+           py::arg("zstride") = 1u,
+           py::arg("xdilation") = 1,
+           py::arg("ydilation") = 1,
+           py::arg("zdilation") = 1,
+           py::arg("xoffset") = 0,
+           py::arg("yoffset") = 0,
+           py::arg("zoffset") = 0,
+           py::arg("xsize") = ~0u,
+           py::arg("ysize") = ~0u,
+           py::arg("zsize") = ~0u,
+           release_gil()
+    );
 
-    cl.def("mirror", 
-           (Class& (Class::*)(const char* const))&Class::mirror,
+    cl.def("cumulate",
+           (Class& (Class::*)(const char* const))&Class::cumulate,
            R"doc(
-              Mirror image content along specified axes.
+              Cumulate image values, optionally along specified axes.
 
               Args:
-                  axes (str): Mirror axes as string, e.g. "x" or "xyz"
+                  axes (str): Cumulation axes as string, e.g. "x" or "xyz".
            )doc",
-           py::arg("axes")
+           py::arg("axes"),
+           release_gil()
     );
 
-    cl.def("shift",
-           (Class& (Class::*)(const int, const int, const int, const int, const unsigned int))&Class::shift,
+    cl.def("get_cumulate",
+           [](const Class& im, const char* const axes)
+           {
+               Class res(im, false);
+               res.cumulate(axes);
+               return res;
+           },
            R"doc(
-              Shift image content.
-
-              Args:
-                  delta_x (int): Amount of displacement along the X-axis.
-                  delta_y (int): Amount of displacement along the Y-axis.
-                  delta_z (int): Amount of displacement along the Z-axis.
-                  delta_c (int): Amount of displacement along the C-axis.
-                  boundary_conditions (int): Border condition.
+              Return result of cumulate() as a new image.
            )doc",
-           py::arg("delta_x"),
-           py::arg("delta_y") = 0,
-           py::arg("delta_z") = 0,
-           py::arg("delta_c") = 0,
-           py::arg("boundary_conditions") = 0
+           py::arg("axes"),
+           release_gil()
     );
 
-    cl.def("permute_axes", 
-           &Class::permute_axes,
+    cl.def("erode",
+           (Class& (Class::*)(const Class&, const unsigned int, const bool))&Class::erode,
            R"doc(
-              Permute axes order.
+              Erode image by a structuring element.
 
               Args:
-                  order (str): Axes permutations as string of length 4.
+                  kernel (CImg):	Structuring element.
+                  boundary_conditions (int): Boundary conditions.
+                  is_real (bool): Do the erosion in real (a.k.a 'non-flat')
+                                  mode (true) rather than binary mode (false).
+           )doc",
+           py::arg("kernel"),
+           py::arg("boundary_conditions") = 1,
+           py::arg("is_real") = false,
+           release_gil()
+    );
 
-              Raises: RuntimeError if order is invalid.
-           )doc"
+    cl.def("get_erode",
+           [](const Class& im, const Class& kernel, const unsigned int boundary_conditions, const bool is_real)
+           {
+               return im.get_erode(kernel, boundary_conditions, is_real);
+           },
+           R"doc(
+              Return result of erode() as a new image.
+           )doc",
+           py::arg("kernel"),
+           py::arg("boundary_conditions") = 1,
+           py::arg("is_real") = false,
+           release_gil()
     );
 
-    cl.def("unroll", 
-           &Class::unroll,
+    cl.def("dilate",
+           (Class& (Class::*)(const Class&, const unsigned int, const bool))&Class::dilate,
            R"doc(
-              Unroll pixel values along specified axis.
+              Dilate image by a structuring element.
 
               Args:
-                  axis (str): 'x', 'y', 'z', or 'c'.
+                  kernel (CImg):	Structuring element.
+                  boundary_conditions (int): Boundary conditions.
+                  is_real (bool): Do the erosion in real (a.k.a 'non-flat')
+                                  mode (true) rather than binary mode (false).
+           )doc",
+           py::arg("kernel"),
+           py::arg("boundary_conditions") = 1,
+           py::arg("is_real") = false,
+           release_gil()
+    );
 
-              Raises: RuntimeError if axis is invalid.
-           )doc"
+    cl.def("get_dilate",
+           [](const Class& im, const Class& kernel, const unsigned int boundary_conditions, const bool is_real)
+           {
+               return im.get_dilate(kernel, boundary_conditions, is_real);
+           },
+           R"doc(
+              Return result of dilate() as a new image.
+           )doc",
+           py::arg("kernel"),
+           py::arg("boundary_conditions") = 1,
+           py::arg("is_real") = false,
+           release_gil()
     );
 
-    cl.def("rotate",
-           (Class& (Class::*)(const float, const unsigned int, const unsigned int))&Class::rotate,
+    cl.def("watershed",
+           (Class& (Class::*)(const Class&, const bool))&Class::watershed,
            R"doc(
-              Rotate image with arbitrary angle.
+              Compute watershed transform.
 
               Args:
-                  angle (float): Rotation angle, in degrees.
-                  interpolation (int): Type of interpolation.
-                                 Can be { 0=nearest | 1=linear | 2=cubic | 3=mirror }.
-                  boundary_conditions (int): Boundary conditions.
+                  priority (CImg): Priority map.
+                  is_high_connectivity (bool): Choose between 4(false)- or
+                                        8(true)-connectivity in 2d case,
+                                        and between 6(false)- or
+                                        26(true)-connectivity in 3d case.
+           )doc",
+           py::arg("priority"),
+           py::arg("is_high_connectivity") = false,
+           release_gil()
+    );
+
+    cl.def("get_watershed",
+           [](const Class& im, const Class& priority, const bool is_high_connectivity)
+           {
+               return im.get_watershed(priority, is_high_connectivity);
+           },
+           R"doc(
+              Return result of watershed() as a new image.
            )doc",
-           py::arg("angle"),
-           py::arg("interpolation") = 1,
-           py::arg("boundary_conditions") = 0
+           py::arg("priority"),
+           py::arg("is_high_connectivity") = false,
+           release_gil()
     );
 
-    cl.def("crop",
-           (Class& (Class::*)(const int, const int, const int, const int, const int, const int, const int, const int, const unsigned int))&Class::crop,
+    cl.def("deriche",
+           (Class& (Class::*)(const float, const unsigned int, const char, const bool))&Class::deriche,
            R"doc(
-              Crop image region.
+              Apply recursive Deriche filter.
 
               Args:
-                 x0 (int): X-coordinate of the upper-left crop rectangle corner.
-                 y0 (int): Y-coordinate of the upper-left crop rectangle corner.
-                 z0 (int): Z-coordinate of the upper-left crop rectangle corner.
-                 c0 (int): C-coordinate of the upper-left crop rectangle corner.
-                 x1 (int): X-coordinate of the lower-right crop rectangle corner.
-                 y1 (int): Y-coordinate of the lower-right crop rectangle corner.
-                 z1 (int): Z-coordinate of the lower-right crop rectangle corner.
-                 c1 (int): C-coordinate of the lower-right crop rectangle corner.
-                 boundary_conditions (int): boundary conditions.
+                  sigma (float): Standard deviation of the filter.
+                  order (int): Order of the filter. Can be:
+                         SMOOTH_FILTER, FIRST_DERIV, or SECOND_DERIV.
+                  axis (str): Axis along which the filter is computed. Can be:
+                        { 'x' | 'y' | 'z' | 'c' }.
+                  boundary_conditions (bool): Boundary conditions. Can be:
+                        { False=dirichlet | True=neumann }.
            )doc",
-           py::arg("x0"),
-           py::arg("y0"),
-           py::arg("z0"),
-           py::arg("c0"),
-           py::arg("x1"),
-           py::arg("y1"),
-           py::arg("z1"),
-           py::arg("c1"),
-           py::arg("boundary_conditions") = 0
+           py::arg("sigma"),
+           py::arg("order") = 0,
+           py::arg("axis") = 'x',
+           py::arg("boundary_conditions") = true,
+           release_gil()
     );
 
-    cl.def("autocrop",
-           [](Class& im, pyarray color, const char* const axes)
+    cl.def("get_deriche",
+           [](const Class& im, const float sigma, const unsigned int order, const char axis, const bool boundary_conditions)
            {
-                if(color.size() == 0)
-                    return im.autocrop(nullptr, axes);
-                if(color.size() != im.spectrum())
-                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
-                return im.autocrop(color.data(), axes);
-           }, 
+               Class res(im, false);
+               res.deriche(sigma, order, axis, boundary_conditions);
+               return res;
+           },
            R"doc(
-              Autocrop image region, regarding the specified background color.
-
-              Args:
-                  color (int/list): Color used for the crop. If 0, color is guessed.
-                  axes (str): Axes used for crop.
+              Return result of deriche() as a new image.
            )doc",
-           py::arg("color") = pyarray(),
-           py::arg("axes") = "czyx"
+           py::arg("sigma"),
+           py::arg("order") = 0,
+           py::arg("axis") = 'x',
+           py::arg("boundary_conditions") = true,
+           release_gil()
     );
 
-    cl.def("append",
-           (Class& (Class::*)(const Class&, const char, const float))&Class::append,
+    cl.def("vanvliet",
+           (Class& (Class::*)(const float, const unsigned int, const char, const unsigned int))&Class::vanvliet,
            R"doc(
-              Append two images along specified axis.
+              Van Vliet recursive Gaussian filter.
 
               Args:
-                  img (CImg): Image to append with instance image.
-                  axis (str): Appending axis. Can be { 'x' | 'y' | 'z' | 'c' }.
-                  align (float): Append alignment in [0,1].
+                  sigma (float): Standard deviation of the Gaussian filter.
+                  order (int): Order of the filter. Can be:
+                         SMOOTH_FILTER, FIRST_DERIV, SECOND_DERIV, or THIRD_DERIV.
+                  axis (str): Axis along which the filter is computed. Can be:
+                        { 'x' | 'y' | 'z' | 'c' }.
+                  boundary_conditions (unsigned int): Boundary conditions
            )doc",
-           py::arg("img"),
+           py::arg("sigma"),
+           py::arg("order") = 0,
            py::arg("axis") = 'x',
-           py::arg("align") = 0
+           py::arg("boundary_conditions") = 1,
+           release_gil()
     );
-       
-    cl.def("linear_atX",
-           (Tfloat (Class::*)(const float, const  int, const int, const int) const)(&Class::linear_atX),
-           R"doc(
-              Return pixel value, using linear interpolation
-              and Neumann boundary conditions for the X-coordinate.
-
-              Args:
-                  fx (float): X-coordinate of the pixel value.
-                  y (int):    Y-coordinate of the pixel value
-                  z (int):    Z-coordinate of the pixel value.
-                  c (int):    C-coordinate of the pixel value.
 
-              Returns: a linearly-interpolated pixel value of the image
-                       instance located at (fx,y,z,c).
+    cl.def("get_vanvliet",
+           [](const Class& im, const float sigma, const unsigned int order, const char axis, const unsigned int boundary_conditions)
+           {
+               Class res(im, false);
+               res.vanvliet(sigma, order, axis, boundary_conditions);
+               return res;
+           },
+           R"doc(
+              Return result of vanvliet() as a new image.
            )doc",
-           py::arg("fx"),
-           py::arg("y") = 0,
-           py::arg("z") = 0,
-           py::arg("c") = 0
+           py::arg("sigma"),
+           py::arg("order") = 0,
+           py::arg("axis") = 'x',
+           py::arg("boundary_conditions") = 1,
+           release_gil()
     );
 
-
-    cl.def("linear_atXY",
-           (Tfloat (Class::*)(const float, const float, const int, const int) const)(&Class::linear_atXY),
+    cl.def("blur",
+           (Class& (Class::*)(const float, const unsigned int, const bool))&Class::blur,
            R"doc(
-              Return pixel value, using linear interpolation
-              and Neumann boundary conditions for the X and Y-coordinates.
+              Blur image isotropically.
+
+              Note: The blur is computed as a 0-order Deriche filter.
+              This is not a gaussian blur. This is a recursive algorithm,
+              not depending on the values of the standard deviations.
 
               Args:
-                  fx (float): X-coordinate of the pixel value.
-                  fy (float): Y-coordinate of the pixel value.
-                  z (int):    Z-coordinate of the pixel value.
-                  c (int):    C-coordinate of the pixel value.
+                  sigma (float): Standard deviation of the blur.
+                  boundary_conditions (int): Boundary conditions.
+                  is_gaussian (bool): Tells if the blur uses a gaussian (True)
+                               or quasi-gaussian (False) kernel.
+           )doc",
+           py::arg("sigma"),
+           py::arg("boundary_conditions") = 1,
+           py::arg("is_gaussian") = false,
+           release_gil()
+    );
 
-              Returns: a linearly-interpolated pixel value of the image
-                       instance located at (fx,fy,z,c).
+    cl.def("get_blur",
+           [](const Class& im, const float sigma, const unsigned int boundary_conditions, const bool is_gaussian)
+           {
+               Class res(im, false);
+               res.blur(sigma, boundary_conditions, is_gaussian);
+               return res;
+           },
+           R"doc(
+              Return result of blur() as a new image.
            )doc",
-           py::arg("fx"),
-           py::arg("fy"),
-           py::arg("z") = 0,
-           py::arg("c") = 0
+           py::arg("sigma"),
+           py::arg("boundary_conditions") = 1,
+           py::arg("is_gaussian") = false,
+           release_gil()
     );
 
-    cl.def("linear_atXYZ",
-           (Tfloat (Class::*)(const float, const float, const float, const int) const)(&Class::linear_atXYZ),
+    cl.def("boxfilter",
+           (Class& (Class::*)(const float, const int, const char, const bool, const unsigned int))&Class::boxfilter,
            R"doc(
-              Return pixel value, using linear interpolation
-              and Neumann boundary conditions for the X, Y, and Z-coordinates.
+              Apply box filter to image.
 
               Args:
-                  fx (float): X-coordinate of the pixel value.
-                  fy (float): Y-coordinate of the pixel value.
-                  fz (float): Z-coordinate of the pixel value.
-                  c (int):    C-coordinate of the pixel value.
+                  boxsize (float): Size of the box window (can be subpixel)
+                  order (int):   the order of the filter 0,1 or 2.
+                  axis (str):    Axis along which the filter is computed.
+                           Can be { 'x' | 'y' | 'z' | 'c' }.
+                  boundary_conditions (bool): Boundary conditions. Can be
+                                       { False=dirichlet | True=neumann }.
+                  nb_iter (int): Number of filter iterations.
+           )doc",
+           py::arg("boxsize"),
+           py::arg("order"),
+           py::arg("axis") = 'x',
+           py::arg("boundary_conditions") = true,
+           py::arg("nb_iter") = 1,
+           release_gil()
+    );
 
-              Returns: a linearly-interpolated pixel value of the image
-                       instance located at (fx,fy,fz,c).
+    cl.def("get_boxfilter",
+           [](const Class& im, const float boxsize, const int order, const char axis, const bool boundary_conditions, const unsigned int nb_iter)
+           {
+               Class res(im, false);
+               res.boxfilter(boxsize, order, axis, boundary_conditions, nb_iter);
+               return res;
+           },
+           R"doc(
+              Return result of boxfilter() as a new image.
            )doc",
-           py::arg("fx"),
-           py::arg("fy"),
-           py::arg("fz"),
-           py::arg("c") = 0
+           py::arg("boxsize"),
+           py::arg("order"),
+           py::arg("axis") = 'x',
+           py::arg("boundary_conditions") = true,
+           py::arg("nb_iter") = 1,
+           release_gil()
     );
-   
-    cl.def("linear_atXYZC",
-           (Tfloat (Class::*)(const float, const float, const float, const float) const)(&Class::linear_atXYZC),
+
+    cl.def("blur_box",
+           (Class& (Class::*)(const float, const unsigned int))&Class::blur_box,
            R"doc(
-              Return pixel value, using linear interpolation
-              and Neumann boundary conditions for the X, Y, Z, and C-coordinates.
+              Blur image with a box filter.
 
               Args:
-                  fx (float): X-coordinate of the pixel value.
-                  fy (float): Y-coordinate of the pixel value.
-                  fz (float): Z-coordinate of the pixel value.
-                  fc (float):    C-coordinate of the pixel value.
+                  boxsize (int): Size of the box window (can be subpixel).
+                  boundary_conditions (int): Boundary conditions.
+           )doc",
+           py::arg("boxsize"),
+           py::arg("boundary_conditions") = 1,
+           release_gil()
+    );
 
-              Returns: a linearly-interpolated pixel value of the image
-                       instance located at (fx,fy,fz,fc).
+    cl.def("get_blur_box",
+           [](const Class& im, const float boxsize, const unsigned int boundary_conditions)
+           {
+               Class res(im, false);
+               res.blur_box(boxsize, boundary_conditions);
+               return res;
+           },
+           R"doc(
+              Return result of blur_box() as a new image.
            )doc",
-           py::arg("fx"),
-           py::arg("fy"),
-           py::arg("fz"),
-           py::arg("fc")
-    ); 
+           py::arg("boxsize"),
+           py::arg("boundary_conditions") = 1,
+           release_gil()
+    );
 
-    // Value manipulation
-    cl.def("fill",
-           (Class& (Class::*)(const T&))(&Class::fill),
+    cl.def("blur_median",
+           (Class& (Class::*)(const unsigned int, const float))&Class::blur_median,
            R"doc(
-              Fill all pixel values with specified value.
+              Blur image with the median filter.
 
               Args:
-                  val (float): Fill value.
+                  n (int): Size of the median filter.
+                  threshold (float): Threshold used to discard pixels too far
+                             from the current pixel value in the median computation.
            )doc",
-           py::arg("val")
+           py::arg("n"),
+           py::arg("threshold") = 0,
+           release_gil()
     );
 
-    cl.def("invert_endianness", 
-           &Class::invert_endianness,
-           "Invert endianness of all pixel values."
+    cl.def("get_blur_median",
+           [](const Class& im, const unsigned int n, const float threshold)
+           {
+               return im.get_blur_median(n, threshold);
+           },
+           R"doc(
+              Return result of blur_median() as a new image.
+           )doc",
+           py::arg("n"),
+           py::arg("threshold") = 0,
+           release_gil()
     );
 
-    cl.def("rand", 
-           (Class& (Class::*)(const T&, const T&))(&Class::rand),
+    cl.def("sharpen",
+           (Class& (Class::*)(const float, const bool, const float, const float, const float))&Class::sharpen,
            R"doc(
-               Fill image with random values in specified range.
+              Sharpen image.
 
-               Args:
-                   val_min (float): Minimal authorized random value.
-                   val_max (float): Maximal authorized random value.
-             )doc",
-             py::arg("val_min"),
-             py::arg("val_max")
+              Args:
+                  amplitude (float): Sharpening amplitude
+                  sharpen_type (bool): Select sharpening method. Can be
+                                { False=inverse diffusion | True=shock filters }.
+                  edge (int): Edge threshold (shock filters only).
+                  alpha (float): Gradient smoothness (shock filters only).
+                  sigma (float): Tensor smoothness (shock filters only).
+           )doc",
+           py::arg("amplitude"),
+           py::arg("sharpen_type") = false,
+           py::arg("edge") = 1,
+           py::arg("alpha") = 0,
+           py::arg("sigma") = 0,
+           release_gil()
     );
 
-    cl.def("round", 
-           (Class& (Class::*)(const double, const int))&Class::round,
+    cl.def("get_sharpen",
+           [](const Class& im, const float amplitude, const bool sharpen_type, const float edge, const float alpha, const float sigma)
+           {
+               return im.get_sharpen(amplitude, sharpen_type, edge, alpha, sigma);
+           },
            R"doc(
-              Round pixel values.
+              Return result of sharpen() as a new image.
+           )doc",
+           py::arg("amplitude"),
+           py::arg("sharpen_type") = false,
+           py::arg("edge") = 1,
+           py::arg("alpha") = 0,
+           py::arg("sigma") = 0,
+           release_gil()
+    ); 
+
+    // Drawing
+    cl.def("draw_rectangle",
+           [](Class& im, const int x0, const int y0, const int x1, const int y1, pyarray color, const float opacity)
+           {
+                if(color.size() != im.spectrum())
+                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
+                return im.draw_rectangle(x0, y0, x1, y1, color.data(), opacity);
+           }, 
+           R"doc(
+              Draw a filled 2d rectangle.
 
               Args:
-                  y (int): Rounding precision.
-                  rounding_type (int): Rounding type. Can be:
-                      R_BACKWARD, R_NEAREST, R_FORWARD
+                  x0 (int): X-coordinate of the upper-left rectangle corner.
+                  y0 (int): Y-coordinate of the upper-left rectangle corner.
+                  x1 (int): X-coordinate of the lower-right rectangle corner.
+                  y1 (int): Y-coordinate of the lower-right rectangle corner.
+                  color (list): List of color value with spectrum() entries.
+                  opacity (float): Drawing opacity.
+
+              Raises:
+                  RuntimeError: If list of color values does not have spectrum() entries.
            )doc",
-           py::arg("y") = 1,
-           py::arg("rounding_type") = 0
+           py::arg("x0"),
+           py::arg("y0"),
+           py::arg("x1"),
+           py::arg("y1"),
+           py::arg("color"),
+           py::arg("opacity") = 1
     );
 
-    cl.def("noise", 
-           (Class& (Class::*)(const double, const unsigned int))&Class::noise,
+    cl.def("draw_line",
+           [](Class& im, const int x0, const int y0, const int x1, const int y1, pyarray color, const float opacity, const unsigned int pattern, const bool init_hatch)
+           {
+                if(color.size() != im.spectrum())
+                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
+                return im.draw_line(x0, y0, x1, y1, color.data(), opacity, pattern, init_hatch);
+           }, 
            R"doc(
-              Add random noise to pixel values.
+              Draw a 2d line.
 
               Args:
-                  sigma (float): Amplitude of the random additive noise.
-                                 If sigma<0, it stands for a percentage of
-                                 the global value range.
+                  x0 (int): X-coordinate of the upper-left rectangle corner.
+                  y0 (int): Y-coordinate of the upper-left rectangle corner.
+                  x1 (int): X-coordinate of the lower-right rectangle corner.
+                  y1 (int): Y-coordinate of the lower-right rectangle corner.
+                  color (list): List of color value with spectrum() entries.
+                  opacity (float): Drawing opacity.
+                  pattern (int): An integer whose bits describe the line pattern.
+                  init_hatch (bool): Tells if a reinitialization of the hash state must be done.
 
-                  noise_type (int): Type of additive noise (can be
-                                    GAUSSIAN,
-                                    UNIFORM,
-                                    SALT_AND_PEPPER,
-                                    POISSON or
-                                    RICIAN).
+              Raises:
+                  RuntimeError: If list of color values does not have spectrum() entries.
            )doc",
-           py::arg("sigma"),
-           py::arg("noise_type") = 0
+           py::arg("x0"),
+           py::arg("y0"),
+           py::arg("x1"),
+           py::arg("y1"),
+           py::arg("color"),
+           py::arg("opacity") = 1,
+           py::arg("pattern") = ~0U,
+           py::arg("init_hatch") = true
     );
 
-
-    cl.def("normalize", 
-           (Class& (Class::*)(const T&, const T&, const float))&Class::normalize,
+    cl.def("draw_polygon",
+           [](Class& im, pyarray points, pyarray color, const float opacity)
+           {
+                if(color.size() != im.spectrum())
+                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
+                return im.draw_polygon(fromarray<T>(points), color.data(), opacity);
+           }, 
            R"doc(
-              Linearly normalize pixel values.
+              Draw filled 2d polygon.
 
               Args:
-                  min_value (float): Minimum desired value of resulting image.
-                  max_value (float): Maximum desired value of resulting image.
-                  constant_case_ratio (float): in case of instance image having a constant value, 
-                                               tell what ratio of [min_value,max_value] is used to fill the normalized image 
-                                               (=0 for min_value, =1 for max_value, =0.5 for (min_value + max_value)/2).
+                  points (ndarray): (n x 2) numpy array of polygon vertices
+                  color (list): List of color value with spectrum() entries.
+                  opacity (float): Drawing opacity.
+
+              Raises:
+                  RuntimeError: If list of color values does not have spectrum() entries.
            )doc",
-           py::arg("min_value"),
-           py::arg("max_value"),
-           py::arg("constant_case_ratio") = 0
+           py::arg("points"),
+           py::arg("color"),
+           py::arg("opacity") = 1
     );
 
-    cl.def("norm", 
-           (Class& (Class::*)(const int))&Class::norm,
-           R"doc(
-              Compute Lp-norm of each multi-valued pixel of the
-              image instance.
+    cl.def("draw_circle",
+        [](Class& im, const int x0, const int y0, const int radius, pyarray color, const float opacity)
+        {
+            if(color.size() != im.spectrum())
+                throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
+            return im.draw_circle(x0, y0, radius, color.data(), opacity);
+        },
+        R"doc(
+              Draw a filled 2d circle.
 
               Args:
-                  norm_type (int): Type of computed vector norm. Can be:
-                  LINF_NORM, L0_NORM, L1_NORM, L2_NORM, or value p>2
-           )doc",
-           py::arg("norm_type") = 1
+                  x0 (int):  X-coordinate of the circle center.
+                  y0 (int):  Y-coordinate of the circle center.
+                  radius (float):  Circle radius.
+                  color (list): List of color value with spectrum() entries.
+                  opacity (float): Drawing opacity.
+
+              Raises:
+                  RuntimeError: If list of color values does not have spectrum() entries.
+        )doc",
+        py::arg("x0"),
+        py::arg("y0"),
+        py::arg("radius"),
+        py::arg("color"),
+        py::arg("opacity") = 1
     );
 
-    cl.def("cut", 
-           (Class& (Class::*)(const T&, const T&))&Class::cut,
+    cl.def("draw_triangle",
+           [](Class& im, const int x0, const int y0, const int x1, const int y1, const int x2, const int y2, pyarray color, const float opacity)
+           {
+               if(color.size() != im.spectrum())
+                   throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
+               return im.draw_triangle(x0, y0, x1, y1, x2, y2, color.data(), opacity);
+           },
            R"doc(
-              Cut pixel values in specified range.
+              Draw a filled 2d triangle.
 
               Args:
-                  min_value (float): Minimum desired value of resulting image.
-                  max_value (float): Maximum desired value of resulting image.
+                  x0 (int): X-coordinate of the first vertex.
+                  y0 (int): Y-coordinate of the first vertex.
+                  x1 (int): X-coordinate of the second vertex.
+                  y1 (int): Y-coordinate of the second vertex.
+                  x2 (int): X-coordinate of the third vertex.
+                  y2 (int): Y-coordinate of the third vertex.
+                  color (list): List of color value with spectrum() entries.
+                  opacity (float): Drawing opacity.
+
+              Raises:
+                  RuntimeError: If list of color values does not have spectrum() entries.
            )doc",
-           py::arg("min_value"),
-           py::arg("max_value")
+           py::arg("x0"),
+           py::arg("y0"),
+           py::arg("x1"),
+           py::arg("y1"),
+           py::arg("x2"),
+           py::arg("y2"),
+           py::arg("color"),
+           py::arg("opacity") = 1
     );
 
-    cl.def("quantize", 
-           (Class& (Class::*)(const unsigned int, const bool))&Class::quantize,
+    cl.def("draw_text",
+           [](Class& im, const int x0, const int y0, const char* const text, pyarray foreground_color, pyarray background_color, const float opacity, const unsigned int font_height)
+           {
+               if(foreground_color.size() != im.spectrum() || background_color.size() != im.spectrum())
+                   throw std::runtime_error("Colors needs to have " + std::to_string(im.spectrum()) + " elements.");
+               return im.draw_text(x0, y0, text, foreground_color.data(), background_color.data(), opacity, font_height);
+           },
            R"doc(
-              Uniformly quantize pixel values.
+              Draw a text string.
 
               Args:
-                  nb_levels (int): Number of quantization levels.
-                  keep_range (bool): Tells if resulting values keep the same
-                                     range as the original ones.
+                  x0 (int): X-coordinate of the text in the image instance.
+                  y0 (int): Y-coordinate of the text in the image instance.
+                  text (str): The text.
+                  foreground_color (list): List of color value with spectrum() entries.
+                  background_color (list): List of color value with spectrum() entries.
+                  opacity (float): Drawing opacity.
+                  font_height (int): Height of the text font
+                      (exact match for 13,23,53,103, interpolated otherwise).
            )doc",
-           py::arg("nb_levels"),
-           py::arg("keep_range") = true
+           py::arg("x0"),
+           py::arg("y0"),
+           py::arg("text"),
+           py::arg("foreground_color"),
+           py::arg("background_color"),
+           py::arg("opacity") = 1,
+           py::arg("font_height") = 13
     );
 
-    cl.def("threshold", 
-           (Class& (Class::*)(const T&, const bool, const bool))&Class::threshold,
+    // Mathematical 
+    cl.def("sqr", (Class& (Class::*)())&Class::sqr, "Compute the square value of each pixel value.", release_gil());
+    cl.def("sqrt", (Class& (Class::*)())&Class::sqrt, "Compute the square root of each pixel value.", release_gil());
+    cl.def("exp", (Class& (Class::*)())&Class::exp, "Compute the exponential of each pixel value.", release_gil());
+    cl.def("log", (Class& (Class::*)())&Class::log, "Compute the logarithm of each pixel value.", release_gil());
+    cl.def("log2", (Class& (Class::*)())&Class::log2, "Compute the base-2 logarithm of each pixel value.", release_gil());
+    cl.def("log10", (Class& (Class::*)())&Class::log10, "Compute the base-10 logarithm of each pixel value.", release_gil());
+    cl.def("abs", (Class& (Class::*)())&Class::abs, "Compute the absolute value of each pixel value.", release_gil());
+    cl.def("sign", (Class& (Class::*)())&Class::sign, "Compute the sign of each pixel value.", release_gil());
+    cl.def("cos", (Class& (Class::*)())&Class::cos, "Compute the cosine of each pixel value.", release_gil());
+    cl.def("sin", (Class& (Class::*)())&Class::sin, "Compute the sine of each pixel value.", release_gil());
+    cl.def("sinc", (Class& (Class::*)())&Class::sinc, "Compute the sinc of each pixel value.", release_gil());
+    cl.def("tan", (Class& (Class::*)())&Class::tan, "Compute the tangent of each pixel value.", release_gil());
+    cl.def("sinh", (Class& (Class::*)())&Class::sinh, "Compute the hyperbolic sine of each pixel value.", release_gil());
+    cl.def("tanh", (Class& (Class::*)())&Class::tanh, "Compute the hyperbolic tangent of each pixel value.", release_gil());
+    cl.def("acos", (Class& (Class::*)())&Class::acos, "Compute the arccosine of each pixel value.", release_gil());
+    cl.def("asin", (Class& (Class::*)())&Class::asin, "Compute the arcsine of each pixel value.", release_gil());
+    cl.def("atan", (Class& (Class::*)())&Class::atan, "Compute the arctangent of each pixel value.", release_gil());
+
+    cl.def("get_sqr", [](const Class& im) { Class res(im, false); res.sqr(); return res; }, "Return result of sqr() as a new image.", release_gil());
+    cl.def("get_sqrt", [](const Class& im) { Class res(im, false); res.sqrt(); return res; }, "Return result of sqrt() as a new image.", release_gil());
+    cl.def("get_exp", [](const Class& im) { Class res(im, false); res.exp(); return res; }, "Return result of exp() as a new image.", release_gil());
+    cl.def("get_log", [](const Class& im) { Class res(im, false); res.log(); return res; }, "Return result of log() as a new image.", release_gil());
+    cl.def("get_log2", [](const Class& im) { Class res(im, false); res.log2(); return res; }, "Return result of log2() as a new image.", release_gil());
+    cl.def("get_log10", [](const Class& im) { Class res(im, false); res.log10(); return res; }, "Return result of log10() as a new image.", release_gil());
+    cl.def("get_abs", [](const Class& im) { Class res(im, false); res.abs(); return res; }, "Return result of abs() as a new image.", release_gil());
+    cl.def("get_sign", [](const Class& im) { Class res(im, false); res.sign(); return res; }, "Return result of sign() as a new image.", release_gil());
+    cl.def("get_cos", [](const Class& im) { Class res(im, false); res.cos(); return res; }, "Return result of cos() as a new image.", release_gil());
+    cl.def("get_sin", [](const Class& im) { Class res(im, false); res.sin(); return res; }, "Return result of sin() as a new image.", release_gil());
+    cl.def("get_sinc", [](const Class& im) { Class res(im, false); res.sinc(); return res; }, "Return result of sinc() as a new image.", release_gil());
+    cl.def("get_tan", [](const Class& im) { Class res(im, false); res.tan(); return res; }, "Return result of tan() as a new image.", release_gil());
+    cl.def("get_sinh", [](const Class& im) { Class res(im, false); res.sinh(); return res; }, "Return result of sinh() as a new image.", release_gil());
+    cl.def("get_tanh", [](const Class& im) { Class res(im, false); res.tanh(); return res; }, "Return result of tanh() as a new image.", release_gil());
+    cl.def("get_acos", [](const Class& im) { Class res(im, false); res.acos(); return res; }, "Return result of acos() as a new image.", release_gil());
+    cl.def("get_asin", [](const Class& im) { Class res(im, false); res.asin(); return res; }, "Return result of asin() as a new image.", release_gil());
+    cl.def("get_atan", [](const Class& im) { Class res(im, false); res.atan(); return res; }, "Return result of atan() as a new image.", release_gil());
+
+    cl.def("atan2", 
+           (Class& (Class::*)(const Class&))&Class::atan2, 
            R"doc(
-              Threshold pixel values.
+              Compute the arctangent2 of each pixel value.
 
               Args:
-                  value (float): Threshold value.
-                  soft_threshold (bool): Tells if soft thresholding must be
-                                          applied (instead of hard one).
-                  strict_threshold (bool): Tells if threshold value is strict.
+                  img (CImg): Image whose pixel values specify the second
+                              argument of the atan2() function.
            )doc",
-           py::arg("value"),
-           py::arg("soft_threshold") = false,
-           py::arg("strict_threshold") = false
+           release_gil()
     );
 
-    cl.def("histogram", 
-           (Class& (Class::*)(const unsigned int, const T&, const T&))&Class::histogram,
+    cl.def("get_atan2",
+           [](const Class& im, const Class& img)
+           {
+               Class res(im, false);
+               res.atan2(img);
+               return res;
+           },
            R"doc(
-              Compute the histogram of pixel values.
-
-              Args:
-              nb_levels (int): Number of desired histogram levels.
-              min_value (float): Minimum pixel value considered for the
-                                   histogram computation. All pixel values
-                                   lower than min_value will not be counted.
-              max_value (float): Maximum pixel value considered for the
-                                   histogram computation. All pixel values
-                                   higher than max_value will not be counted.
+              Return result of atan2() as a new image.
            )doc",
-           py::arg("nb_levels"),
-           py::arg("min_value"),
-           py::arg("max_value")
+           release_gil()
     );
 
-    cl.def("equalize", 
-           (Class& (Class::*)(const unsigned int, const T&, const T&))&Class::equalize,
+    cl.def("mul", 
+           (Class& (Class::*)(const Class&))&Class::mul, 
            R"doc(
-              Equalize histogram of pixel values.
+              In-place pointwise multiplication.
+
+              Compute the pointwise multiplication between
+              the image instance and the specified input image img.
 
               Args:
-                  nb_levels (int): Number of desired histogram levels.
-                  min_value (float): Minimum pixel value considered for the
-                                     histogram computation. All pixel values
-                                     lower than min_value will not be counted.
-                  max_value (float): Maximum pixel value considered for the
-                                     histogram computation. All pixel values
-                                     higher than max_value will not be counted.
+                  img (CImg): Input image, second operand of the multiplication.
            )doc",
-           py::arg("nb_levels"),
-           py::arg("min_value"),
-           py::arg("max_value")
+           release_gil()
     );
 
-    cl.def("label", 
-           (Class& (Class::*)(const bool, const Tfloat, const bool))&Class::label,
+    cl.def("div", 
+           (Class& (Class::*)(const Class&))&Class::div, 
            R"doc(
-              Label connected components.
+              In-place pointwise division.
+
+              Compute the pointwise division between
+              the image instance and the specified input image img.
 
               Args:
-                  is_high_connectivity (bool): Choose between 4(false)
-                  - or 8(true)-connectivity in 2d case, and between 6(false)
-                  - or 26(true)-connectivity in 3d case.
-                  tolerance (float): Tolerance used to determine if two neighboring
-                                     pixels belong to the same region.
-           )doc", 
-           py::arg("is_high_connectivity") = false,
-           py::arg("tolerance") = 0,
-           py::arg("is_L2_norm") = true
+                  img (CImg): Input image, second operand of the division.
+           )doc",
+           release_gil()
     );
 
-    cl.def("min_max", 
-           [](Class& im)
-           {
-               T max_val;
-               T min_val = im.min_max(max_val);
-               return std::pair<T,T>{min_val, max_val};
-           }, 
-           " Returns: tuple with minimum and maximum pixel value. "
+    cl.def("pow", 
+           (Class& (Class::*)(const double))&Class::pow, 
+           R"doc(
+              Raise each pixel value to the specified power.
+
+              Args:
+                  p (int): Exponent value.
+           )doc",
+           release_gil()
     );
 
-    cl.def("max_min", 
-           [](Class& im)
+    cl.def("get_pow",
+           [](const Class& im, const double p)
            {
-               T min_val;
-               T max_val = im.max_min(min_val);
-               return std::pair<T,T>{max_val, min_val};
-           }, 
-           " Returns: tuple with maximum and minimum pixel value. "
+               Class res(im, false);
+               res.pow(p);
+               return res;
+           },
+           R"doc(
+              Return result of pow() as a new image.
+           )doc",
+           release_gil()
     );
 
-    // Filtering transforms
-    cl.def("correlate",
-           (Class& (Class::*)(
-               const Class&, const unsigned int, const bool, const unsigned int,
-               const int, const int, const int,
-               const unsigned int, const unsigned int, const unsigned int,
-               const int, const int, const int,
-               const int, const int, const int,
-               const unsigned int, const unsigned int, const unsigned int
-           ))&Class::correlate,
-           R"doc( 
-               Correlate image by a kernel.
+    cl.def("kth_smallest", 
+           (T (Class::*)(const ulongT) const)&Class::kth_smallest, 
+           R"doc(
+              Returns the kth smallest pixel value.
 
-               Args:
-                   kernel (CImg): the correlation kernel.
-                   boundary_conditions: boundary conditions (False=dirichlet, True=neumann)
-                   is_normalized (bool): enable local normalization.
-            )doc",
-            py::arg("kernel"),
-            py::arg("boundary_conditions") = 1u,
-            py::arg("is_normalized") = false,
-            py::arg("channel_mode") = 1u,
-            py::arg("xcenter") = (int)(~0U>>1),
-            py::arg("ycenter") = (int)(~0U>>1),
-            py::arg("zcenter") = (int)(~0U>>1),
-            py::arg("xstride") = 1u,
-            py::arg("ystride") = 1u,
-            py::arg("zstride") = 1u,
-            py::arg("xdilation") = 1,
-            py::arg("ydilation") = 1,
-            py::arg("zdilation") = 1,
-            py::arg("xoffset") = 0,
-            py::arg("yoffset") = 0,
-            py::arg("zoffset") = 0,
-            py::arg("xsize") = ~0u,
-            py::arg("ysize") = ~0u,
-            py::arg("zsize") = ~0u
-    );
-    cl.def("convolve",
-           (Class& (Class::*)(
-               const Class&, const unsigned int, const bool, const unsigned int,
-               const int, const int, const int,
-               const unsigned int, const unsigned int, const unsigned int,
-               const int, const int, const int,
-               const int, const int, const int,
-               const unsigned int, const unsigned int, const unsigned int
-           ))&Class::convolve,
-           R"doc( 
-               Convolve image by a kernel.
+              Args:
+                  k (int): Rank of the search smallest element.
 
-               Args:
-                   kernel (CImg): the correlation kernel.
-                   boundary_conditions: boundary conditions.
-                   is_normalized (bool): enable local normalization.
-            )doc",
-            py::arg("kernel"),
-            py::arg("boundary_conditions") = 1u,
-            py::arg("is_normalized") = false,
-            py::arg("channel_mode") = 1u,
-            py::arg("xcenter") = (int)(~0U>>1),
-            py::arg("ycenter") = (int)(~0U>>1),
-            py::arg("zcenter") = (int)(~0U>>1),
-            py::arg("xstride") = 1u,
-            py::arg("ystride") = 1u,
-            py::arg("zstride") = 1u,
-            py::arg("xdilation") = 1,
-            py::arg("ydilation") = 1,
-            py::arg("zdilation") = 1,
-            py::arg("xoffset") = 0,
-            py::arg("yoffset") = 0,
-            py::arg("zoffset") = 0,
-            py::arg("xsize") = ~0u,
-            py::arg("ysize") = ~0u,
-            py::arg("zsize") = ~0u
+              Returns: kth smallest pixel value.
+           )doc",
+           release_gil()
     );
 
-    cl.def("cumulate",
-           (Class& (Class::*)(const char* const))&Class::cumulate,
+    cl.def("variance", 
+           (double (Class::*)(const unsigned int) const)&Class::variance, 
            R"doc(
-              Cumulate image values, optionally along specified axes.
+              Returns the variance of the pixel values.
 
               Args:
-                  axes (str): Cumulation axes as string, e.g. "x" or "xyz".
+                  variance_method (int): Method used to estimate the variance.
+                                         Can be: SECOND_MOMENT
+                                                 BEST_UNBIASED
+                                                 LEAST_MEDIAN_SQ
+                                                 LEAST_TRIMMED_SQ
+
+              Returns: Variance of pixel values.
            )doc",
-           py::arg("axes")
+           py::arg("variance_method") = 1,
+           release_gil()
     );
 
-    cl.def("erode",
-           (Class& (Class::*)(const Class&, const unsigned int, const bool))&Class::erode,
+    cl.def("variance_mean", 
+           [](Class& im, const unsigned int variance_method)
+           {
+                  std::pair<double,double> var_mean;
+                  var_mean.first = im.variance_mean(variance_method, var_mean.second);
+                  return var_mean;
+           },
            R"doc(
-              Erode image by a structuring element.
+              Returns variance and average of pixel values.
 
               Args:
-                  kernel (CImg):	Structuring element.
-                  boundary_conditions (int): Boundary conditions.
-                  is_real (bool): Do the erosion in real (a.k.a 'non-flat')
-                                  mode (true) rather than binary mode (false).
+                  variance_method (int): Method used to estimate the variance.
+
+              Returns: Tuple with variance and mean of pixel values.
            )doc",
-           py::arg("kernel"),
-           py::arg("boundary_conditions") = 1,
-           py::arg("is_real") = false
+           py::arg("variance_method") = 1,
+           release_gil()
     );
 
-    cl.def("dilate",
-           (Class& (Class::*)(const Class&, const unsigned int, const bool))&Class::dilate,
+    cl.def("stats",
+           [](const Class& im, const py::object& metrics, const std::string& axes,
+              const unsigned int variance_method)
+           {
+               static const std::vector<std::string> all_metrics = {
+                   "min", "max", "mean", "variance", "std", "sum", "product", "argmin", "argmax"
+               };
+               std::vector<std::string> names;
+               if (metrics.is_none())
+                   names = all_metrics;
+               else if (py::isinstance<py::str>(metrics))
+                   names.push_back(metrics.cast<std::string>());
+               else
+                   for (auto metric : metrics)
+                       names.push_back(metric.cast<std::string>());
+               for (auto it = names.begin(); it != names.end(); ++it)
+               {
+                   if (std::find(all_metrics.begin(), all_metrics.end(), *it) == all_metrics.end())
+                       throw std::runtime_error("Unknown statistic '" + *it + "'.");
+                   if (std::find(names.begin(), it, *it) != it)
+                       throw std::runtime_error("Statistic '" + *it + "' is given more than once.");
+               }
+               if (axes.find_first_not_of("zc") != std::string::npos)
+                   throw std::runtime_error("Axes need to be a combination of 'z' and 'c'.");
+               if (variance_method > 1)
+                   throw std::runtime_error("Variance method needs to be 0 or 1.");
+               const bool per_slice = axes.find('z') != std::string::npos;
+               const bool per_channel = axes.find('c') != std::string::npos;
+
+               std::vector<Stats<T>> stats;
+               {
+                   native_scope release;
+                   stats = group_stats(im, per_slice, per_channel);
+               }
+
+               std::vector<py::ssize_t> shape;
+               if (per_channel)
+                   shape.push_back(im.spectrum());
+               if (per_slice)
+                   shape.push_back(im.depth());
+               py::dict res;
+               for (const auto& name : names)
+               {
+                   if (name == "argmin" || name == "argmax")
+                   {
+                       std::vector<py::ssize_t> coords_shape(shape);
+                       coords_shape.push_back(4);
+                       py::array_t<int64_t> coords(coords_shape);
+                       int64_t *p = coords.mutable_data();
+                       const size_t wh = (size_t)im.width() * im.height(), whd = wh * im.depth();
+                       for (const auto& st : stats)
+                       {
+                           const size_t off = name == "argmin" ? st.argmin : st.argmax;
+                           *(p++) = off % im.width();
+                           *(p++) = off / im.width() % im.height();
+                           *(p++) = off / wh % im.depth();
+                           *(p++) = off / whd;
+                       }
+                       res[name.c_str()] = coords;
+                       continue;
+                   }
+                   py::array_t<double> values(shape);
+                   double *p = values.mutable_data();
+                   for (const auto& st : stats)
+                   {
+                       const double n = (double)st.count;
+                       const double variance = variance_method == 0 ? st.m2 / n : n > 1 ? st.m2 / (n - 1) : 0.0;
+                       *(p++) = name == "min" ? (double)st.min :
+                                name == "max" ? (double)st.max :
+                                name == "mean" ? st.mean :
+                                name == "variance" ? variance :
+                                name == "std" ? std::sqrt(variance) :
+                                name == "sum" ? st.sum : st.product;
+                   }
+                   res[name.c_str()] = values;
+               }
+               return res;
+           },
            R"doc(
-              Dilate image by a structuring element.
+              Compute statistics of the pixel values in a single parallel pass.
 
               Args:
-                  kernel (CImg):	Structuring element.
-                  boundary_conditions (int): Boundary conditions.
-                  is_real (bool): Do the erosion in real (a.k.a 'non-flat')
-                                  mode (true) rather than binary mode (false).
+                  metrics (str or list of str): Statistic or list of statistics
+                                         to compute, any of min, max, mean,
+                                         variance, std, sum, product, argmin
+                                         and argmax. Default: all.
+                  axes (str): Compute the statistics per slice ('z'), per channel
+                              ('c') or both ('zc'). Default: '' for the whole image.
+                  variance_method (int): Method used to estimate the variance.
+                                         Can be:
+                                            0: SECOND_MOMENT
+                                            1: BEST_UNBIASED (default)
+
+              Returns:
+                  dict of statistic name and numpy array of shape (), (spectrum,),
+                  (depth,) or (spectrum, depth), depending on axes. argmin and
+                  argmax have the coordinates (x, y, z, c) of the first
+                  minimum and maximum in an additional last dimension.
+
+              Raises:
+                  RuntimeError: If the image is empty or an argument is invalid.
            )doc",
-           py::arg("kernel"),
-           py::arg("boundary_conditions") = 1,
-           py::arg("is_real") = false
+           py::arg("metrics") = py::none(),
+           py::arg("axes") = "",
+           py::arg("variance_method") = 1
     );
 
-    cl.def("watershed",
-           (Class& (Class::*)(const Class&, const bool))&Class::watershed,
+    cl.def("mse",
+           (double (Class::*)(const Class&) const)&Class::MSE,
            R"doc(
-              Compute watershed transform.
+              Compute the MSE (Mean-Squared Error) between two images.
 
               Args:
-                  priority (CImg): Priority map.
-                  is_high_connectivity (bool): Choose between 4(false)- or
-                                        8(true)-connectivity in 2d case,
-                                        and between 6(false)- or
-                                        26(true)-connectivity in 3d case.
+                  img (CImg): Image used as the second argument of the MSE operator.
+
+              Returns: mean squared error between self and img.
            )doc",
-           py::arg("priority"),
-           py::arg("is_high_connectivity") = false
+           release_gil()
     );
 
-    cl.def("deriche",
-           (Class& (Class::*)(const float, const unsigned int, const char, const bool))&Class::deriche,
+    cl.def("magnitude", 
+           (double (Class::*)(const float) const)&Class::magnitude, 
            R"doc(
-              Apply recursive Deriche filter.
+               Compute norm of the image, viewed as a matrix.
+
+               Args:
+                   magnitude_type (float): Norm type. Can be:
+                       LINF_NORM
+                       L0_NORM
+                       L1_NORM
+                       L2_NORM
+
+               Returns: Norm of image.
+            )doc",
+           release_gil()
+    );
+
+    cl.def("dot", 
+           (double (Class::*)(const Class&) const)&Class::dot, 
+           R"doc(
+              Compute the dot product between instance and argument, viewed as matrices
 
               Args:
-                  sigma (float): Standard deviation of the filter.
-                  order (int): Order of the filter. Can be:
-                         SMOOTH_FILTER, FIRST_DERIV, or SECOND_DERIV.
-                  axis (str): Axis along which the filter is computed. Can be:
-                        { 'x' | 'y' | 'z' | 'c' }.
-                  boundary_conditions (bool): Boundary conditions. Can be:
-                        { False=dirichlet | True=neumann }.
+                  img (CImg): Image used as a second argument of the dot product.
+
+              Returns: Dot product between self and img.
            )doc",
-           py::arg("sigma"),
-           py::arg("order") = 0,
-           py::arg("axis") = 'x',
-           py::arg("boundary_conditions") = true
+           release_gil()
     );
 
-    cl.def("vanvliet",
-           (Class& (Class::*)(const float, const unsigned int, const char, const unsigned int))&Class::vanvliet,
+    cl.def("warp_affine",
+           [](Class& im, const pyarray_double& matrix, const py::sequence& output_shape,
+              const int interpolation, const unsigned int boundary) -> Class&
+           {
+               get_warp_affine(im, matrix, to_ints(output_shape), interpolation, boundary).move_to(im);
+               return im;
+           },
            R"doc(
-              Van Vliet recursive Gaussian filter.
+              Apply an affine or projective transformation.
 
               Args:
-                  sigma (float): Standard deviation of the Gaussian filter.
-                  order (int): Order of the filter. Can be:
-                         SMOOTH_FILTER, FIRST_DERIV, SECOND_DERIV, or THIRD_DERIV.
-                  axis (str): Axis along which the filter is computed. Can be:
-                        { 'x' | 'y' | 'z' | 'c' }.
-                  boundary_conditions (unsigned int): Boundary conditions
+                  matrix: Transformation matrix mapping input to output
+                          coordinates, as array of shape (2,3) or (3,3) for
+                          2D transformations in the xy-plane, or (3,4) or
+                          (4,4) for 3D transformations. All channels are
+                          transformed.
+                  output_shape (tuple): Output size (height, width), or
+                          (depth, height, width) for 3D transformations.
+                          Empty for the size of the image.
+                  interpolation (int): Interpolation type.
+                      Can be: NEAREST, LINEAR, CUBIC.
+                  boundary (int): Boundary conditions.
+                      Can be: DIRICHLET, NEUMANN, PERIODIC, MIRROR.
+              Raises:
+                  RuntimeError: If the matrix is not invertible.
            )doc",
-           py::arg("sigma"),
-           py::arg("order") = 0,
-           py::arg("axis") = 'x',
-           py::arg("boundary_conditions") = 1
+           py::arg("matrix"),
+           py::arg("output_shape") = py::tuple(),
+           py::arg("interpolation") = 3,
+           py::arg("boundary") = 1,
+           py::return_value_policy::reference
     );
 
-    cl.def("blur",
-           (Class& (Class::*)(const float, const unsigned int, const bool))&Class::blur,
+    cl.def("get_warp_affine",
+           [](const Class& im, const pyarray_double& matrix, const py::sequence& output_shape,
+              const int interpolation, const unsigned int boundary)
+           {
+               return get_warp_affine(im, matrix, to_ints(output_shape), interpolation, boundary);
+           },
            R"doc(
-              Blur image isotropically.
+              Return result of warp_affine() as a new image.
+           )doc",
+           py::arg("matrix"),
+           py::arg("output_shape") = py::tuple(),
+           py::arg("interpolation") = 3,
+           py::arg("boundary") = 1
+    );
 
-              Note: The blur is computed as a 0-order Deriche filter.
-              This is not a gaussian blur. This is a recursive algorithm,
-              not depending on the values of the standard deviations.
+    cl.def("warp",
+           [](Class& im, const CImg<float>& field, const unsigned int mode, const int interpolation,
+              const unsigned int boundary) -> Class&
+           {
+               get_warp(im, field, mode, interpolation, boundary).move_to(im);
+               return im;
+           },
+           R"doc(
+              Warp image by a displacement field.
 
               Args:
-                  sigma (float): Standard deviation of the blur.
-                  boundary_conditions (int): Boundary conditions.
-                  is_gaussian (bool): Tells if the blur uses a gaussian (True)
-                               or quasi-gaussian (False) kernel.
+                  field: Warping field as CImg or numpy array with 1, 2,
+                         or 3 channels holding the (x[,y[,z]]) coordinates
+                         or offsets, i.e. of shape (k, depth, height, width)
+                         as returned by asarray(). float32 and float64 fields
+                         are used without copy.
+                  mode (int): Warping mode.
+                      Can be: BACKWARD_ABSOLUTE, BACKWARD_RELATIVE,
+                      FORWARD_ABSOLUTE, FORWARD_RELATIVE. Backward
+                      relative warping samples the image at the pixel
+                      coordinates minus the offsets.
+                  interpolation (int): Interpolation type.
+                      Can be: NEAREST, LINEAR, CUBIC.
+                  boundary (int): Boundary conditions.
+                      Can be: DIRICHLET, NEUMANN, PERIODIC, MIRROR.
            )doc",
-           py::arg("sigma"),
-           py::arg("boundary_conditions") = 1,
-           py::arg("is_gaussian") = false
+           py::arg("field"),
+           py::arg("mode") = 0,
+           py::arg("interpolation") = 3,
+           py::arg("boundary") = 0,
+           py::return_value_policy::reference,
+           release_gil()
     );
 
-    cl.def("boxfilter",
-           (Class& (Class::*)(const float, const int, const char, const bool, const unsigned int))&Class::boxfilter,
+    cl.def("warp",
+           [](Class& im, const CImg<double>& field, const unsigned int mode, const int interpolation,
+              const unsigned int boundary) -> Class&
+           {
+               get_warp(im, field, mode, interpolation, boundary).move_to(im);
+               return im;
+           },
            R"doc(
-              Apply box filter to image.
+              Warp image by a displacement field.
 
               Args:
-                  boxsize (float): Size of the box window (can be subpixel)
-                  order (int):   the order of the filter 0,1 or 2.
-                  axis (str):    Axis along which the filter is computed.
-                           Can be { 'x' | 'y' | 'z' | 'c' }.
-                  boundary_conditions (bool): Boundary conditions. Can be
-                                       { False=dirichlet | True=neumann }.
-                  nb_iter (int): Number of filter iterations.
+                  field: Warping field as CImg or numpy array with 1, 2,
+                         or 3 channels holding the (x[,y[,z]]) coordinates
+                         or offsets, i.e. of shape (k, depth, height, width)
+                         as returned by asarray(). float32 and float64 fields
+                         are used without copy.
+                  mode (int): Warping mode.
+                      Can be: BACKWARD_ABSOLUTE, BACKWARD_RELATIVE,
+                      FORWARD_ABSOLUTE, FORWARD_RELATIVE. Backward
+                      relative warping samples the image at the pixel
+                      coordinates minus the offsets.
+                  interpolation (int): Interpolation type.
+                      Can be: NEAREST, LINEAR, CUBIC.
+                  boundary (int): Boundary conditions.
+                      Can be: DIRICHLET, NEUMANN, PERIODIC, MIRROR.
            )doc",
-           py::arg("boxsize"),
-           py::arg("order"),
-           py::arg("axis") = 'x',
-           py::arg("boundary_conditions") = true,
-           py::arg("nb_iter") = 1 
+           py::arg("field"),
+           py::arg("mode") = 0,
+           py::arg("interpolation") = 3,
+           py::arg("boundary") = 0,
+           py::return_value_policy::reference,
+           release_gil()
     );
 
-    cl.def("blur_box",
-           (Class& (Class::*)(const float, const unsigned int))&Class::blur_box,
+    cl.def("warp",
+           [](Class& im, const py::array& field, const unsigned int mode, const int interpolation,
+              const unsigned int boundary) -> Class&
+           {
+               get_warp(im, field, mode, interpolation, boundary).move_to(im);
+               return im;
+           },
            R"doc(
-              Blur image with a box filter.
+              Warp image by a displacement field.
 
               Args:
-                  boxsize (int): Size of the box window (can be subpixel).
-                  boundary_conditions (int): Boundary conditions.
+                  field: Warping field as CImg or numpy array with 1, 2,
+                         or 3 channels holding the (x[,y[,z]]) coordinates
+                         or offsets, i.e. of shape (k, depth, height, width)
+                         as returned by asarray(). float32 and float64 fields
+                         are used without copy.
+                  mode (int): Warping mode.
+                      Can be: BACKWARD_ABSOLUTE, BACKWARD_RELATIVE,
+                      FORWARD_ABSOLUTE, FORWARD_RELATIVE. Backward
+                      relative warping samples the image at the pixel
+                      coordinates minus the offsets.
+                  interpolation (int): Interpolation type.
+                      Can be: NEAREST, LINEAR, CUBIC.
+                  boundary (int): Boundary conditions.
+                      Can be: DIRICHLET, NEUMANN, PERIODIC, MIRROR.
            )doc",
-           py::arg("boxsize"),
-           py::arg("boundary_conditions") = 1
+           py::arg("field"),
+           py::arg("mode") = 0,
+           py::arg("interpolation") = 3,
+           py::arg("boundary") = 0,
+           py::return_value_policy::reference
     );
 
-    cl.def("blur_median",
-           (Class& (Class::*)(const unsigned int, const float))&Class::blur_median,
+    cl.def("get_warp",
+           [](const Class& im, const CImg<float>& field, const unsigned int mode, const int interpolation,
+              const unsigned int boundary)
+           {
+               return get_warp(im, field, mode, interpolation, boundary);
+           },
            R"doc(
-              Blur image with the median filter.
+              Return result of warp() as a new image.
+           )doc",
+           py::arg("field"),
+           py::arg("mode") = 0,
+           py::arg("interpolation") = 3,
+           py::arg("boundary") = 0,
+           release_gil()
+    );
 
-              Args:
-                  n (int): Size of the median filter.
-                  threshold (float): Threshold used to discard pixels too far
-                             from the current pixel value in the median computation.
+    cl.def("get_warp",
+           [](const Class& im, const CImg<double>& field, const unsigned int mode, const int interpolation,
+              const unsigned int boundary)
+           {
+               return get_warp(im, field, mode, interpolation, boundary);
+           },
+           R"doc(
+              Return result of warp() as a new image.
            )doc",
-           py::arg("n"),
-           py::arg("threshold") = 0
+           py::arg("field"),
+           py::arg("mode") = 0,
+           py::arg("interpolation") = 3,
+           py::arg("boundary") = 0,
+           release_gil()
     );
 
-    cl.def("sharpen",
-           (Class& (Class::*)(const float, const bool, const float, const float, const float))&Class::sharpen,
+    cl.def("get_warp",
+           [](const Class& im, const py::array& field, const unsigned int mode, const int interpolation,
+              const unsigned int boundary)
+           {
+               return get_warp(im, field, mode, interpolation, boundary);
+           },
            R"doc(
-              Sharpen image.
+              Return result of warp() as a new image.
+           )doc",
+           py::arg("field"),
+           py::arg("mode") = 0,
+           py::arg("interpolation") = 3,
+           py::arg("boundary") = 0
+    );
+
+    cl.def("apply_geometric_transform",
+           [](Class& im, const float s, const Class& M, const Class& t)
+           {
+              // The matrix M and shift t act on (z,x,y) coordinates,
+              // only channel 0 is transformed.
+              const int p[] = {1, 2, 0};
+              std::array<double, 16> A = {};
+              for (int i = 0; i < 3; ++i) {
+                  for (int j = 0; j < 3; ++j)
+                      A[4 * i + j] = s * (double)M(p[j], p[i]);
+                  A[4 * i + 3] = (double)t[p[i]];
+              }
+              A[15] = 1;
+              CImg<double> F(A.data(), 4, 4);
+              if (F.det() == 0)
+                  throw std::runtime_error("Matrix is not invertible.");
+              F.invert();
+              std::copy(F.begin(), F.end(), A.begin());
+              Class res(im.width(), im.height(), im.depth(), 1);
+              warp_affine(im.get_shared_channel(0), res, A, true, 3, 1);
+              im.draw_image(0, 0, 0, 0, res);
+           },
+           R"doc(
+              Apply a geometric transform
 
               Args:
-                  amplitude (float): Sharpening amplitude
-                  sharpen_type (bool): Select sharpening method. Can be
-                                { False=inverse diffusion | True=shock filters }.
-                  edge (int): Edge threshold (shock filters only).
-                  alpha (float): Gradient smoothness (shock filters only).
-                  sigma (float): Tensor smoothness (shock filters only).
+                  s (float): scale
+                  M (CImg) : 3x3 matrix CImg(3,3)
+                  t (CImg) : 1x3 shift vector (CImg(3,1))
            )doc",
-           py::arg("amplitude"),
-           py::arg("sharpen_type") = false,
-           py::arg("edge") = 1,
-           py::arg("alpha") = 0,
-           py::arg("sigma") = 0
-    ); 
+           release_gil()
+    );
 
-    // Drawing
-    cl.def("draw_rectangle",
-           [](Class& im, const int x0, const int y0, const int x1, const int y1, pyarray color, const float opacity)
-           {
-                if(color.size() != im.spectrum())
-                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
-                return im.draw_rectangle(x0, y0, x1, y1, color.data(), opacity);
-           }, 
+}
+
+// Declare Pipeline class for images of pixel type T
+template <typename T>
+void declare_pipeline(py::module &m, const std::string &typestr)
+{
+    using Class = CImg<T>;
+    using Steps = Pipeline<T>;
+    std::string pyclass_name = std::string("Pipeline_") + typestr;
+    py::class_<Steps> cl(m, pyclass_name.c_str());
+
+    static const char* const step_doc = "Append the operation of the same name of CImg to the pipeline.";
+
+    cl.def(py::init<>());
+
+    cl.def("__len__", &Steps::size);
+
+    cl.def("run",
+           [](const Steps& p, Class& im) -> Class& { return p.run(im); },
            R"doc(
-              Draw a filled 2d rectangle.
+              Apply all operations of the pipeline in place.
 
               Args:
-                  x0 (int): X-coordinate of the upper-left rectangle corner.
-                  y0 (int): Y-coordinate of the upper-left rectangle corner.
-                  x1 (int): X-coordinate of the lower-right rectangle corner.
-                  y1 (int): Y-coordinate of the lower-right rectangle corner.
-                  color (list): List of color value with spectrum() entries.
-                  opacity (float): Drawing opacity.
+                  img (CImg): Image to process.
+           )doc",
+           py::arg("img"),
+           py::return_value_policy::reference,
+           release_gil()
+    );
 
-              Raises:
-                  RuntimeError: If list of color values does not have spectrum() entries.
+    cl.def("get_run",
+           [](const Steps& p, const Class& im)
+           {
+               Class res(im, false);
+               p.run(res);
+               return res;
+           },
+           R"doc(
+              Return result of run() as a new image.
            )doc",
-           py::arg("x0"),
-           py::arg("y0"),
-           py::arg("x1"),
-           py::arg("y1"),
-           py::arg("color"),
-           py::arg("opacity") = 1
+           py::arg("img"),
+           release_gil()
     );
 
-    cl.def("draw_line",
-           [](Class& im, const int x0, const int y0, const int x1, const int y1, pyarray color, const float opacity, const unsigned int pattern, const bool init_hatch)
+    cl.def("map",
+           [](const Steps& p, const py::iterable& images, const unsigned int workers)
            {
-                if(color.size() != im.spectrum())
-                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
-                return im.draw_line(x0, y0, x1, y1, color.data(), opacity, pattern, init_hatch);
-           }, 
+               std::vector<const Class*> inputs;
+               for (auto img : images)
+                   inputs.push_back(img.cast<const Class*>());
+               std::vector<Class> results(inputs.size());
+               {
+                   native_scope release;
+                   parallel_for(inputs.size(), workers, [&](const size_t i)
+                   {
+                       results[i].assign(*inputs[i], false);
+                       p.run(results[i]);
+                   });
+               }
+               py::list res;
+               for (auto& img : results)
+                   res.append(py::cast(std::move(img)));
+               return res;
+           },
            R"doc(
-              Draw a 2d line.
+              Apply the pipeline to images concurrently.
 
               Args:
-                  x0 (int): X-coordinate of the upper-left rectangle corner.
-                  y0 (int): Y-coordinate of the upper-left rectangle corner.
-                  x1 (int): X-coordinate of the lower-right rectangle corner.
-                  y1 (int): Y-coordinate of the lower-right rectangle corner.
-                  color (list): List of color value with spectrum() entries.
-                  opacity (float): Drawing opacity.
-                  pattern (int): An integer whose bits describe the line pattern.
-                  init_hatch (bool): Tells if a reinitialization of the hash state must be done.
-
-              Raises:
-                  RuntimeError: If list of color values does not have spectrum() entries.
+                  images (list): Images to process.
+                  workers: Number of threads processing images.
+              Returns:
+                  List of processed images in the order of images.
            )doc",
+           py::arg("images"),
+           py::arg("workers") = 1
+    );
+
+    // Geometric operations
+    cl.def("resize",
+           [](Steps& p, const int size_x, const int size_y, const int size_z, const int size_c,
+              const int interpolation_type, const unsigned int boundary_conditions,
+              const float centering_x, const float centering_y, const float centering_z, const float centering_c)
+           {
+               p.add([=](Class& im) { im.resize(size_x, size_y, size_z, size_c, interpolation_type,
+                                                boundary_conditions, centering_x, centering_y,
+                                                centering_z, centering_c); });
+           },
+           step_doc,
+           py::arg("size_x"),
+           py::arg("size_y") = -100,
+           py::arg("size_z") = -100,
+           py::arg("size_c") = -100,
+           py::arg("interpolation_type") = 1,
+           py::arg("boundary_conditions") = 0,
+           py::arg("centering_x") = 0.0f,
+           py::arg("centering_y") = 0.0f,
+           py::arg("centering_z") = 0.0f,
+           py::arg("centering_c") = 0.0f
+    );
+
+    cl.def("resize_halfXY", [](Steps& p) { p.add([](Class& im) { im.resize_halfXY(); }); }, step_doc);
+    cl.def("resize_doubleXY", [](Steps& p) { p.add([](Class& im) { im.resize_doubleXY(); }); }, step_doc);
+    cl.def("resize_tripleXY", [](Steps& p) { p.add([](Class& im) { im.resize_tripleXY(); }); }, step_doc);
+
+    cl.def("crop",
+           [](Steps& p, const int x0, const int y0, const int z0, const int c0,
+              const int x1, const int y1, const int z1, const int c1, const unsigned int boundary_conditions)
+           {
+               p.add([=](Class& im) { im.crop(x0, y0, z0, c0, x1, y1, z1, c1, boundary_conditions); });
+           },
+           step_doc,
            py::arg("x0"),
            py::arg("y0"),
+           py::arg("z0"),
+           py::arg("c0"),
            py::arg("x1"),
            py::arg("y1"),
-           py::arg("color"),
-           py::arg("opacity") = 1,
-           py::arg("pattern") = ~0U,
-           py::arg("init_hatch") = true
+           py::arg("z1"),
+           py::arg("c1"),
+           py::arg("boundary_conditions") = 0
     );
 
-    cl.def("draw_polygon",
-           [](Class& im, pyarray points, pyarray color, const float opacity)
+    cl.def("mirror",
+           [](Steps& p, const std::string& axes)
            {
-                if(color.size() != im.spectrum())
-                    throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
-                return im.draw_polygon(fromarray<T>(points), color.data(), opacity);
-           }, 
-           R"doc(
-              Draw filled 2d polygon.
+               p.add([=](Class& im) { im.mirror(axes.c_str()); });
+           },
+           step_doc,
+           py::arg("axes")
+    );
 
-              Args:
-                  points (ndarray): (n x 2) numpy array of polygon vertices
-                  color (list): List of color value with spectrum() entries.
-                  opacity (float): Drawing opacity.
+    cl.def("shift",
+           [](Steps& p, const int delta_x, const int delta_y, const int delta_z, const int delta_c,
+              const unsigned int boundary_conditions)
+           {
+               p.add([=](Class& im) { im.shift(delta_x, delta_y, delta_z, delta_c, boundary_conditions); });
+           },
+           step_doc,
+           py::arg("delta_x"),
+           py::arg("delta_y") = 0,
+           py::arg("delta_z") = 0,
+           py::arg("delta_c") = 0,
+           py::arg("boundary_conditions") = 0
+    );
 
-              Raises:
-                  RuntimeError: If list of color values does not have spectrum() entries.
-           )doc",
-           py::arg("points"),
-           py::arg("color"),
-           py::arg("opacity") = 1
+    cl.def("rotate",
+           [](Steps& p, const float angle, const unsigned int interpolation, const unsigned int boundary_conditions)
+           {
+               p.add([=](Class& im) { im.rotate(angle, interpolation, boundary_conditions); });
+           },
+           step_doc,
+           py::arg("angle"),
+           py::arg("interpolation") = 1,
+           py::arg("boundary_conditions") = 0
     );
 
-    cl.def("draw_circle",
-        [](Class& im, const int x0, const int y0, const int radius, pyarray color, const float opacity)
-        {
-            if(color.size() != im.spectrum())
-                throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
-            return im.draw_circle(x0, y0, radius, color.data(), opacity);
-        },
-        R"doc(
-              Draw a filled 2d circle.
+    cl.def("permute_axes",
+           [](Steps& p, const std::string& order)
+           {
+               p.add([=](Class& im) { im.permute_axes(order.c_str()); });
+           },
+           step_doc,
+           py::arg("order")
+    );
 
-              Args:
-                  x0 (int):  X-coordinate of the circle center.
-                  y0 (int):  Y-coordinate of the circle center.
-                  radius (float):  Circle radius.
-                  color (list): List of color value with spectrum() entries.
-                  opacity (float): Drawing opacity.
+    // Filters
+    cl.def("blur",
+           [](Steps& p, const float sigma, const unsigned int boundary_conditions, const bool is_gaussian)
+           {
+               p.add([=](Class& im) { im.blur(sigma, boundary_conditions, is_gaussian); });
+           },
+           step_doc,
+           py::arg("sigma"),
+           py::arg("boundary_conditions") = 1,
+           py::arg("is_gaussian") = false
+    );
 
-              Raises:
-                  RuntimeError: If list of color values does not have spectrum() entries.
-        )doc",
-        py::arg("x0"),
-        py::arg("y0"),
-        py::arg("radius"),
-        py::arg("color"),
-        py::arg("opacity") = 1
+    cl.def("blur_box",
+           [](Steps& p, const float boxsize, const unsigned int boundary_conditions)
+           {
+               p.add([=](Class& im) { im.blur_box(boxsize, boundary_conditions); });
+           },
+           step_doc,
+           py::arg("boxsize"),
+           py::arg("boundary_conditions") = 1
+    );
+
+    cl.def("blur_median",
+           [](Steps& p, const unsigned int n, const float threshold)
+           {
+               p.add([=](Class& im) { im.blur_median(n, threshold); });
+           },
+           step_doc,
+           py::arg("n"),
+           py::arg("threshold") = 0
+    );
+
+    cl.def("deriche",
+           [](Steps& p, const float sigma, const unsigned int order, const char axis, const bool boundary_conditions)
+           {
+               p.add([=](Class& im) { im.deriche(sigma, order, axis, boundary_conditions); });
+           },
+           step_doc,
+           py::arg("sigma"),
+           py::arg("order") = 0,
+           py::arg("axis") = 'x',
+           py::arg("boundary_conditions") = true
     );
 
-    cl.def("draw_triangle",
-           [](Class& im, const int x0, const int y0, const int x1, const int y1, const int x2, const int y2, pyarray color, const float opacity)
+    cl.def("vanvliet",
+           [](Steps& p, const float sigma, const unsigned int order, const char axis, const unsigned int boundary_conditions)
            {
-               if(color.size() != im.spectrum())
-                   throw std::runtime_error("Color needs to have " + std::to_string(im.spectrum()) + " elements.");
-               return im.draw_triangle(x0, y0, x1, y1, x2, y2, color.data(), opacity);
+               p.add([=](Class& im) { im.vanvliet(sigma, order, axis, boundary_conditions); });
            },
-           R"doc(
-              Draw a filled 2d triangle.
+           step_doc,
+           py::arg("sigma"),
+           py::arg("order") = 0,
+           py::arg("axis") = 'x',
+           py::arg("boundary_conditions") = 1
+    );
 
-              Args:
-                  x0 (int): X-coordinate of the first vertex.
-                  y0 (int): Y-coordinate of the first vertex.
-                  x1 (int): X-coordinate of the second vertex.
-                  y1 (int): Y-coordinate of the second vertex.
-                  x2 (int): X-coordinate of the third vertex.
-                  y2 (int): Y-coordinate of the third vertex.
-                  color (list): List of color value with spectrum() entries.
-                  opacity (float): Drawing opacity.
+    cl.def("sharpen",
+           [](Steps& p, const float amplitude, const bool sharpen_type, const float edge, const float alpha,
+              const float sigma)
+           {
+               p.add([=](Class& im) { im.sharpen(amplitude, sharpen_type, edge, alpha, sigma); });
+           },
+           step_doc,
+           py::arg("amplitude"),
+           py::arg("sharpen_type") = false,
+           py::arg("edge") = 1,
+           py::arg("alpha") = 0,
+           py::arg("sigma") = 0
+    );
 
-              Raises:
-                  RuntimeError: If list of color values does not have spectrum() entries.
-           )doc",
-           py::arg("x0"),
-           py::arg("y0"),
-           py::arg("x1"),
-           py::arg("y1"),
-           py::arg("x2"),
-           py::arg("y2"),
-           py::arg("color"),
-           py::arg("opacity") = 1
+    // Value manipulation
+    cl.def("fill",
+           [](Steps& p, const double val)
+           {
+               p.add([=](Class& im) { im.fill(saturate_cast<T>(val)); });
+           },
+           step_doc,
+           py::arg("val")
     );
 
-    cl.def("draw_text",
-           [](Class& im, const int x0, const int y0, const char* const text, pyarray foreground_color, pyarray background_color, const float opacity, const unsigned int font_height)
+    cl.def("normalize",
+           [](Steps& p, const double min_value, const double max_value, const float constant_case_ratio)
            {
-               if(foreground_color.size() != im.spectrum() || background_color.size() != im.spectrum())
-                   throw std::runtime_error("Colors needs to have " + std::to_string(im.spectrum()) + " elements.");
-               return im.draw_text(x0, y0, text, foreground_color.data(), background_color.data(), opacity, font_height);
+               p.add([=](Class& im) { im.normalize(saturate_cast<T>(min_value), saturate_cast<T>(max_value),
+                                                   constant_case_ratio); });
            },
-           R"doc(
-              Draw a text string.
+           step_doc,
+           py::arg("min_value"),
+           py::arg("max_value"),
+           py::arg("constant_case_ratio") = 0
+    );
 
-              Args:
-                  x0 (int): X-coordinate of the text in the image instance.
-                  y0 (int): Y-coordinate of the text in the image instance.
-                  text (str): The text.
-                  foreground_color (list): List of color value with spectrum() entries.
-                  background_color (list): List of color value with spectrum() entries.
-                  opacity (float): Drawing opacity.
-                  font_height (int): Height of the text font
-                      (exact match for 13,23,53,103, interpolated otherwise).
-           )doc",
-           py::arg("x0"),
-           py::arg("y0"),
-           py::arg("text"),
-           py::arg("foreground_color"),
-           py::arg("background_color"),
-           py::arg("opacity") = 1,
-           py::arg("font_height") = 13
+    cl.def("cut",
+           [](Steps& p, const double min_value, const double max_value)
+           {
+               p.add([=](Class& im) { im.cut(saturate_cast<T>(min_value), saturate_cast<T>(max_value)); });
+           },
+           step_doc,
+           py::arg("min_value"),
+           py::arg("max_value")
     );
 
-    // Mathematical 
-    cl.def("sqr", (Class& (Class::*)())&Class::sqr, "Compute the square value of each pixel value.");
-    cl.def("sqrt", (Class& (Class::*)())&Class::sqrt, "Compute the square root of each pixel value.");
-    cl.def("exp", (Class& (Class::*)())&Class::exp, "Compute the exponential of each pixel value.");
-    cl.def("log", (Class& (Class::*)())&Class::log, "Compute the logarithm of each pixel value.");
-    cl.def("log2", (Class& (Class::*)())&Class::log2, "Compute the base-2 logarithm of each pixel value.");
-    cl.def("log10", (Class& (Class::*)())&Class::log10, "Compute the base-10 logarithm of each pixel value.");
-    cl.def("abs", (Class& (Class::*)())&Class::abs, "Compute the absolute value of each pixel value.");
-    cl.def("sign", (Class& (Class::*)())&Class::sign, "Compute the sign of each pixel value.");
-    cl.def("cos", (Class& (Class::*)())&Class::cos, "Compute the cosine of each pixel value.");
-    cl.def("sin", (Class& (Class::*)())&Class::sin, "Compute the sine of each pixel value.");
-    cl.def("sinc", (Class& (Class::*)())&Class::sinc, "Compute the sinc of each pixel value.");
-    cl.def("tan", (Class& (Class::*)())&Class::tan, "Compute the tangent of each pixel value.");
-    cl.def("sinh", (Class& (Class::*)())&Class::sinh, "Compute the hyperbolic sine of each pixel value.");
-    cl.def("tanh", (Class& (Class::*)())&Class::tanh, "Compute the hyperbolic tangent of each pixel value.");
-    cl.def("acos", (Class& (Class::*)())&Class::acos, "Compute the arccosine of each pixel value.");
-    cl.def("asin", (Class& (Class::*)())&Class::asin, "Compute the arcsine of each pixel value.");
-    cl.def("atan", (Class& (Class::*)())&Class::atan, "Compute the arctangent of each pixel value.");
+    cl.def("quantize",
+           [](Steps& p, const unsigned int nb_levels, const bool keep_range)
+           {
+               p.add([=](Class& im) { im.quantize(nb_levels, keep_range); });
+           },
+           step_doc,
+           py::arg("nb_levels"),
+           py::arg("keep_range") = true
+    );
 
-    cl.def("atan2", 
-           (Class& (Class::*)(const Class&))&Class::atan2, 
-           R"doc(
-              Compute the arctangent2 of each pixel value.
+    cl.def("threshold",
+           [](Steps& p, const double value, const bool soft_threshold, const bool strict_threshold)
+           {
+               p.add([=](Class& im) { im.threshold(saturate_cast<T>(value), soft_threshold, strict_threshold); });
+           },
+           step_doc,
+           py::arg("value"),
+           py::arg("soft_threshold") = false,
+           py::arg("strict_threshold") = false
+    );
 
-              Args:
-                  img (CImg): Image whose pixel values specify the second
-                              argument of the atan2() function.
-           )doc"
+    cl.def("equalize",
+           [](Steps& p, const unsigned int nb_levels, const double min_value, const double max_value)
+           {
+               p.add([=](Class& im) { im.equalize(nb_levels, saturate_cast<T>(min_value), saturate_cast<T>(max_value)); });
+           },
+           step_doc,
+           py::arg("nb_levels"),
+           py::arg("min_value"),
+           py::arg("max_value")
     );
 
-    cl.def("mul", 
-           (Class& (Class::*)(const Class&))&Class::mul, 
-           R"doc(
-              In-place pointwise multiplication.
+    cl.def("round",
+           [](Steps& p, const double y, const int rounding_type)
+           {
+               p.add([=](Class& im) { im.round(y, rounding_type); });
+           },
+           step_doc,
+           py::arg("y") = 1,
+           py::arg("rounding_type") = 0
+    );
 
-              Compute the pointwise multiplication between
-              the image instance and the specified input image img.
+    cl.def("pow",
+           [](Steps& p, const double value)
+           {
+               p.add([=](Class& im) { im.pow(value); });
+           },
+           step_doc,
+           py::arg("p")
+    );
 
-              Args:
-                  img (CImg): Input image, second operand of the multiplication.
-           )doc"
+    // Arithmetic with a value
+    cl.def("add",
+           [](Steps& p, const double value) { p.add([=](Class& im) { pointwise(im, im, value, Add()); }); },
+           step_doc,
+           py::arg("value")
+    );
+    cl.def("sub",
+           [](Steps& p, const double value) { p.add([=](Class& im) { pointwise(im, im, value, Sub()); }); },
+           step_doc,
+           py::arg("value")
+    );
+    cl.def("mul",
+           [](Steps& p, const double value) { p.add([=](Class& im) { pointwise(im, im, value, Mul()); }); },
+           step_doc,
+           py::arg("value")
+    );
+    cl.def("div",
+           [](Steps& p, const double value) { p.add([=](Class& im) { pointwise(im, im, value, Div()); }); },
+           step_doc,
+           py::arg("value")
+    );
+    cl.def("floordiv",
+           [](Steps& p, const double value) { p.add([=](Class& im) { pointwise(im, im, value, FloorDiv()); }); },
+           step_doc,
+           py::arg("value")
     );
 
-    cl.def("div", 
-           (Class& (Class::*)(const Class&))&Class::div, 
-           R"doc(
-              In-place pointwise division.
+    // Pointwise functions
+    struct Function
+    {
+        const char* name;
+        Class& (Class::*f)();
+    };
+    const Function functions[] = {
+        {"sqr", &Class::sqr}, {"sqrt", &Class::sqrt}, {"exp", &Class::exp}, {"log", &Class::log},
+        {"log2", &Class::log2}, {"log10", &Class::log10}, {"abs", &Class::abs}, {"sign", &Class::sign},
+        {"cos", &Class::cos}, {"sin", &Class::sin}, {"sinc", &Class::sinc}, {"tan", &Class::tan},
+        {"sinh", &Class::sinh}, {"tanh", &Class::tanh}, {"acos", &Class::acos}, {"asin", &Class::asin},
+        {"atan", &Class::atan},
+    };
+    for (const auto& function : functions) {
+        const auto f = function.f;
+        cl.def(function.name, [f](Steps& p) { p.add([f](Class& im) { (im.*f)(); }); }, step_doc);
+    }
+}
 
-              Compute the pointwise division between
-              the image instance and the specified input image img.
+template <typename T>
+void declare_type(py::module &m, const std::string &typestr)
+{
+    declare<T>(m, typestr);
+    declare_pipeline<T>(m, typestr);
+}
 
-              Args:
-                  img (CImg): Input image, second operand of the division.
-           )doc"
-    );
+PYBIND11_MODULE(cimg_bindings, m)
+{
+    py::options options;
+    options.disable_function_signatures();
 
-    cl.def("pow", 
-           (Class& (Class::*)(const double))&Class::pow, 
-           R"doc(
-              Raise each pixel value to the specified power.
+    m.doc() = R"doc(
+       Pybind11 bindings for the CImg library.
+    )doc";
+
+#ifdef cimg_use_tiff
+    py::class_<TiffFile>(m, "TiffFile")
+        .def(py::init<const std::string&>(),
+             R"doc(
+              Open a TIFF file for reading its frames.
 
               Args:
-                  p (int): Exponent value.
-           )doc"
-    );
+                  filename (str): Filename of image.
+              Raises:
+                  RuntimeError: If file cannot be opened.
+             )doc",
+             py::arg("filename"),
+             release_gil()
+        )
+        .def("frames",
+             &TiffFile::frames,
+             "Return number of frames."
+        )
+        .def("info",
+             &TiffFile::info,
+             R"doc(
+              Return frame count, dimensions and data type of the
+              first frame without decoding pixel data.
 
-    cl.def("kth_smallest", 
-           (T (Class::*)(const ulongT) const)&Class::kth_smallest, 
-           R"doc(
-              Returns the kth smallest pixel value.
+              Returns:
+                  dict with keys frames, width, height, spectrum,
+                  bits_per_sample, and dtype.
+             )doc"
+        )
+        .def("close",
+             &TiffFile::close,
+             "Close file.",
+             release_gil()
+        )
+        .def("closed",
+             &TiffFile::closed,
+             "Return true if file is closed."
+        );
 
-              Args:
-                  k (int): Rank of the search smallest element.
+#endif
+    m.def("set_num_threads",
+          [](const int n)
+          {
+              if (n < 0)
+                  throw std::runtime_error("Number of threads needs to be non-negative.");
+              global_num_threads = n;
+          },
+          R"doc(
+             Set the number of threads used by parallelized operations.
 
-              Returns: kth smallest pixel value.
-           )doc"
+             Args:
+                 n (int): Number of threads. 0 restores the OpenMP
+                          default, e.g. given by OMP_NUM_THREADS.
+             Raises:
+                 RuntimeError: If n is negative.
+          )doc",
+          py::arg("n")
     );
 
-    cl.def("variance", 
-           (double (Class::*)(const unsigned int) const)&Class::variance, 
-           R"doc(
-              Returns the variance of the pixel values.
+    m.def("get_num_threads",
+          &num_threads,
+          R"doc(
+             Return the number of threads used by parallelized operations
+             called from the current thread.
+          )doc"
+    );
 
-              Args:
-                  variance_method (int): Method used to estimate the variance.
-                                         Can be: SECOND_MOMENT
-                                                 BEST_UNBIASED
-                                                 LEAST_MEDIAN_SQ
-                                                 LEAST_TRIMMED_SQ
+    m.def("set_local_num_threads",
+          [](const int n)
+          {
+              if (n < 0)
+                  throw std::runtime_error("Number of threads needs to be non-negative.");
+              const int previous = local_num_threads;
+              local_num_threads = n;
+              return previous;
+          },
+          R"doc(
+             Set the number of threads used by parallelized operations
+             called from the current thread, overriding set_num_threads().
 
-              Returns: Variance of pixel values.
-           )doc",
-           py::arg("variance_method") = 1
+             Args:
+                 n (int): Number of threads. 0 removes the override.
+             Returns:
+                 The previous number of threads of the current thread.
+             Raises:
+                 RuntimeError: If n is negative.
+          )doc",
+          py::arg("n")
     );
 
-    cl.def("variance_mean", 
-           [](Class& im, const unsigned int variance_method)
-           {
-                  std::pair<double,double> var_mean;
-                  var_mean.first = im.variance_mean(variance_method, var_mean.second);
-                  return var_mean;
-           },
-           R"doc(
-              Returns variance and average of pixel values.
+    m.def("set_parallel_size_factor",
+          [](const double factor)
+          {
+              if (!(factor >= 0))
+                  throw std::runtime_error("Size factor needs to be non-negative.");
+              openmp_size_factor = factor;
+          },
+          R"doc(
+             Scale the minimum image sizes from which operations run in
+             parallel. Small images skip the startup cost of threads.
 
-              Args:
-                  variance_method (int): Method used to estimate the variance.
+             Args:
+                 factor (float): Factor of the minimum sizes. 0 runs all
+                                 operations in parallel, inf none.
+                                 Default: 1.
+             Raises:
+                 RuntimeError: If factor is negative.
+          )doc",
+          py::arg("factor")
+    );
 
-              Returns: Tuple with variance and mean of pixel values.
-           )doc",
-           py::arg("variance_method") = 1
+    m.def("get_parallel_size_factor",
+          []() { return openmp_size_factor.load(); },
+          "Return the factor of the minimum image sizes of parallelized operations."
     );
 
-    cl.def("mse",
-           (double (Class::*)(const Class&) const)&Class::MSE,
-           R"doc(
-              Compute the MSE (Mean-Squared Error) between two images.
+    m.def("openmp_info",
+          []()
+          {
+              py::dict info;
+#if cimg_use_openmp!=0
+              info["enabled"] = true;
+              info["version"] = _OPENMP;
+              info["num_procs"] = omp_get_num_procs();
+              info["default_threads"] = openmp_default_threads;
+#else
+              info["enabled"] = false;
+              info["version"] = 0;
+              info["num_procs"] = 1;
+              info["default_threads"] = 1;
+#endif
+              info["num_threads"] = num_threads();
+              info["size_factor"] = openmp_size_factor.load();
+              return info;
+          },
+          R"doc(
+             Return information about the OpenMP support.
+
+             Returns:
+                 dict with keys enabled, version (the _OPENMP date),
+                 num_procs, default_threads, num_threads, and size_factor.
+          )doc"
+    );
 
-              Args:
-                  img (CImg): Image used as the second argument of the MSE operator.
+    m.def("set_buffer_pool_size",
+          [](const long long max_bytes)
+          {
+              if (max_bytes < 0)
+                  throw std::runtime_error("Size of buffer pool needs to be non-negative.");
+              BufferPool::instance().set_max_bytes((size_t)max_bytes);
+          },
+          R"doc(
+             Set the maximum number of bytes of released pixel buffers kept
+             for reuse by new images.
 
-              Returns: mean squared error between self and img.
-           )doc"
+             Args:
+                 max_bytes (int): Maximum size of the pool. 0 disables the pool
+                                  and frees the buffers held.
+             Raises:
+                 RuntimeError: If max_bytes is negative.
+          )doc",
+          py::arg("max_bytes")
     );
 
-    cl.def("magnitude", 
-           (double (Class::*)(const float) const)&Class::magnitude, 
-           R"doc(
-               Compute norm of the image, viewed as a matrix.
+    m.def("clear_buffer_pool",
+          []() { BufferPool::instance().clear(); },
+          "Free the pixel buffers held by the buffer pool."
+    );
 
-               Args:
-                   magnitude_type (float): Norm type. Can be:
-                       LINF_NORM
-                       L0_NORM
-                       L1_NORM
-                       L2_NORM
+    m.def("buffer_pool_stats",
+          []() { return BufferPool::instance().stats(); },
+          R"doc(
+             Return statistics of the buffer pool.
 
-               Returns: Norm of image.
-            )doc"
+             Returns:
+                 dict with keys max_bytes, bytes_held, buffers_held, and the
+                 number of hits, misses and evictions since the module was loaded.
+          )doc"
     );
 
-    cl.def("dot", 
-           (double (Class::*)(const Class&) const)&Class::dot, 
-           R"doc(
-              Compute the dot product between instance and argument, viewed as matrices
+    m.def("set_gil_timing",
+          [](const bool enabled) { gil_timing = enabled; },
+          R"doc(
+             Enable or disable measuring the time native calls run without the GIL.
 
-              Args:
-                  img (CImg): Image used as a second argument of the dot product.
+             Args:
+                 enabled (bool): If True, the time is added up per thread.
+          )doc",
+          py::arg("enabled")
+    );
 
-              Returns: Dot product between self and img.
-           )doc"
+    m.def("gil_released_time",
+          []() { return gil_released_seconds; },
+          R"doc(
+             Return the time in seconds that native calls of the current
+             thread ran without the GIL while measuring was enabled.
+          )doc"
     );
 
-    cl.def("apply_geometric_transform",
-           [](Class& im, const float s, const Class& M, const Class& t)
-           {
-              Class tmp = im;
-              Class Q = M.get_invert();
-              cimg_pragma_openmp(parallel for cimg_openmp_collapse(3) cimg_openmp_if_size(tmp.size(),4096))
-              cimg_forXYZ(tmp,x,y,z) {
-                  Class p = CImg<>::vector((z-t(0))/s,(x-t(1))/s,(y-t(2))/s);
-                  p = Q * p;
-                  tmp(x,y,z) = im.linear_atXYZ(p(1),p(2),p(0));
+    // The CImg_* and Pipeline_* classes of the pixel types are registered
+    // on first access of the module attribute, to reduce the import time.
+    using Declare = void (*)(py::module&, const std::string&);
+    static const std::vector<std::pair<std::string, Declare>> pixel_types = {
+        {"bool", &declare_type<bool>},
+        {"int8", &declare_type<int8_t>},
+        {"int16", &declare_type<int16_t>},
+        {"int32", &declare_type<int32_t>},
+        {"uint8", &declare_type<uint8_t>},
+        {"uint16", &declare_type<uint16_t>},
+        {"uint32", &declare_type<uint32_t>},
+#ifdef cimg_use_half
+        {"float16", &declare_type<half>},
+#endif
+        {"float32", &declare_type<float>},
+        {"float64", &declare_type<double>},
+    };
+
+    py::list names;
+    for (const auto& type : pixel_types)
+        names.append(type.first);
+    m.attr("pixel_types") = py::tuple(names);
+    m.attr("has_display") = py::bool_(cimg_display != 0);
+
+    py::handle module = m;
+    m.def("__getattr__",
+          [module](const std::string& name) -> py::object
+          {
+              for (const std::string prefix : {"CImg_", "Pipeline_"})
+              {
+                  if (name.compare(0, prefix.size(), prefix) != 0)
+                      continue;
+                  for (const auto& type : pixel_types)
+                  {
+                      if (name.compare(prefix.size(), std::string::npos, type.first) == 0)
+                      {
+                          py::module m = py::reinterpret_borrow<py::module>(module);
+                          type.second(m, type.first);
+                          return m.attr(name.c_str());
+                      }
+                  }
               }
-              im = tmp;
-           },
-           R"doc(
-              Apply a geometric transform
-
-              Args:
-                  s (float): scale
-                  M (CImg) : 3x3 matrix CImg(3,3)
-                  t (CImg) : 1x3 shift vector (CImg(3,1))
-           )doc"
+              throw py::attribute_error("module 'cimg_bindings' has no attribute '" + name + "'");
+          },
+          R"doc(
+             Register the classes of a pixel type on first access.
+          )doc",
+          py::arg("name")
     );
 
-}
-
-PYBIND11_MODULE(cimg_bindings, m)
-{
-    py::options options;
-    options.disable_function_signatures();
-
-    m.doc() = R"doc(
-       Pybind11 bindings for the CImg library.
-    )doc";
-
-    declare<uint8_t>(m, "uint8");
-    declare<uint16_t>(m, "uint16");
-    declare<uint32_t>(m, "uint32");
-    declare<float>(m, "float32");
-    declare<double>(m, "float64");
-
 #ifdef VERSION_INFO
     m.attr("__version__") = MACRO_STRINGIFY(VERSION_INFO);
 #else
@@ -1,4 +1,5 @@
 import os
+import subprocess
 import sys
 
 from pycimg import *
@@ -7,3 +8,10 @@ def get_test_image(ext=None):
     if ext == None:
         return os.path.abspath(os.path.join(os.path.dirname(__file__), './test.jpg'))
     return os.path.abspath(os.path.join(os.path.dirname(__file__), './test.' + ext))
+
+def run_python(code, **env):
+    """ Run code in a new python interpreter importing pycimg from the
+        same path. Keyword arguments set environment variables.
+        Raises CalledProcessError if the code fails. """
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path), **env)
+    subprocess.run([sys.executable, '-c', code], env=env, check=True)
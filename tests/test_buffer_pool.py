@@ -0,0 +1,65 @@
+import sys
+
+import numpy as np
+import pytest
+from context import *
+
+def test_buffer_pool():
+    """ Test reuse of released pixel buffers. """
+    img = CImg(np.random.rand(3, 1, 256, 256).astype(np.float32))
+    expected = img.get_blur(1).asarray()
+    with buffer_pool(64 * 2**20):
+        assert buffer_pool_stats()['max_bytes'] == 64 * 2**20
+        before = buffer_pool_stats()
+        for _ in range(10):
+            res = img.get_blur(1)
+            assert np.array_equal(res.asarray(), expected)
+        stats = buffer_pool_stats()
+        assert stats['hits'] - before['hits'] >= 5
+        assert 0 < stats['bytes_held'] <= 64 * 2**20
+    stats = buffer_pool_stats()
+    assert stats['max_bytes'] == 0
+    assert stats['bytes_held'] == 0 and stats['buffers_held'] == 0
+    with pytest.raises(RuntimeError):
+        set_buffer_pool_size(-1)
+
+def test_buffer_pool_eviction():
+    """ Test eviction of the least recently released buffers. """
+    with buffer_pool(2**20):
+        before = buffer_pool_stats()
+        images = [CImg((512, 512), dtype=uint8) for _ in range(8)]
+        del images
+        stats = buffer_pool_stats()
+        assert stats['buffers_held'] == 4
+        assert stats['bytes_held'] == 2**20
+        assert stats['evictions'] - before['evictions'] == 4
+        # Small buffers are not pooled
+        CImg((10, 10))
+        assert buffer_pool_stats()['buffers_held'] == 4
+        clear_buffer_pool()
+        assert buffer_pool_stats()['bytes_held'] == 0
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='Requires the GNU dynamic loader')
+def test_buffer_pool_module_local():
+    """ Test that new[] and delete[] of the pool are local to the module. """
+    code = '\n'.join([
+        'import ctypes, os, sys',
+        'libstdcxx = ctypes.CDLL("libstdc++.so.6", os.RTLD_GLOBAL)',
+        'sys.setdlopenflags(os.RTLD_NOW | os.RTLD_GLOBAL)',
+        'import pycimg',
+        '# Lookup of new[] in the module finds the operator of libstdc++',
+        'module = ctypes.CDLL(pycimg.cimg_bindings.__file__)',
+        'assert ctypes.cast(module._Znam, ctypes.c_void_p).value == '
+        'ctypes.cast(libstdcxx._Znam, ctypes.c_void_p).value',
+        '# Arrays of other libraries are not allocated by the pool',
+        'libstdcxx._Znam.restype = ctypes.c_void_p',
+        'libstdcxx._ZdaPv.argtypes = [ctypes.c_void_p]',
+        'with pycimg.buffer_pool(2**24):',
+        '    libstdcxx._ZdaPv(libstdcxx._Znam(ctypes.c_size_t(2**20)))',
+        '    assert pycimg.buffer_pool_stats()["buffers_held"] == 0',
+        '    images = [pycimg.CImg((512, 512)) for _ in range(2)]',
+        '    del images',
+        '    pycimg.CImg((512, 512))',
+        '    assert pycimg.buffer_pool_stats()["hits"] >= 1',
+    ])
+    run_python(code)
@@ -47,15 +47,60 @@ def test_size():
 
 def test_dtypes():
     """ Test construction for different data types. """
-    dtypes = [uint8, uint16, uint32, float32, float64]
+    dtypes = [bool_, int8, int16, int32, uint8, uint16, uint32, float32, float64]
     for dtype in dtypes:
         im = CImg((2,3), dtype=dtype)
         assert im.size == 6
+        assert im.asarray().dtype == dtype
+        im = CImg(dtype=np.dtype(dtype).name)
+        assert im.dtype == dtype
 
     with pytest.raises(RuntimeError):
         CImg(dtype=1)
         CImg(dict())
 
+def test_signed_dtypes():
+    """ Test round trip of signed values without casting. """
+    for dtype in [int8, int16, int32]:
+        arr = np.array([[-100, 0, 100], [-1, 1, 2]], dtype=dtype)
+        im = CImg(arr, dtype=dtype)
+        assert im.dtype == dtype
+        assert im.asarray().dtype == dtype
+        assert np.array_equal(im.asarray()[0, 0], arr)
+        assert im[0, 0] == -100
+        assert im.get_abs()[0, 0] == 100
+        im -= 50
+        assert im[2, 0] == 50
+        shared = CImg(arr, copy=False)
+        assert shared.dtype == dtype
+
+def test_bool():
+    """ Test boolean masks. """
+    arr = np.array([[0, 3], [7, 1]], dtype=np.uint8)
+    mask = CImg(arr > 2, dtype=bool_)
+    assert mask.asarray().dtype == np.bool_
+    assert mask.asarray().nbytes == 4
+    assert mask.get_threshold(1).asarray().dtype == np.bool_
+    img = CImg(arr, dtype=uint8)
+    assert np.array_equal(img[mask].asarray().ravel(), [3, 7])
+    img[mask] = 0
+    assert np.array_equal(img.asarray()[0, 0], [[0, 0], [0, 1]])
+
+def test_float16():
+    """ Test half precision images. """
+    arr = np.arange(6).reshape(2, 3) / 4
+    try:
+        im = CImg(arr, dtype=float16)
+    except RuntimeError:
+        pytest.skip("float16 not supported by the compiler")
+    assert im.asarray().dtype == np.float16
+    assert im.asarray().nbytes == 12
+    assert np.array_equal(im.asarray()[0, 0], arr)
+    assert im[1, 0] == 0.25
+    assert np.allclose(im.get_blur(1).asarray(), CImg(arr).blur(1).asarray(), atol=1e-2)
+    im.resize(6, 4)
+    assert im.shape == (1, 1, 4, 6) and im.dtype == float16
+
 def test_from_cimg():
     """ Test construction from other CImg. """
     img_a = CImg(np.array([[1, 2, 3], [4, 5, 6]]))
@@ -65,3 +110,40 @@ def test_from_cimg():
     assert img_a != img_b
 
             
+def test_from_numpy_shared():
+    """ Test construction sharing the memory of a numpy array. """
+    arr = np.zeros((20, 30), dtype=np.uint8)
+    im = CImg(arr, copy=False)
+    assert im.dtype == uint8
+    assert im.shape == (1, 1, 20, 30)
+    im.fill(7)
+    assert np.all(arr == 7)
+    arr[2, 3] = 1
+    assert im[3, 2] == 1
+    with pytest.raises(RuntimeError):
+        im.resize(10, 10)
+
+def test_from_numpy_shared_errors():
+    """ Test errors when memory of a numpy array cannot be shared. """
+    arr = np.zeros((20, 30), dtype=np.float64)
+    with pytest.raises(RuntimeError):
+        CImg(arr, dtype=float32, copy=False)
+    with pytest.raises(RuntimeError):
+        CImg(arr[:, ::2], copy=False)
+    arr.flags.writeable = False
+    with pytest.raises(RuntimeError):
+        CImg(arr, copy=False)
+
+def test_from_numpy_shared_lifetime():
+    """ Test that a shared numpy array is kept alive. """
+    im = CImg(np.full((3, 4, 5), 2.0, dtype=np.float32), copy=False)
+    im.blur(1)
+    assert np.allclose(im.asarray(), 2.0)
+
+def test_from_cimg_shared():
+    """ Test construction sharing the memory of other CImg. """
+    img_a = CImg(np.array([[1, 2, 3], [4, 5, 6]]))
+    img_b = CImg(img_a, copy=False)
+    assert img_b.dtype == img_a.dtype
+    img_b[0,0] = 5
+    assert img_a == img_b
@@ -53,6 +53,43 @@ def test_linear_atXYZC():
     assert img.linear_atXYZC(1.5, 0.5, 0.5, 0.5) == 3.0
 
 
+def test_linear_at():
+    """ Test vectorized linear interpolation. """
+    arr = np.random.rand(2, 3, 10, 12).astype(np.float32)
+    img = CImg(arr)
+    coords = np.random.rand(50, 4) * [11, 9, 2, 1]
+    res = img.linear_at(coords[:, :3])
+    assert res.shape == (50, 2)
+    for (fx, fy, fz, fc), values in zip(coords, res):
+        for c in range(2):
+            assert np.isclose(values[c], img.linear_atXYZ(fx, fy, fz, c))
+    res = img.linear_at(coords)
+    assert res.shape == (50,)
+    for (fx, fy, fz, fc), value in zip(coords, res):
+        assert np.isclose(value, img.linear_atXYZC(fx, fy, fz, fc))
+    res = img.linear_at(coords[:, :2])
+    for (fx, fy, fz, fc), values in zip(coords, res):
+        assert np.isclose(values[1], img.linear_atXY(fx, fy, 0, 1))
+    res = img.linear_at(coords[:, :1])
+    for (fx, fy, fz, fc), values in zip(coords, res):
+        assert np.isclose(values[0], img.linear_atX(fx))
+    with pytest.raises(RuntimeError):
+        img.linear_at(np.zeros((10, 5)))
+
+
+def test_nearest_cubic_at():
+    """ Test vectorized nearest neighbor and cubic interpolation. """
+    arr = np.random.rand(1, 1, 10, 12).astype(np.float32)
+    img = CImg(arr)
+    res = img.nearest_at([[1.2, 3.7], [-5, 2], [20, 20]])
+    assert np.allclose(res[:, 0], [arr[0, 0, 4, 1], arr[0, 0, 2, 0], arr[0, 0, 9, 11]])
+    # Cubic interpolation is exact at pixel positions
+    coords = np.array([[x, y] for y in range(10) for x in range(12)])
+    assert np.allclose(img.cubic_at(coords)[:, 0], arr.ravel())
+    ramp = CImg(np.tile(np.arange(12, dtype=np.float32), (10, 1)))
+    assert np.allclose(ramp.cubic_at([[2.5, 3.0], [7.25, 1.5]])[:, 0], [2.5, 7.25])
+
+
 def test_resize():
    """ Test resize. """
    img = CImg()
@@ -277,3 +314,96 @@ def test_apply_geometric_transform():
    ])) 
    img.apply_geometric_transform(1.0 ,M, t)
    assert img == img_expected
+
+def test_warp_affine():
+   """ Test warp_affine. """
+   arr = np.random.rand(2, 1, 20, 30).astype(np.float32)
+   img = CImg(arr)
+   # Identity and integer shifts are exact for all interpolation types
+   for interpolation in [NEAREST, LINEAR, CUBIC]:
+       res = img.get_warp_affine(np.eye(3), interpolation=interpolation)
+       assert np.allclose(res.asarray(), arr)
+       res = img.get_warp_affine([[1, 0, 3], [0, 1, 2]], interpolation=interpolation, boundary=DIRICHLET)
+       assert np.allclose(res.asarray()[:, :, 2:, 3:], arr[:, :, :-2, :-3])
+       assert np.all(res.asarray()[:, :, :2, :] == 0)
+   # Periodic and mirror boundary conditions
+   for interpolation in [NEAREST, LINEAR, CUBIC]:
+       res = img.get_warp_affine([[1, 0, 5], [0, 1, 0]], interpolation=interpolation, boundary=PERIODIC)
+       assert np.allclose(res.asarray(), np.roll(arr, 5, axis=3))
+   res = img.get_warp_affine([[1, 0, 0.5], [0, 1, 0]], boundary=PERIODIC)
+   assert np.allclose(res.asarray(), (arr + np.roll(arr, 1, axis=3)) / 2)
+   res = img.get_warp_affine([[1, 0, 3], [0, 1, 0]], boundary=MIRROR)
+   padded = np.pad(arr, ((0, 0), (0, 0), (0, 0), (3, 0)), mode='symmetric')
+   assert np.allclose(res.asarray(), padded[:, :, :, :30])
+   # Scaling changes output size
+   res = img.get_warp_affine([[0.5, 0, 0], [0, 0.5, 0]], output_shape=(10, 15))
+   assert res.shape == (2, 1, 10, 15)
+   assert np.allclose(res.asarray(), arr[:, :, ::2, ::2])
+   img.warp_affine(np.eye(3), output_shape=(5, 6))
+   assert img.shape == (2, 1, 5, 6)
+   with pytest.raises(RuntimeError):
+       img.warp_affine(np.zeros((3, 3)))
+   with pytest.raises(RuntimeError):
+       img.warp_affine(np.eye(2))
+
+def test_warp_affine_3d():
+   """ Test warp_affine with 3D and projective transformations. """
+   arr = np.random.rand(1, 8, 10, 12).astype(np.float32)
+   img = CImg(arr)
+   # Swap x and z axes
+   matrix = np.array([[0, 0, 1, 0], [0, 1, 0, 0], [1, 0, 0, 0]])
+   res = img.get_warp_affine(matrix, output_shape=(12, 10, 8), interpolation=NEAREST)
+   assert np.array_equal(res.asarray(), arr.transpose(0, 3, 2, 1))
+   # Projective matrix with scaled homogeneous coordinates
+   res = img.get_warp_affine(2 * np.eye(4))
+   assert np.allclose(res.asarray(), arr)
+
+def test_warp():
+   """ Test warp against per-pixel linear_atXY. """
+   arr = np.random.rand(2, 1, 12, 16).astype(np.float32)
+   img = CImg(arr)
+   offsets = (np.random.rand(2, 1, 12, 16) * 4 - 2).astype(np.float32)
+   y, x = np.mgrid[0:12, 0:16]
+   coords = offsets + np.stack([x, y])[:, None].astype(np.float32)
+   expected = np.empty_like(arr)
+   for c in range(2):
+       for j in range(12):
+           for i in range(16):
+               expected[c, 0, j, i] = img.linear_atXY(coords[0, 0, j, i], coords[1, 0, j, i], 0, c)
+   res = img.get_warp(coords, mode=BACKWARD_ABSOLUTE, boundary=NEUMANN)
+   assert np.allclose(res.asarray(), expected, atol=1e-5)
+   res = img.get_warp(-offsets, mode=BACKWARD_RELATIVE, boundary=NEUMANN)
+   assert np.allclose(res.asarray(), expected, atol=1e-5)
+   # CImg, float64 and non-contiguous fields
+   res = img.get_warp(CImg(coords), boundary=NEUMANN)
+   assert np.allclose(res.asarray(), expected, atol=1e-5)
+   res = img.get_warp(coords.astype(np.float64), boundary=NEUMANN)
+   assert np.allclose(res.asarray(), expected, atol=1e-5)
+   res = img.get_warp(np.asfortranarray(coords), boundary=NEUMANN)
+   assert np.allclose(res.asarray(), expected, atol=1e-5)
+   # Nearest interpolation of integer coordinates is exact
+   shifted = np.stack([x - 1, y])[:, None].astype(np.float32)
+   res = img.get_warp(shifted, interpolation=NEAREST, boundary=DIRICHLET)
+   assert np.array_equal(res.asarray()[:, :, :, 1:], arr[:, :, :, :-1])
+   assert np.all(res.asarray()[:, :, :, 0] == 0)
+   img.warp(-offsets, mode=BACKWARD_RELATIVE, boundary=NEUMANN)
+   assert np.allclose(img.asarray(), expected, atol=1e-5)
+   with pytest.raises(RuntimeError):
+       img.warp(np.zeros((4, 1, 12, 16), np.float32))
+   with pytest.raises(RuntimeError):
+       img.warp(offsets, interpolation=LANCZOS)
+
+def test_warp_3d():
+   """ Test warp of volumes against per-pixel linear_atXYZ. """
+   arr = np.random.rand(1, 6, 7, 8).astype(np.float32)
+   img = CImg(arr)
+   offsets = (np.random.rand(3, 6, 7, 8) * 2 - 1).astype(np.float32)
+   z, y, x = np.mgrid[0:6, 0:7, 0:8]
+   coords = offsets + np.stack([x, y, z])
+   expected = np.empty_like(arr)
+   for k in range(6):
+       for j in range(7):
+           for i in range(8):
+               expected[0, k, j, i] = img.linear_atXYZ(*coords[:, k, j, i], 0)
+   res = img.get_warp(-offsets, mode=BACKWARD_RELATIVE, boundary=NEUMANN)
+   assert np.allclose(res.asarray(), expected, atol=1e-5)
@@ -0,0 +1,27 @@
+import pytest
+from context import *
+
+def test_lazy_import():
+    """ Test that pixel types and the tiled module are loaded on first use. """
+    code = '\n'.join([
+        'import sys, pycimg',
+        'bindings = vars(pycimg.cimg_bindings)',
+        'assert "CImg_int16" not in bindings and "Pipeline_int16" not in bindings',
+        'assert "pycimg.tiled" not in sys.modules',
+        'img = pycimg.CImg((2, 3), dtype=pycimg.int16)',
+        'assert "CImg_int16" in bindings and "Pipeline_int16" in bindings',
+        'assert pycimg.tiled.apply',
+    ])
+    run_python(code)
+
+def test_pixel_types():
+    """ Test access of the native classes. """
+    from pycimg import cimg_bindings
+    assert 'float32' in cimg_bindings.pixel_types
+    for name in cimg_bindings.pixel_types:
+        assert getattr(cimg_bindings, 'CImg_' + name).__name__ == 'CImg_' + name
+        assert getattr(cimg_bindings, 'Pipeline_' + name).__name__ == 'Pipeline_' + name
+    with pytest.raises(AttributeError):
+        cimg_bindings.CImg_complex64
+    with pytest.raises(AttributeError):
+        cimg_bindings.CImg_float
@@ -105,4 +105,203 @@ def test_save_load():
     im2 = CImg()
     im2.load(filename)
     assert np.allclose(im2.asarray(), im.asarray())
-    os.remove(filename)
\ No newline at end of file
+    os.remove(filename)
+
+def test_frombytes():
+    """ Test decoding images from memory. """
+    for ext in ['jpg', 'png', 'bmp']:
+        with open(get_test_image(ext), 'rb') as f:
+            data = f.read()
+        expected = CImg(get_test_image(ext))
+        for buf in [data, bytearray(data), memoryview(data)]:
+            img = CImg.frombytes(buf)
+            _check_image_dimensions(img)
+            assert img == expected
+        img = CImg.frombytes(data, format=ext, dtype=uint8)
+        assert img.dtype == uint8
+        _check_image_dimensions(img)
+
+def test_frombytes_cimg():
+    """ Test decoding a .cimg image from memory. """
+    arr = np.random.rand(3, 2, 50, 30).astype(np.float32)
+    filename = _get_testfilename() + '.cimg'
+    CImg(arr).save(filename)
+    with open(filename, 'rb') as f:
+        data = f.read()
+    os.remove(filename)
+    assert np.array_equal(CImg.frombytes(data).asarray(), arr)
+
+def test_frombytes_tiff():
+    """ Test decoding a TIFF image from memory. """
+    with open(get_test_image('tiff'), 'rb') as f:
+        img = CImg.frombytes(f.read())
+    _check_image_dimensions(img)
+
+def test_frombytes_errors():
+    """ Test decoding invalid data. """
+    with pytest.raises(RuntimeError):
+        CImg.frombytes(b'')
+    with pytest.raises(RuntimeError):
+        CImg.frombytes(b'no image data')
+    with pytest.raises(RuntimeError):
+        CImg.frombytes(b'no image data', format='gif')
+    with pytest.raises(RuntimeError):
+        CImg.frombytes(np.zeros((10, 10), dtype=np.uint8)[:, ::2])
+
+def test_load_fileobj():
+    """ Test loading images from file-like objects. """
+    import io
+    with open(get_test_image('png'), 'rb') as f:
+        img = CImg()
+        img.load(f)
+        _check_image_dimensions(img)
+        data = img.asarray(copy=True)
+    img = CImg()
+    with open(get_test_image('png'), 'rb') as f:
+        img.load(io.BytesIO(f.read()), format='png')
+    assert np.array_equal(img.asarray(), data)
+
+def test_tobytes():
+    """ Test encoding images into memory. """
+    img = CImg(get_test_image('png'), dtype=uint8)
+    for fmt in ['png', 'bmp', 'cimg']:
+        data = img.tobytes(fmt)
+        assert isinstance(data, memoryview)
+        assert CImg.frombytes(data, dtype=uint8) == img
+    data = img.tobytes('jpeg', quality=80)
+    assert bytes(data[:3]) == b'\xff\xd8\xff'
+    _check_image_dimensions(CImg.frombytes(data))
+    assert len(img.tobytes('jpg', quality=10)) < len(data)
+
+def test_tobytes_tiff():
+    """ Test encoding a TIFF image into memory. """
+    img = CImg(get_test_image('png'), dtype=uint8)
+    data = img.tobytes('tiff', compression_type=C_LZW)
+    assert CImg.frombytes(data, dtype=uint8) == img
+
+def test_tobytes_errors():
+    """ Test encoding into unsupported formats. """
+    img = CImg((10, 10))
+    with pytest.raises(RuntimeError):
+        img.tobytes('gif')
+
+def test_save_fileobj():
+    """ Test saving images to file-like objects. """
+    import io
+    img = CImg(get_test_image('png'), dtype=uint8)
+    f = io.BytesIO()
+    img.save(f, format='png')
+    assert CImg.frombytes(f.getvalue(), dtype=uint8) == img
+    with pytest.raises(RuntimeError):
+        img.save(io.BytesIO())
+    with pytest.raises(RuntimeError):
+        img.save(io.BytesIO(), 1, format='png')
+    filename = _get_testfilename() + '.bmp'
+    with open(filename, 'wb') as f:
+        img.save(f)
+    assert CImg(filename, dtype=uint8) == img
+    os.remove(filename)
+
+def test_load_many():
+    """ Test loading images concurrently. """
+    paths = [get_test_image(ext) for ext in ['jpg', 'png', 'bmp']] * 3
+    images = load_many(paths, workers=4)
+    assert len(images) == len(paths)
+    for path, img in zip(paths, images):
+        assert img == CImg(path)
+    images = load_many(paths, dtype=uint8, workers=1)
+    assert all(img.dtype == uint8 for img in images)
+    assert load_many([]) == []
+
+def test_load_many_stack():
+    """ Test loading images into one stacked array. """
+    paths = [get_test_image(ext) for ext in ['png', 'bmp']]
+    arr = load_many(paths, dtype=uint8, stack=True)
+    assert arr.shape == (2, 3, 1, 797, 1200)
+    assert arr.dtype == np.uint8
+    assert np.array_equal(arr[0], CImg(paths[0], dtype=uint8).asarray())
+    with pytest.raises(RuntimeError):
+        load_many([get_test_image(), 'notexistent.jpg'])
+
+def _save_tiff_stack(frames):
+    filename = _get_testfilename() + '.tiff'
+    CImg(np.random.randint(0, 255, (3, frames, 40, 30)), dtype=uint8).save_tiff(filename)
+    return filename
+
+def test_iter_tiff_frames():
+    """ Test iterating over the frames of a TIFF file. """
+    filename = _save_tiff_stack(5)
+    expected = CImg(filename, dtype=uint8).asarray()
+    frames = list(CImg.iter_tiff_frames(filename, dtype=uint8))
+    assert len(frames) == 5
+    for z, img in enumerate(frames):
+        assert img.shape == (3, 1, 40, 30)
+        assert np.array_equal(img.asarray()[:, 0], expected[:, z])
+    batches = list(CImg.iter_tiff_frames(filename, batch=2))
+    assert [img.depth for img in batches] == [2, 2, 1]
+    assert np.array_equal(np.concatenate([img.asarray() for img in batches], axis=1), expected)
+    os.remove(filename)
+    with pytest.raises(RuntimeError):
+        next(CImg.iter_tiff_frames('notexistent.tiff'))
+
+def test_tiff_info():
+    """ Test reading TIFF file information. """
+    info = tiff_info(get_test_image('tiff'))
+    assert info['frames'] == 1
+    assert (info['width'], info['height'], info['spectrum']) == (1200, 797, 3)
+    assert info['dtype'] == 'uint8'
+    filename = _save_tiff_stack(4)
+    assert tiff_info(filename)['frames'] == 4
+    os.remove(filename)
+
+def test_open_memmap():
+    """ Test memory-mapping a .cimg file. """
+    arr = np.random.rand(2, 3, 40, 30).astype(np.float32)
+    filename = _get_testfilename() + '.cimg'
+    CImg(arr).save(filename)
+    img = CImg.open_memmap(filename)
+    assert img.dtype == float32
+    assert np.array_equal(img.asarray(), arr)
+    assert np.array_equal(img.get_crop(1, 2, 0, 0, 10, 20, 2, 1).asarray(), arr[:, :, 2:21, 1:11])
+    # Changes in read-only mode are not written to the file
+    img.fill(0)
+    assert np.array_equal(CImg(filename).asarray(), arr)
+    del img
+    img = CImg.open_memmap(filename, mode='r+')
+    img.fill(1)
+    del img
+    assert np.all(CImg(filename).asarray() == 1)
+    os.remove(filename)
+
+def test_open_memmap_raw():
+    """ Test memory-mapping a raw file. """
+    arr = np.random.randint(0, 255, (3, 40, 30)).astype(np.uint8)
+    filename = _get_testfilename() + '.raw'
+    with open(filename, 'wb') as f:
+        f.write(b'header')
+        arr.tofile(f)
+    img = CImg.open_memmap(filename, shape=arr.shape, dtype=uint8, offset=6)
+    assert img.shape == (1, 3, 40, 30)
+    assert np.array_equal(img.asarray()[0], arr)
+    del img
+    os.remove(filename)
+
+def test_open_memmap_errors():
+    """ Test memory-mapping unsupported files. """
+    filename = _get_testfilename() + '.cimg'
+    with open(filename, 'wb') as f:
+        CImg(np.random.rand(10, 10)).save(f, is_compressed=True)
+    with pytest.raises(RuntimeError):
+        CImg.open_memmap(filename)
+    with pytest.raises(RuntimeError):
+        CImg.open_memmap(get_test_image())
+    with pytest.raises(RuntimeError):
+        CImg.open_memmap(filename, mode='w')
+    os.remove(filename)
+
+def test_display_unavailable():
+    """ Test display of images without display support. """
+    if has_display:
+        pytest.skip("pycimg was built with display support")
+    with pytest.raises(RuntimeError, match='display support'):
+        CImg((2, 2)).display()
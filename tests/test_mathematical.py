@@ -1,6 +1,7 @@
 from context import * 
 import numpy as np
 import math
+import pytest
 
 def test_sqr():
     arr = np.random.randn(10, 5)
@@ -155,6 +156,65 @@ def test_variance_mean():
     img = CImg(np.array([[2, -5], [0, 3]]))
     assert img.variance_mean() == (38.0/3.0, 0)
 
+def test_stats():
+    """ Test stats of whole image. """
+    img = CImg(np.array([[2, -5], [0, 3]]))
+    stats = img.stats()
+    assert stats['min'] == -5 and stats['max'] == 3
+    assert stats['mean'] == 0 and stats['sum'] == 0 and stats['product'] == 0
+    assert stats['variance'] == img.variance()
+    assert stats['std'] == pytest.approx(np.sqrt(38.0/3.0))
+    assert stats['argmin'].tolist() == [1, 0, 0, 0]
+    assert stats['argmax'].tolist() == [1, 1, 0, 0]
+    assert img.stats(['variance'], variance_method=SECOND_MOMENT) == {'variance': 9.5}
+    assert img.stats('min') == {'min': -5}
+    with pytest.raises(RuntimeError):
+        img.stats(['median'])
+    with pytest.raises(RuntimeError):
+        img.stats(['mean', 'mean'])
+    with pytest.raises(RuntimeError):
+        img.stats(axes='x')
+    with pytest.raises(RuntimeError):
+        img.stats(variance_method=LEAST_MEDIAN_SQ)
+    with pytest.raises(RuntimeError):
+        CImg().stats()
+
+def test_stats_axes():
+    """ Test stats per channel and per slice. """
+    a = np.random.default_rng(0).integers(0, 1000, (3, 4, 300, 500)).astype(np.float32)
+    img = CImg(a)
+    stats = img.stats(axes='c')
+    assert np.array_equal(stats['min'], a.min(axis=(1, 2, 3)))
+    assert np.array_equal(stats['max'], a.max(axis=(1, 2, 3)))
+    assert np.allclose(stats['mean'], a.mean(axis=(1, 2, 3), dtype=np.float64))
+    assert np.allclose(stats['variance'], a.var(axis=(1, 2, 3), ddof=1, dtype=np.float64))
+    assert stats['argmin'].shape == (3, 4)
+    for c, (x, y, z, c2) in enumerate(stats['argmax']):
+        assert c2 == c and a[c, z, y, x] == a[c].max()
+        assert np.argmax(a[c]) == np.ravel_multi_index((z, y, x), a.shape[1:])
+    stats = img.stats(['mean', 'argmin'], axes='z')
+    assert set(stats) == {'mean', 'argmin'}
+    assert np.allclose(stats['mean'], a.mean(axis=(0, 2, 3), dtype=np.float64))
+    assert np.array_equal(stats['argmin'][:, 2], np.arange(4))
+    stats = img.stats(axes='zc')
+    assert stats['std'].shape == (3, 4)
+    assert np.allclose(stats['std'], a.std(axis=(2, 3), ddof=1, dtype=np.float64))
+    assert np.allclose(stats['sum'], a.sum(axis=(2, 3), dtype=np.float64))
+    # The result does not depend on the number of threads
+    with threads(1):
+        single = img.stats(axes='zc')
+    for name in stats:
+        assert np.array_equal(stats[name], single[name], equal_nan=True)
+
+def test_stats_offset():
+    """ Test stats of values with a large offset. """
+    a = 1e8 + np.random.default_rng(0).random((3, 1, 300, 500))
+    img = CImg(a, dtype=float64)
+    stats = img.stats(['mean', 'variance'], axes='c')
+    assert np.allclose(stats['mean'], a.mean(axis=(1, 2, 3)), rtol=0, atol=1e-6)
+    assert np.allclose(stats['variance'], a.var(axis=(1, 2, 3), ddof=1), rtol=1e-6)
+    assert img.stats('variance')['variance'] == pytest.approx(a.var(ddof=1), rel=1e-6)
+
 def test_variance_noise():
     """ Test variance noise. """
     pass
@@ -68,6 +68,17 @@ def test_setitem():
                                   [5, 6, 0, 8], 
                                   [9, 10, 11, 12]]))
     assert img == img_expected
+    # Values out of the range of integer pixel types
+    img = CImg(np.zeros((3, 4)), dtype=uint8)
+    img[1, 1] = 255
+    assert img[1, 1] == 255
+    with pytest.raises(OverflowError):
+        img[0, 0] = 300
+    with pytest.raises(OverflowError):
+        img[0, 0] = float('nan')
+    with pytest.raises(OverflowError):
+        CImg(np.zeros((3, 4)), dtype=uint32)[0, 0] = -1
+    assert img[0, 0] == 0
 
     # 3. Mixed integers / slices 
     img = CImg(np.array([[1, 2, 3, 4],
@@ -79,6 +90,74 @@ def test_setitem():
                          [9, 10, 11, 12]]))
     assert img == img_expected
 
+def test_getitem_view():
+    """ Test that contiguous regions share the image memory if requested. """
+    arr = np.arange(2 * 3 * 4 * 5).reshape(2, 3, 4, 5)
+    img = CImg(arr, dtype=uint16)
+    rows = img.get((slice(None), slice(1, 3), 2, 1), copy=False)
+    assert rows.dtype == uint16
+    assert np.array_equal(rows.asarray()[0, 0], arr[1, 2, 1:3])
+    rows[0, 0] = 1000
+    assert img[0, 1, 2, 1] == 1000
+    channel = img.get((slice(None), slice(None), slice(None), -1), copy=False)
+    assert channel.shape == (1, 3, 4, 5)
+    channel.fill(7)
+    assert np.all(img.asarray()[1] == 7)
+    # Indexing copies by default
+    copied = img[:, 0, 0, 0]
+    copied[0] = 1
+    assert img[0, 0, 0, 0] == 0
+    row = img[:, 1]
+    img.resize(10, 10)
+    assert np.array_equal(row.asarray()[0, 0, 0], arr[0, 0, 1])
+    # Regions not contiguous in memory are copied
+    img = CImg(arr, dtype=uint16)
+    cols = img.get((slice(1, 3), slice(None), 0, 0), copy=False)
+    assert np.array_equal(cols.asarray()[0, 0], arr[0, 0, :, 1:3])
+    cols.fill(5)
+    assert img[1, 0, 0, 0] == 1
+
+def test_getitem_pixel():
+    """ Test pixel access. """
+    img = CImg(np.arange(12).reshape(3, 4), dtype=uint8)
+    assert img[3, 2] == 11
+    assert img[-1, -1] == 11
+    assert img.get((1,)) == 1
+    assert img.at(2, 1) == 6
+    img[-2, 0] = 100
+    assert img[2, 0] == 100
+    img.set_at(50, 0, 1)
+    assert img[0, 1] == 50
+    with pytest.raises(IndexError):
+        img[4, 0]
+    with pytest.raises(IndexError):
+        img[0, -4] = 1
+    with pytest.raises(IndexError):
+        img[0, 0, 0, 0, 0]
+    with pytest.raises(IndexError):
+        img['x']
+
+def test_getitem_fancy():
+    """ Test integer and boolean array indexing. """
+    arr = np.random.rand(3, 4, 5).astype(np.float32)
+    img = CImg(arr)
+    res = img[[0, 2, 4]]
+    assert np.array_equal(res.asarray(), arr[None, :, :, [0, 2, 4]])
+    res = img[:, np.array([1, 3])]
+    assert np.array_equal(res.asarray(), arr[None, :, [1, 3], :])
+    mask = arr > 0.5
+    res = img[mask]
+    assert res.dtype == float32
+    assert np.array_equal(res.asarray().ravel(), arr[mask])
+    res = img[mask.reshape(1, 3, 4, 5)]
+    assert np.array_equal(res.asarray().ravel(), arr[mask])
+    img[mask] = 0
+    assert np.all(img.asarray()[0][mask] == 0)
+    img[[0, 1], 0, 0] = 2
+    assert img[0, 0, 0] == 2 and img[1, 0, 0] == 2
+    with pytest.raises(IndexError):
+        img[np.ones(3, dtype=bool)]
+
 def test_neq():
     """ Test __neq__. """
     a = CImg(np.array([[1, 2, 3],
@@ -104,6 +183,114 @@ def test_getattr():
     with pytest.raises(AttributeError):
         im.nonexistent()
 
+def test_native_methods():
+    """ Test methods of the native images defined on CImg. """
+    assert 'blur' in vars(CImg) and 'get_blur' in vars(CImg)
+    assert CImg.blur.__name__ == 'blur'
+    assert 'Blur image' in CImg.blur.__doc__
+    for dtype in [int8, int16, int32, uint8, uint16, uint32, float32, float64]:
+        img = CImg(np.arange(12).reshape(3, 4), dtype=dtype)
+        assert img.mirror('x') is img
+        assert img[0, 0] == 3
+        res = img.get_crop(1, 0, 0, 0, 2, 2, 0, 0)
+        assert type(res) is CImg and res.dtype == dtype
+        assert res.shape == (1, 1, 3, 2)
+        assert img.linear_atXY(0.5, 0) == 2.5
+        # CImg arguments are unwrapped
+        assert img.get_add(img)[0, 0] == 6
+
+def test_out():
+    """ Test writing results of get_* methods into existing images and arrays. """
+    img = CImg(np.random.randint(0, 255, (1, 1, 60, 80)), dtype=uint8)
+    kernel = CImg(np.ones((3, 3)), dtype=uint8)
+    calls = [
+        ('get_resize', (40, 30), {}),
+        ('get_crop', (10, 5, 0, 0, 49, 34, 0, 0), {}),
+        ('get_convolve', (kernel,), {}),
+        ('get_correlate', (kernel,), {}),
+        ('get_blur_median', (3,), {}),
+        ('get_histogram', (16, 0, 255), {}),
+        ('get_label', (), {'is_high_connectivity': True}),
+    ]
+    for name, args, kwargs in calls:
+        expected = getattr(img, name)(*args, **kwargs).asarray()
+        out = CImg(expected.shape[::-1], dtype=uint8)
+        view = out.asarray()
+        assert getattr(img, name)(*args, out=out, **kwargs) is out
+        assert np.array_equal(view, expected)
+        arr = np.zeros(expected.shape[2:], dtype=np.uint8)
+        assert getattr(img, name)(*args, out=arr, **kwargs) is arr
+        assert np.array_equal(arr, expected[0, 0])
+    out = np.zeros((30, 40), dtype=np.uint8)
+    img.get_resize(40, 30, out=out, num_threads=1)
+    with pytest.raises(RuntimeError):
+        img.get_resize(41, 30, out=out)
+    with pytest.raises(RuntimeError):
+        img.get_resize(40, 30, out=np.zeros((30, 40), dtype=np.float32))
+    with pytest.raises(RuntimeError):
+        img.get_resize(40, 30, out=[0] * 1200)
+    assert 'out:' in CImg.get_resize.__doc__
+
+def test_out_native():
+    """ Test get_* methods writing into out without a new image. """
+    img = CImg(np.random.randint(1, 100, (3, 2, 20, 30)), dtype=float32)
+    other = CImg(np.random.randint(1, 100, (3, 2, 20, 30)), dtype=float32)
+    calls = [
+        ('get_sqrt', (), {}),
+        ('get_add', (other,), {}),
+        ('get_mul', (2,), {}),
+        ('get_normalize', (0, 1), {}),
+        ('get_threshold', (50,), {}),
+        ('get_mirror', ('xy',), {}),
+        ('get_cumulate', ('y',), {}),
+        ('get_blur', (1.5,), {}),
+        ('get_vanvliet', (2, 1, 'x'), {}),
+        ('get_crop', (5, 3, 0, 0, 24, 17, 1, 2), {}),
+    ]
+    for bc in range(4):
+        calls.append(('get_crop', (-5, 3, -1, 1, 34, 25, 1, 2, bc), {}))
+    for name, args, kwargs in calls:
+        expected = getattr(img, name)(*args, **kwargs).asarray()
+        out = CImg(expected.shape[::-1], dtype=float32)
+        view = out.asarray()
+        assert getattr(img, name)(*args, out=out, **kwargs) is out
+        assert np.array_equal(view, expected), name
+        arr = np.zeros(expected.shape, dtype=np.float32)
+        with profile() as prof:
+            assert getattr(img, name)(*args, out=arr, **kwargs) is arr
+        assert np.array_equal(arr, expected), name
+        # No new image is allocated
+        assert prof.stats()[name]['bytes_allocated'] == 0
+    # Outputs sharing memory with the image
+    for bc in range(4):
+        arr = np.arange(2 * 4 * 11, dtype=np.float32).reshape(2, 4, 11)
+        src = CImg(arr, copy=False)
+        expected = src.get_crop(1, 0, 0, 0, 11, 3, 1, 0, bc).asarray()
+        assert src.get_crop(1, 0, 0, 0, 11, 3, 1, 0, bc, out=arr) is arr
+        assert np.array_equal(arr, expected[0])
+    arr = np.arange(12, dtype=np.float32).reshape(3, 4)
+    src = CImg(arr, copy=False)
+    src.get_crop(0, 0, 0, 0, 3, 1, 0, 0, out=arr[1:])
+    assert np.array_equal(arr, [[0, 1, 2, 3], [0, 1, 2, 3], [4, 5, 6, 7]])
+    # Native cropping into overlapping memory
+    arr = np.arange(12, dtype=np.float32).reshape(3, 4)
+    src = CImg(arr, copy=False)
+    src._cimg._crop_into(CImg(arr[1:], copy=False)._cimg, 1, 0, 0, 0, 4, 1, 0, 0, 1)
+    assert np.array_equal(arr, [[0, 1, 2, 3], [1, 2, 3, 3], [5, 6, 7, 7]])
+    img2 = CImg(img)
+    img2.get_mirror('x', out=img2)
+    assert np.array_equal(img2.asarray(), img.get_mirror('x').asarray())
+    # Outputs sharing memory with an argument and non-contiguous outputs
+    expected = img.get_add(other).asarray()
+    assert np.array_equal(img.get_add(other, out=other).asarray(), expected)
+    arr = np.zeros((3, 2, 20, 60), dtype=np.float32)
+    img.get_sqrt(out=arr[..., ::2])
+    assert np.array_equal(arr[..., ::2], img.get_sqrt().asarray())
+    with pytest.raises(RuntimeError):
+        img.get_sqrt(out=np.zeros((3, 2, 20, 31), dtype=np.float32))
+    with pytest.raises(RuntimeError):
+        img.get_crop(0, 0, 0, 0, 9, 9, 0, 0, out=np.zeros((10, 11), dtype=np.float32))
+
 def test_str():
     """ Test __str__."""
     a = CImg((2, 2))
@@ -322,3 +509,68 @@ def test_ifloordiv():
                                   [2, 2, 3]]))
     img //= 2
     assert img == img_expected
+
+def test_arithmetic_dtype():
+    """ Test that arithmetic operators keep the data type. """
+    a = CImg(np.array([[1, 2, 3],
+                       [4, 5, 6]]), dtype=uint8)
+    b = CImg(np.array([[1, 1, 1],
+                       [2, 3, 2]]), dtype=uint8)
+    for img in [a + b, a - b, a * b, a // b, a + 2, a * 2, a // 2]:
+        assert img.dtype == uint8
+    img = a // b
+    assert np.array_equal(img.asarray().squeeze(), [[1, 2, 3], [2, 1, 3]])
+    a += 1
+    assert a.dtype == uint8
+    assert np.array_equal(a.asarray().squeeze(), [[2, 3, 4], [5, 6, 7]])
+
+def test_arithmetic_range():
+    """ Test results of integer arithmetic out of the range of the data type. """
+    a = CImg(np.array([[0, 100, 200]]), dtype=uint8)
+    assert np.array_equal((a * 2.7).asarray().squeeze(), [0, 255, 255])
+    assert np.array_equal((a - 150).asarray().squeeze(), [0, 0, 50])
+    b = CImg(np.array([[0, 0, 0]]), dtype=uint8)
+    assert np.array_equal((a - a.get_mul(2)).asarray().squeeze(), [0, 0, 0])
+    # Integer division by zero gives 0
+    assert np.array_equal((a // b).asarray().squeeze(), [0, 0, 0])
+    i = CImg(np.array([[-7, 0, 7]]), dtype=int32)
+    assert np.array_equal((i // 0).asarray().squeeze(), [0, 0, 0])
+    assert np.array_equal(i.get_div(0).asarray().squeeze(), [0, 0, 0])
+    assert np.array_equal((i * 1e10).asarray().squeeze(), [-2**31, 0, 2**31 - 1])
+    assert np.array_equal((i * float('nan')).asarray().squeeze(), [0, 0, 0])
+    f = CImg(np.array([[-1, 0, 1]]), dtype=float32)
+    assert np.array_equal((f // 0).asarray().squeeze(), [-np.inf, np.nan, np.inf], equal_nan=True)
+
+def test_arithmetic_broadcast():
+    """ Test arithmetic with operands not supported natively. """
+    a = CImg(np.ones((2, 3)))
+    b = CImg(np.ones((1, 3)))
+    img = a + b
+    assert img.shape == a.shape
+    assert np.all(img.asarray() == 2)
+    img = a * np.array([1, 2, 3])
+    assert np.array_equal(img.asarray().squeeze(), [[1, 2, 3], [1, 2, 3]])
+
+def test_get_variants():
+    """ Test that get_* methods return a new image. """
+    arr = np.random.rand(3, 1, 40, 50).astype(np.float32)
+    img = CImg(arr)
+    kernel = CImg(np.ones((3, 3)), dtype=float32)
+    calls = [('resize', (20, 10)),
+             ('crop', (1, 2, 0, 0, 30, 20, 0, 2)),
+             ('rotate', (30,)),
+             ('mirror', ('x',)),
+             ('blur', (2,)),
+             ('threshold', (0.5,)),
+             ('normalize', (0, 255)),
+             ('convolve', (kernel,)),
+             ('histogram', (10, 0, 1)),
+             ('sqrt', ())]
+    for name, args in calls:
+        res = getattr(img, 'get_' + name)(*args)
+        expected = getattr(CImg(img), name)(*args)
+        assert type(res).__name__ == 'CImg'
+        assert res.dtype == img.dtype
+        assert res.shape == expected.shape
+        assert np.allclose(res.asarray(), expected.asarray())
+        assert np.array_equal(img.asarray(), arr)
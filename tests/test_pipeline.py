@@ -0,0 +1,76 @@
+import numpy as np
+import pytest
+from context import *
+
+def _reference(img):
+    return CImg(img, dtype=img.dtype).resize(60, 40).blur(1.5).normalize(0, 255).threshold(128)
+
+def test_run():
+    """ Test that a pipeline matches the chained operations. """
+    img = CImg(np.random.rand(3, 1, 90, 120).astype(np.float32))
+    expected = _reference(img)
+    p = Pipeline([('resize', 60, 40), ('blur', 1.5), ('normalize', 0, 255), ('threshold', 128)])
+    assert len(p) == 4
+    res = p.run(img)
+    assert res.shape == (3, 1, 40, 60)
+    assert np.array_equal(res.asarray(), expected.asarray())
+    # The input is not modified unless inplace is True
+    assert img.shape == (3, 1, 90, 120)
+    out = np.empty((3, 1, 40, 60), dtype=np.float32)
+    assert p.run(img, out=out) is out
+    assert np.array_equal(out, expected.asarray())
+    assert p.run(img, inplace=True) is img
+    assert np.array_equal(img.asarray(), expected.asarray())
+
+def test_chaining():
+    """ Test pipelines built by chaining operations. """
+    arr = np.random.rand(50, 70).astype(np.float32)
+    p = Pipeline().mirror('x').blur(2, is_gaussian=True).sqr().mul(3).add(1)
+    expected = CImg(arr).mirror('x').blur(2, is_gaussian=True).sqr()
+    expected = expected.asarray() * 3 + 1
+    assert np.allclose(p.run(arr).asarray(), expected)
+    p = Pipeline(['abs', ('round', 1, {'rounding_type': R_FORWARD})])
+    assert np.array_equal(p.run(arr).asarray()[0, 0], np.ceil(arr))
+
+def test_dtypes():
+    """ Test pipelines on images of several data types. """
+    p = Pipeline([('resize_halfXY',), ('cut', 10, 200)])
+    for dtype in [int16, int32, uint8, uint16, uint32, float32, float64]:
+        img = CImg(np.random.randint(0, 255, (1, 1, 40, 60)), dtype=dtype)
+        expected = CImg(img, dtype=dtype).resize_halfXY().cut(10, 200)
+        res = p.run(img)
+        assert res.dtype == dtype
+        assert np.array_equal(res.asarray(), expected.asarray())
+    # Values are converted to the data type of the image
+    img = CImg(np.random.randint(0, 255, (1, 1, 40, 60)), dtype=uint8)
+    res = Pipeline([('threshold', 0.5)]).run(img)
+    assert np.array_equal(res.asarray(), CImg(img, dtype=uint8).threshold(0).asarray())
+    res = Pipeline([('normalize', -10, 300)]).run(img)
+    assert np.array_equal(res.asarray(), CImg(img, dtype=uint8).normalize(0, 255).asarray())
+
+def test_map():
+    """ Test concurrent processing of a batch. """
+    images = [CImg(np.random.rand(1, 1, 80, 100).astype(np.float32)) for _ in range(6)]
+    images.append(CImg(np.random.randint(0, 255, (1, 1, 80, 100)), dtype=uint8))
+    p = Pipeline([('resize', 60, 40), ('blur', 1.5), ('normalize', 0, 255), ('threshold', 128)])
+    results = p.map(images, workers=3)
+    assert len(results) == len(images)
+    for img, res in zip(images, results):
+        assert res.dtype == img.dtype
+        assert np.array_equal(res.asarray(), _reference(img).asarray())
+    assert p.map([]) == []
+
+def test_errors():
+    """ Test validation of operations. """
+    with pytest.raises(RuntimeError):
+        Pipeline(['unknown'])
+    with pytest.raises(RuntimeError):
+        Pipeline(['map'])
+    with pytest.raises(TypeError):
+        Pipeline().blur('x')
+    p = Pipeline().blur(1)
+    with pytest.raises(TypeError):
+        p.resize(1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11)
+    assert len(p) == 1
+    with pytest.raises(RuntimeError):
+        p.run(np.zeros((10, 10), dtype=np.float32), inplace=True)
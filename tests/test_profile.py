@@ -0,0 +1,63 @@
+import json
+
+import numpy as np
+import pytest
+from context import *
+
+def test_profile():
+    """ Test statistics of profiled methods. """
+    img = CImg(np.random.rand(3, 1, 200, 300).astype(np.float32))
+    with profile() as prof:
+        img.blur(2)
+        img.get_blur(2)
+        img.blur(2, num_threads=1)
+        res = img.get_resize(100, 50)
+        img.resize(150, 100)
+        img.fill(0)
+        img.min_max()
+    stats = prof.stats()
+    assert set(stats) == {'blur', 'get_blur', 'get_resize', 'resize', 'fill', 'min_max'}
+    blur = stats['blur']
+    assert blur['calls'] == 2
+    assert blur['inputs'] == {((3, 1, 200, 300), 'float32'): 2}
+    assert 0 < blur['gil_released_time'] <= blur['wall_time']
+    assert blur['cpu_time'] > 0
+    assert blur['bytes_allocated'] == 0
+    assert stats['get_blur']['bytes_allocated'] == 3 * 200 * 300 * 4
+    assert stats['get_resize']['bytes_allocated'] == res.asarray().nbytes
+    assert stats['resize']['bytes_allocated'] == 3 * 100 * 150 * 4
+    assert stats['fill']['bytes_allocated'] == 0
+    assert stats['fill']['inputs'] == {((3, 1, 100, 150), 'float32'): 1}
+    # Methods are not recorded after the context
+    img.blur(2)
+    assert prof.stats()['blur']['calls'] == 2
+
+def test_profile_trace(tmp_path):
+    """ Test export of the calls as Chrome trace. """
+    img = CImg(np.zeros((20, 30), dtype=np.uint8), dtype=uint8)
+    with profile() as prof:
+        img.mirror('x')
+        img.get_blur(1)
+    events = prof.trace()['traceEvents']
+    assert [e['name'] for e in events] == ['mirror', 'get_blur']
+    assert all(e['ph'] == 'X' and e['dur'] >= 0 for e in events)
+    assert events[0]['args']['shape'] == [1, 1, 20, 30]
+    assert events[0]['args']['dtype'] == 'uint8'
+    assert events[0]['ts'] + events[0]['dur'] <= events[1]['ts']
+    filename = str(tmp_path / 'trace.json')
+    prof.save_trace(filename)
+    with open(filename) as f:
+        assert json.load(f)['traceEvents'][1]['name'] == 'get_blur'
+    with profile(trace=False) as prof:
+        img.mirror('x')
+    assert prof.stats()['mirror']['calls'] == 1
+    with pytest.raises(RuntimeError):
+        prof.trace()
+
+def test_profile_env(tmp_path):
+    """ Test profiling of a process with PYCIMG_PROFILE. """
+    filename = str(tmp_path / 'trace.json')
+    run_python('import pycimg; pycimg.CImg((10, 10)).blur(1)', PYCIMG_PROFILE=filename)
+    with open(filename) as f:
+        # The constructor resizes the image
+        assert [e['name'] for e in json.load(f)['traceEvents']] == ['resize', 'blur']
@@ -0,0 +1,94 @@
+import threading
+import time
+
+import numpy as np
+import pytest
+from context import *
+
+def _run_while_blurring(img):
+    """ Blur img in a worker thread while the calling thread keeps ticking.
+        Returns start and end time of the blur and the tick times. """
+    interval = []
+
+    def worker():
+        t0 = time.perf_counter()
+        img.blur(5, is_gaussian=True)
+        interval.extend([t0, time.perf_counter()])
+
+    ticks = []
+    thread = threading.Thread(target=worker)
+    thread.start()
+    while thread.is_alive():
+        ticks.append(time.perf_counter())
+        time.sleep(0.001)
+    thread.join()
+    return interval[0], interval[1], ticks
+
+def test_gil_released():
+    """ Test that python threads keep running during a native call. """
+    img = CImg(np.random.rand(3, 1, 1500, 1500).astype(np.float32))
+    t0, t1, ticks = _run_while_blurring(img)
+    # The calling thread needs the GIL for each tick, so ticks
+    # during the blur prove that the GIL has been released.
+    inside = [t0] + [t for t in ticks if t0 < t < t1] + [t1]
+    assert len(inside) > 2
+    assert max(b - a for a, b in zip(inside, inside[1:])) < (t1 - t0) / 2
+
+def test_concurrent_calls():
+    """ Test concurrent native calls on different images. """
+    from concurrent.futures import ThreadPoolExecutor
+    arrays = [np.random.rand(200, 300).astype(np.float32) for _ in range(8)]
+    expected = [CImg(arr).blur(2).asarray().copy() for arr in arrays]
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(lambda arr: CImg(arr).blur(2).asarray().copy(), arrays))
+    for r, e in zip(results, expected):
+        assert np.array_equal(r, e)
+
+def test_num_threads():
+    """ Test setting the number of threads globally and per thread. """
+    info = openmp_info()
+    default = get_num_threads()
+    assert default == info['num_threads']
+    try:
+        set_num_threads(3)
+        assert get_num_threads() == (3 if info['enabled'] else 1)
+        with threads(2):
+            assert get_num_threads() == (2 if info['enabled'] else 1)
+            # The override only applies to the current thread
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                assert pool.submit(get_num_threads).result() == (3 if info['enabled'] else 1)
+        assert get_num_threads() == (3 if info['enabled'] else 1)
+    finally:
+        set_num_threads(0)
+    assert get_num_threads() == default
+    with pytest.raises(RuntimeError):
+        set_num_threads(-1)
+
+def test_num_threads_argument():
+    """ Test per-call num_threads argument. """
+    arr = np.random.rand(3, 1, 300, 400).astype(np.float32)
+    expected = CImg(arr).blur(3).asarray()
+    res = CImg(arr).blur(3, num_threads=1).asarray()
+    assert np.allclose(res, expected)
+    res = CImg(arr).get_blur(3, num_threads=2).asarray()
+    assert np.allclose(res, expected)
+    default = get_num_threads()
+    with pytest.raises(RuntimeError):
+        CImg(arr).blur(3, num_threads=-1)
+    assert get_num_threads() == default
+
+def test_parallel_size_factor():
+    """ Test scaling of the minimum sizes of parallelized operations. """
+    arr = np.random.rand(3, 1, 300, 400).astype(np.float32)
+    expected = CImg(arr).blur(3).asarray()
+    try:
+        for factor in [0, float('inf')]:
+            set_parallel_size_factor(factor)
+            assert get_parallel_size_factor() == factor
+            assert openmp_info()['size_factor'] == factor
+            assert np.allclose(CImg(arr).blur(3).asarray(), expected)
+    finally:
+        set_parallel_size_factor(1)
+    with pytest.raises(RuntimeError):
+        set_parallel_size_factor(-1)
@@ -0,0 +1,78 @@
+import os
+
+import numpy as np
+import pytest
+from context import *
+from pycimg import tiled
+
+def _image():
+    return CImg(np.random.rand(2, 3, 100, 130).astype(np.float32))
+
+def test_apply_exact():
+    """ Test that tiled filters with finite support match the in-memory filter. """
+    img = _image()
+    kernel = CImg(np.random.rand(5, 7).astype(np.float32))
+    calls = [('convolve', (kernel,)),
+             ('correlate', (kernel,)),
+             ('erode', (kernel,)),
+             ('dilate', (kernel,)),
+             ('blur_median', (3,))]
+    for name, args in calls:
+        expected = getattr(CImg(img), name)(*args)
+        res = tiled.apply(img, name, *args, tile=(32, 24))
+        assert res.shape == expected.shape
+        assert np.array_equal(res.asarray(), expected.asarray())
+
+def test_apply_recursive():
+    """ Test tiled recursive filters. """
+    img = _image()
+    expected = CImg(img).blur(1.5, is_gaussian=True)
+    res = tiled.apply(img, 'blur', 1.5, is_gaussian=True, tile=(40, 40), workers=3)
+    assert np.allclose(res.asarray(), expected.asarray(), atol=1e-5)
+    expected = CImg(img).deriche(2, axis='y')
+    res = tiled.apply(img, 'deriche', 2, axis='y', tile=(40, 40))
+    assert np.allclose(res.asarray(), expected.asarray(), atol=1e-5)
+
+def test_apply_callable():
+    """ Test tiled processing with a function changing spectrum and dtype. """
+    img = _image()
+    with pytest.raises(RuntimeError):
+        tiled.apply(img, lambda im: im.get_norm())
+    res = tiled.apply(img.asarray(), lambda im: CImg(im.get_norm(), dtype=float64), halo=0, tile=(50, 50))
+    assert res.dtype == float64
+    assert np.allclose(res.asarray(), CImg(img).norm().asarray())
+    with pytest.raises(RuntimeError):
+        tiled.apply(img, 'resize', 10, 10, halo=0)
+
+def test_apply_empty():
+    """ Test tiled processing of empty images. """
+    with pytest.raises(RuntimeError):
+        tiled.apply(CImg(), 'blur', 1)
+    with pytest.raises(RuntimeError):
+        tiled.apply(np.zeros((0, 5), dtype=np.float32), 'blur', 1)
+
+def test_apply_files():
+    """ Test tiled processing from and to files. """
+    img = _image()
+    kernel = CImg(np.ones((3, 3), dtype=np.float32))
+    expected = CImg(img).dilate(kernel)
+    src = 'tiled_src.cimg'
+    out = 'tiled_out.cimg'
+    img.save(src)
+    res = tiled.apply(src, 'dilate', kernel, tile=(64, 64), out=out)
+    assert np.array_equal(res.asarray(), expected.asarray())
+    del res
+    assert np.array_equal(CImg(out).asarray(), expected.asarray())
+    os.remove(src)
+    os.remove(out)
+
+def test_apply_tiff(tmp_path, monkeypatch):
+    """ Test tiled processing of a TIFF file. """
+    import tempfile
+    monkeypatch.setattr(tempfile, 'tempdir', str(tmp_path))
+    expected = CImg(get_test_image('tiff'), dtype=uint8).blur_median(3)
+    res = tiled.apply(get_test_image('tiff'), 'blur_median', 3, tile=(500, 300))
+    assert res.dtype == uint8
+    assert np.array_equal(res.asarray(), expected.asarray())
+    # The temporary file is removed
+    assert os.listdir(str(tmp_path)) == []